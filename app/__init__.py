@@ -2,6 +2,23 @@ from flask import Flask, jsonify
 from .config import Config
 from .extensions import db, migrate, jwt
 from .routes import register_routes
+from .cli import init_cli
+from .utils.verification_cache import verification_cache
+from .utils.verification_log_writer import verification_log_writer
+from .utils.job_queue import job_queue
+from .utils.dashboard_metrics import dashboard_metrics
+from .utils.db_pool import db_pool
+from .utils.db_replicas import replica_router
+from .utils.asset_storage import asset_storage
+from .utils.qr_cache import qr_render_cache
+from .utils.signing import url_signer
+from .utils.certificate_tokens import certificate_tokens
+from .utils.revocation_list import revocation_list
+from .utils.rate_limiter import rate_limiter
+from .utils.abuse_detector import abuse_detector
+from .utils.certificate_import import run_certificate_import_job
+from .utils.student_import import run_student_import_job
+from .utils.qr_generator import check_public_base_url
 from flasgger import Swagger
 from flask_cors import CORS
 
@@ -9,10 +26,28 @@ from flask_cors import CORS
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    check_public_base_url(app)
 
+    # Pool settings go into SQLALCHEMY_ENGINE_OPTIONS, before the engine is created
+    db_pool.init_app(app)
     db.init_app(app)
+    replica_router.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    verification_cache.init_app(app)
+    verification_log_writer.init_app(app)
+    job_queue.init_app(app)
+    job_queue.register("certificates", run_certificate_import_job)
+    job_queue.register("students", run_student_import_job)
+    dashboard_metrics.init_app(app)
+    asset_storage.init_app(app)
+    qr_render_cache.init_app(app)
+    url_signer.init_app(app)
+    certificate_tokens.init_app(app)
+    revocation_list.init_app(app)
+    rate_limiter.init_app(app)
+    abuse_detector.init_app(app)
+    init_cli(app)
 
     CORS(app)
 
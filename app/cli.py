@@ -42,6 +42,89 @@ def backup_command():
     
     click.echo(f"✅ Backup created: database_backup.json")
 
+@click.command('dashboard-reconcile')
+@with_appcontext
+def dashboard_reconcile_command():
+    """Recompute the dashboard counters from the tables."""
+    from .utils.dashboard_metrics import dashboard_metrics
+
+    values = dashboard_metrics.reconcile()
+    click.echo(f"✅ Reconciled {len(values)} dashboard counters in {dashboard_metrics.last_reconcile_seconds}s")
+
+@click.command('backfill-last-verified')
+@with_appcontext
+def backfill_last_verified_command():
+    """Fill certificates.last_verified_at from existing verification logs."""
+    from sqlalchemy import func, select, update
+    from .models.verification_log import VerificationLog
+
+    latest = (
+        select(func.max(VerificationLog.verified_at))
+        .where(VerificationLog.certificate_id == Certificate.id)
+        .scalar_subquery()
+    )
+    latest_status = (
+        select(VerificationLog.status)
+        .where(VerificationLog.certificate_id == Certificate.id)
+        .order_by(VerificationLog.verified_at.desc(), VerificationLog.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    updated = db.session.execute(
+        update(Certificate)
+        .where(
+            Certificate.last_verified_at.is_(None),
+            Certificate.id.in_(select(VerificationLog.certificate_id))
+        )
+        .values(last_verified_at=latest, last_verification_status=latest_status, updated_at=Certificate.updated_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+
+    click.echo(f"✅ Backfilled last_verified_at on {updated} certificates")
+
+@click.command('sign-certificate-tokens')
+@click.option('--all', 'resign_all', is_flag=True, help='Re-sign every certificate (after a key rotation), not only those without a token.')
+@click.option('--batch-size', default=1000, show_default=True)
+@with_appcontext
+def sign_certificate_tokens_command(resign_all, batch_size):
+    """Issue signed verification tokens for existing certificates."""
+    from sqlalchemy import select, update
+    from .utils.certificate_tokens import certificate_tokens
+
+    columns = (
+        Certificate.id, Certificate.verification_code, Certificate.student_first_name,
+        Certificate.student_last_name, Certificate.course_name, Certificate.issued_at, Certificate.updated_at
+    )
+    signed = 0
+    last_id = 0
+    while True:
+        query = select(*columns).where(Certificate.id > last_id).order_by(Certificate.id).limit(batch_size)
+        if not resign_all:
+            query = query.where(Certificate.verification_token.is_(None))
+        rows = db.session.execute(query).all()
+        if not rows:
+            break
+
+        db.session.execute(update(Certificate), [
+            {
+                "id": row.id,
+                "verification_token": certificate_tokens.issue(
+                    row.verification_code, f"{row.student_first_name} {row.student_last_name}", row.course_name, row.issued_at
+                ),
+                "updated_at": row.updated_at
+            }
+            for row in rows
+        ])
+        db.session.commit()
+        signed += len(rows)
+        last_id = rows[-1].id
+
+    click.echo(f"✅ Signed tokens for {signed} certificates")
+
 # Register the command
 def init_cli(app):
-    app.cli.add_command(backup_command)
\ No newline at end of file
+    app.cli.add_command(backup_command)
+    app.cli.add_command(dashboard_reconcile_command)
+    app.cli.add_command(backfill_last_verified_command)
+    app.cli.add_command(sign_certificate_tokens_command)
\ No newline at end of file
@@ -10,3 +10,143 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get("SQLALCHEMY_DATABASE_URI") or os.environ.get("DATABASE_URL")
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool per worker process (Postgres sees workers x (size + overflow) connections)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))  # 0 disables
+    # Connecting through pgbouncer in transaction pooling mode
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'false').lower() in ('1', 'true', 'yes')
+
+    # Read replicas for the verification, listing and dashboard reads (comma-separated URLs)
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 10))
+    REPLICA_HEALTH_INTERVAL = int(os.environ.get('REPLICA_HEALTH_INTERVAL', 5))  # seconds
+
+    # Verification lookup cache (per worker process, 0 disables it)
+    VERIFICATION_CACHE_SIZE = int(os.environ.get('VERIFICATION_CACHE_SIZE', 10000))
+    VERIFICATION_CACHE_TTL = int(os.environ.get('VERIFICATION_CACHE_TTL', 300))  # seconds
+    VERIFICATION_CACHE_NEGATIVE_TTL = int(os.environ.get('VERIFICATION_CACHE_NEGATIVE_TTL', 30))  # seconds
+
+    # Verification logs are written by a background batch writer unless disabled
+    VERIFICATION_LOG_ASYNC = os.environ.get('VERIFICATION_LOG_ASYNC', 'true').lower() in ('1', 'true', 'yes')
+    VERIFICATION_LOG_QUEUE_SIZE = int(os.environ.get('VERIFICATION_LOG_QUEUE_SIZE', 10000))
+    VERIFICATION_LOG_BATCH_SIZE = int(os.environ.get('VERIFICATION_LOG_BATCH_SIZE', 500))
+    VERIFICATION_LOG_FLUSH_MS = int(os.environ.get('VERIFICATION_LOG_FLUSH_MS', 200))
+    VERIFICATION_LOG_OVERFLOW = os.environ.get('VERIFICATION_LOG_OVERFLOW', 'spill')  # block | drop_oldest | spill
+    VERIFICATION_LOG_SPILL_PATH = os.environ.get('VERIFICATION_LOG_SPILL_PATH', '/tmp/verification_logs.spill.jsonl')
+
+    # Max certificate codes accepted by POST /certificate/verify/bulk
+    BULK_VERIFY_MAX_CODES = int(os.environ.get('BULK_VERIFY_MAX_CODES', 5000))
+    BULK_VERIFY_CHUNK_SIZE = int(os.environ.get('BULK_VERIFY_CHUNK_SIZE', 500))  # codes per IN (...) lookup and streamed chunk
+
+    # QR codes are served by GET /certificate/<code>/qr.png; PUBLIC_BASE_URL prefixes the stored link
+    PUBLIC_BASE_URL = os.environ.get('PUBLIC_BASE_URL', '')  # e.g. https://api.example.com; required for on-demand QR links
+    QR_STORE_ON_ISSUE = os.environ.get('QR_STORE_ON_ISSUE', 'false').lower() in ('1', 'true', 'yes')  # upload to asset storage instead
+    QR_CACHE_SIZE = int(os.environ.get('QR_CACHE_SIZE', 2000))  # rendered images kept per worker (0 disables)
+    QR_CACHE_MAX_AGE = int(os.environ.get('QR_CACHE_MAX_AGE', 86400))  # seconds clients may reuse an image
+
+    # What QR codes encode: json (name, course, number, date) or signed_url (a short HMAC-signed /V/ link)
+    QR_PAYLOAD = os.environ.get('QR_PAYLOAD', 'json')
+    QR_VERIFY_BASE_URL = os.environ.get('QR_VERIFY_BASE_URL')  # host of the signed links (default PUBLIC_BASE_URL)
+    QR_SIGNING_KEY = os.environ.get('QR_SIGNING_KEY')  # default derived from SECRET_KEY
+    QR_SIGNING_OLD_KEYS = [key.strip() for key in os.environ.get('QR_SIGNING_OLD_KEYS', '').split(',') if key.strip()]
+    QR_SIGNATURE_BYTES = int(os.environ.get('QR_SIGNATURE_BYTES', 10))  # 10 bytes = 80-bit signatures
+
+    # Signed certificate tokens for offline verification (POST /certificate/verify-token)
+    CERT_TOKEN_ALGORITHM = os.environ.get('CERT_TOKEN_ALGORITHM', 'HS256')  # HS256 or EdDSA
+    CERT_TOKEN_SECRET = os.environ.get('CERT_TOKEN_SECRET')  # HS256 key, default derived from SECRET_KEY
+    CERT_TOKEN_PRIVATE_KEY = os.environ.get('CERT_TOKEN_PRIVATE_KEY')  # EdDSA: Ed25519 private key PEM or its path
+    # Previous HS256 secrets, or paths of previous EdDSA public keys, still accepted after a rotation
+    CERT_TOKEN_OLD_KEYS = [key.strip() for key in os.environ.get('CERT_TOKEN_OLD_KEYS', '').split(',') if key.strip()]
+    CERT_TOKEN_ISSUER = os.environ.get('CERT_TOKEN_ISSUER')  # default PUBLIC_BASE_URL
+    CERT_TOKEN_REVOCATION_FILTER = os.environ.get('CERT_TOKEN_REVOCATION_FILTER', 'true').lower() in ('1', 'true', 'yes')
+    CERT_TOKEN_REVOCATION_CAPACITY = int(os.environ.get('CERT_TOKEN_REVOCATION_CAPACITY', 100000))
+    CERT_TOKEN_REVOCATION_ERROR_RATE = float(os.environ.get('CERT_TOKEN_REVOCATION_ERROR_RATE', 0.001))
+
+    # Token-bucket rate limits for the public endpoints (429 with Retry-After when exceeded)
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # memory (per worker) or redis (shared)
+    RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL')  # e.g. redis://localhost:6379/0
+    RATE_LIMIT_REDIS_PREFIX = os.environ.get('RATE_LIMIT_REDIS_PREFIX', 'ratelimit:')
+    RATE_LIMIT_FAIL_OPEN = os.environ.get('RATE_LIMIT_FAIL_OPEN', 'true').lower() in ('1', 'true', 'yes')
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000))  # clients tracked per worker (memory)
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', 0))  # proxies in front setting X-Forwarded-For
+    # Per route, overridable with RATE_LIMITS=verify=30/minute,qr=200/minute
+    RATE_LIMITS = {
+        "verify": "60/minute",  # GET /certificate/<code>, POST /certificate/verify, /V/ links
+        "verify_bulk": "10/minute",
+        "verify_token": "600/minute",
+        "qr": "120/minute",
+        "revocations": "60/minute",
+        **dict(
+            (name.strip(), rate.strip())
+            for name, _, rate in (item.partition('=') for item in os.environ.get('RATE_LIMITS', '').split(','))
+            if rate
+        )
+    }
+    # Partners sending X-API-Key get their own bucket at RATE_LIMIT_CLIENT_RATE (RATE_LIMIT_API_KEYS=name:key,...)
+    RATE_LIMIT_API_KEYS = dict(
+        (name.strip(), key.strip())
+        for name, _, key in (item.partition(':') for item in os.environ.get('RATE_LIMIT_API_KEYS', '').split(','))
+        if key
+    )
+    RATE_LIMIT_CLIENT_RATE = os.environ.get('RATE_LIMIT_CLIENT_RATE', '6000/minute')
+
+    # Enumeration detection on the verify routes: offending addresses are blocked (403) per worker
+    ABUSE_DETECTION = os.environ.get('ABUSE_DETECTION', 'true').lower() in ('1', 'true', 'yes')
+    ABUSE_WINDOW_SECONDS = int(os.environ.get('ABUSE_WINDOW_SECONDS', 300))
+    ABUSE_MIN_REQUESTS = int(os.environ.get('ABUSE_MIN_REQUESTS', 30))  # verifications in the window before the INVALID ratio counts
+    ABUSE_INVALID_RATIO = float(os.environ.get('ABUSE_INVALID_RATIO', 0.5))
+    ABUSE_SEQUENTIAL_RUN = int(os.environ.get('ABUSE_SEQUENTIAL_RUN', 20))  # consecutive codes checked for a sequential scan
+    ABUSE_SEQUENTIAL_MAX_STEP = int(os.environ.get('ABUSE_SEQUENTIAL_MAX_STEP', 5))
+    ABUSE_BULK_SCAN_CODES = int(os.environ.get('ABUSE_BULK_SCAN_CODES', 1000))  # sequential bulk-verified codes per window, 0 = off
+    ABUSE_BLOCK_SECONDS = int(os.environ.get('ABUSE_BLOCK_SECONDS', 900))
+    ABUSE_MAX_TRACKED = int(os.environ.get('ABUSE_MAX_TRACKED', 50000))  # client addresses tracked per worker
+    ABUSE_ALLOWLIST = [ip.strip() for ip in os.environ.get('ABUSE_ALLOWLIST', '').split(',') if ip.strip()]
+
+    # Revoked certificates: per-worker Bloom filter refreshed from revocation_events
+    REVOCATION_REFRESH_SECONDS = int(os.environ.get('REVOCATION_REFRESH_SECONDS', 5))
+    REVOCATION_OVERLAP_SECONDS = int(os.environ.get('REVOCATION_OVERLAP_SECONDS', 60))  # re-read window for events that commit late
+    REVOCATION_REBUILD_SECONDS = int(os.environ.get('REVOCATION_REBUILD_SECONDS', 3600))  # rebuild the filters so reinstated codes drop out
+    REVOCATION_FILTER_CAPACITY = int(os.environ.get('REVOCATION_FILTER_CAPACITY', 100000))
+    REVOCATION_FILTER_ERROR_RATE = float(os.environ.get('REVOCATION_FILTER_ERROR_RATE', 0.001))
+    REVOCATION_LIST_MAX_AGE = int(os.environ.get('REVOCATION_LIST_MAX_AGE', 60))  # seconds partners may cache /certificate/revocations
+
+    # Bulk import QR pipeline: render processes (0 = one per CPU) and concurrent uploads
+    QR_RENDER_WORKERS = int(os.environ.get('QR_RENDER_WORKERS', 0))
+    QR_UPLOAD_CONCURRENCY = int(os.environ.get('QR_UPLOAD_CONCURRENCY', 8))
+    QR_PARALLEL_MIN_ROWS = int(os.environ.get('QR_PARALLEL_MIN_ROWS', 50))
+    QR_UPLOAD_BATCH_SIZE = int(os.environ.get('QR_UPLOAD_BATCH_SIZE', 50))  # files per Drive upload batch
+
+    # Where QR codes and PDFs are stored: drive (Google Drive), local (served from /assets) or s3
+    ASSET_STORAGE = os.environ.get('ASSET_STORAGE', 'drive')
+    ASSET_LOCAL_DIR = os.environ.get('ASSET_LOCAL_DIR', 'storage/assets')
+    ASSET_BASE_URL = os.environ.get('ASSET_BASE_URL', '')  # prefix for local asset URLs, e.g. https://api.example.com
+    ASSET_S3_BUCKET = os.environ.get('ASSET_S3_BUCKET')
+    ASSET_S3_ENDPOINT_URL = os.environ.get('ASSET_S3_ENDPOINT_URL')  # e.g. http://localhost:9000 for MinIO
+    ASSET_S3_REGION = os.environ.get('ASSET_S3_REGION', 'us-east-1')
+    ASSET_S3_ACCESS_KEY_ID = os.environ.get('ASSET_S3_ACCESS_KEY_ID')  # falls back to the usual AWS credential chain
+    ASSET_S3_SECRET_ACCESS_KEY = os.environ.get('ASSET_S3_SECRET_ACCESS_KEY')
+    ASSET_S3_PREFIX = os.environ.get('ASSET_S3_PREFIX', '')
+    ASSET_S3_PUBLIC_URL = os.environ.get('ASSET_S3_PUBLIC_URL')  # CDN or public bucket URL used in asset links
+
+    # Bulk imports: rows committed per chunk, background job workers and upload spool directory
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 500))
+    IMPORT_JOB_WORKERS = int(os.environ.get('IMPORT_JOB_WORKERS', 2))
+    IMPORT_SPOOL_DIR = os.environ.get('IMPORT_SPOOL_DIR', 'tmp/imports')
+    # Running jobs without a progress update for this long were interrupted; each worker sweeps for them
+    IMPORT_JOB_STALE_SECONDS = int(os.environ.get('IMPORT_JOB_STALE_SECONDS', 600))
+    IMPORT_JOB_SWEEP_SECONDS = int(os.environ.get('IMPORT_JOB_SWEEP_SECONDS', 60))
+    IMPORT_JOB_MAX_ATTEMPTS = int(os.environ.get('IMPORT_JOB_MAX_ATTEMPTS', 3))
+
+    # Keyset-paginated listings: default and maximum `limit`
+    PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', 500))
+
+    # Dashboard summary reads materialized counters, reconciled against the tables periodically (0 = never)
+    DASHBOARD_COUNTERS = os.environ.get('DASHBOARD_COUNTERS', 'true').lower() in ('1', 'true', 'yes')
+    DASHBOARD_RECONCILE_SECONDS = int(os.environ.get('DASHBOARD_RECONCILE_SECONDS', 900))
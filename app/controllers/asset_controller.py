@@ -0,0 +1,24 @@
+import mimetypes
+import os
+from flask import abort, send_file
+from ..utils.asset_storage import asset_storage
+
+# ===================================
+# SERVE STORED ASSET
+# ===================================
+def serve_asset(key):
+    """Stream a locally stored asset; keys are content hashes, so responses never change"""
+    path = asset_storage.local_path(key)
+    if not path or not os.path.exists(path):
+        abort(404)
+
+    response = send_file(
+        path,
+        mimetype=mimetypes.guess_type(key)[0] or "application/octet-stream",
+        etag=key.split(".")[0],
+        max_age=31536000,
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -69,8 +69,9 @@ def login_user(data):
     user = User.query.filter_by(email=email).first()
 
     if user and user.check_password(password):
-        # Create access token
-        access_token = create_access_token(identity=user.id)
+        # Create access token; the role claim is what require_role checks,
+        # and PyJWT only accepts a string subject
+        access_token = create_access_token(identity=str(user.id), additional_claims={"role": user.role})
         
         # Return all user information along with token
         user_data = {
@@ -1,17 +1,25 @@
-from flask import Response, request, jsonify
+from flask import Response, request, jsonify, current_app
 from sqlalchemy.orm import joinedload
 from ..extensions import db
 from ..models.certificate import Certificate
 from ..models.student import Student
 from ..utils.certificate_number import generate_certificate_number
-from ..utils.qr_generator import generate_certificate_qr
+from ..utils.qr_generator import generate_certificate_qr, certificate_qr_url, is_certificate_qr_url
+from ..utils.certificate_import import read_certificate_rows, import_certificate_rows, ImportFileError
+from ..utils.job_queue import job_queue, async_requested
+from ..utils.dashboard_metrics import dashboard_metrics
+from ..utils.pagination import keyset_paginate, parse_limit, certificate_filters, PaginationError
+from ..utils.db_replicas import read_replica
 import csv
 from io import StringIO
 import pandas as pd
 from io import BytesIO, StringIO
 from datetime import datetime
 import re
-from ..utils.google_drive_simple import drive_service 
+from ..utils.asset_storage import asset_storage, AssetStorageError
+from ..utils.verification_cache import verification_cache
+from ..utils.certificate_tokens import certificate_tokens
+from ..utils.revocation_list import revocation_list
 
 
 # Helper function to extract Google Drive file ID
@@ -71,6 +79,7 @@ def create_certificate():
     ).first()
     
     # If student doesn't exist, create one
+    new_student = not student
     if not student:
         student = Student(
             first_name=first_name,
@@ -86,14 +95,21 @@ def create_certificate():
     # Generate cert number
     certificate_number = generate_certificate_number(course_name, issuance_date)
 
-    # Generate QR - now passing date object instead of string
+    # QR codes are rendered on demand by GET /certificate/<code>/qr.png unless stored at issuance
     full_name = first_name + " " + last_name
-    qr_url = generate_certificate_qr(
-        f"{first_name} {last_name}",
-        course_name,
-        certificate_number,
-        issuance_date  # Now this is a date object, not a string
-    )
+    if current_app.config.get("QR_STORE_ON_ISSUE"):
+        try:
+            qr_url = generate_certificate_qr(
+                f"{first_name} {last_name}",
+                course_name,
+                certificate_number,
+                issuance_date  # Now this is a date object, not a string
+            )
+        except AssetStorageError as e:
+            db.session.rollback()
+            return jsonify({"error": f"Could not store the QR code: {str(e)}"}), 503
+    else:
+        qr_url = certificate_qr_url(certificate_number)
 
     cert = Certificate(
         student_id=student.id,  # NEW: Add student_id
@@ -105,32 +121,44 @@ def create_certificate():
         verification_code=certificate_number,
         # qr_code_url=qr_path,
         qr_code_url=qr_url,
+        verification_token=certificate_tokens.issue(certificate_number, full_name, course_name, issuance_date),
 
         issued_at=issuance_date,  # Use the date object here too
     )
 
     db.session.add(cert)
+    dashboard_metrics.bump(courses={course_name: 1}, certificates=1, students=1 if new_student else 0)
     db.session.commit()
 
+    # Drop any cached INVALID result for the newly issued number
+    verification_cache.invalidate(certificate_number)
+
     return jsonify({
         "message": "Certificate created successfully",
         "certificate_number": certificate_number,
         "student_id": student.id,  # NEW: Return student ID
-        "qr_code_url": qr_url
+        "qr_code_url": qr_url,
+        "verification_token": cert.verification_token
     }), 201
 
 
 # ===================================
 # PAGINATED LIST (Optimized, no N+1)
 # ===================================
+@read_replica
 def list_certificates():
-    # Remove pagination
-    query = Certificate.query.options(
-        joinedload(Certificate.student)
-    ).order_by(Certificate.created_at.desc())
+    """Newest-first certificates, one keyset page at a time (?limit=&cursor=) with optional filters"""
+    try:
+        query = Certificate.query.options(
+            joinedload(Certificate.student)
+        ).filter(*certificate_filters(Certificate))
 
-    # Get all certificates
-    all_certificates = query.all()
+        page, next_cursor = keyset_paginate(
+            query, "certificates", Certificate.created_at, Certificate.id,
+            limit=parse_limit(), cursor=request.args.get("cursor")
+        )
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
 
     return jsonify({
         "certificates": [
@@ -142,13 +170,17 @@ def list_certificates():
                 "verification_code": c.verification_code,
                 "issued_at": c.issued_at.strftime("%a, %d %b %Y") if c.issued_at else None,
                 "qr_code_url": c.qr_code_url,
+                "verification_token": c.verification_token,
+                "revoked_at": c.revoked_at.isoformat() if c.revoked_at else None,
+                "revocation_reason": c.revocation_reason,
                 "student_email": c.student.email if c.student else None,
                 "year_of_study": c.year_of_study,
                 "course_summary": c.course_summary
             }
-            for c in all_certificates
+            for c in page
         ],
-        "count": len(all_certificates)
+        "count": len(page),
+        "next_cursor": next_cursor
     })
 
 # ===================================
@@ -194,6 +226,10 @@ def update_certificate(code):
             "to": new_verification_code
         }
         cert.verification_code = new_verification_code
+        
+        # An on-demand QR URL names the code, so it moves with it
+        if is_certificate_qr_url(cert.qr_code_url, old_values["verification_code"]):
+            cert.qr_code_url = certificate_qr_url(new_verification_code)
     
     # 2. Update student first name if provided
     new_first_name = data.get("first_name")
@@ -266,8 +302,21 @@ def update_certificate(code):
     #         cert.issued_at
     #     )
     #     cert.qr_code_url = new_qr_url
-    
+
+    if cert.course_name != old_values["course_name"]:
+        dashboard_metrics.bump(courses={old_values["course_name"]: -1, cert.course_name: 1})
+
+    # The token signs the code, name and course, so a change to any of them means a new one
+    reissue_token = any(field in changes for field in ("verification_code", "first_name", "last_name", "course_name"))
+    if reissue_token:
+        cert.verification_token = certificate_tokens.issue_for(cert)
+        revocation_list.record(old_values["verification_code"], "reissue", certificate_id=cert.id)
+
     db.session.commit()
+
+    verification_cache.invalidate(old_values["verification_code"], cert.verification_code)
+    if reissue_token:
+        revocation_list.refresh(force=True)
     
     # Prepare response
     response_data = {
@@ -277,9 +326,14 @@ def update_certificate(code):
         "verification_code": cert.verification_code,
         "changes": changes if changes else "No changes made"
     }
+    if reissue_token:
+        response_data["verification_token"] = cert.verification_token
     
     # Only add QR URL if it exists and wasn't regenerated
-    if cert.qr_code_url:
+    if is_certificate_qr_url(cert.qr_code_url, cert.verification_code):
+        response_data["qr_code_url"] = cert.qr_code_url
+        response_data["note"] = "QR code is rendered on demand and reflects the update"
+    elif cert.qr_code_url:
         response_data["qr_code_url"] = cert.qr_code_url
         response_data["note"] = "QR code not regenerated during update"
     
@@ -291,205 +345,95 @@ def update_certificate(code):
 def delete_certificate(code):
     cert = Certificate.query.get_or_404(code)
 
-    # Delete QR code from Google Drive
-    if cert.qr_code_url and 'google.com' in cert.qr_code_url:
-        drive_service.delete_file_by_url(cert.qr_code_url)
-
+    verification_code = cert.verification_code
+    qr_code_url = cert.qr_code_url
+    dashboard_metrics.certificates_removed([cert])
+    revocation_list.record(verification_code, "delete", certificate_id=cert.id)
     db.session.delete(cert)
     db.session.commit()
 
+    verification_cache.invalidate(verification_code)
+    revocation_list.refresh(force=True)
+
+    # Delete the QR code once the row is gone (from whichever storage issued the URL)
+    asset_storage.delete(qr_code_url)
+
     return jsonify({"message": "Certificate deleted successfully"})
 
+# ===================================
+# REVOKE / REINSTATE CERTIFICATE
+# ===================================
+def revoke_certificate(code):
+    cert = Certificate.query.filter_by(verification_code=code).first()
+    if not cert:
+        return jsonify({"error": "Certificate not found"}), 404
+    if cert.revoked_at:
+        return jsonify({"error": "Certificate is already revoked"}), 409
+
+    data = request.get_json(silent=True) or {}
+    reason = (data.get("reason") or "").strip()[:255] or None
+
+    cert.revoked_at = datetime.utcnow()
+    cert.revocation_reason = reason
+    revocation_list.record(cert.verification_code, "revoke", certificate_id=cert.id, reason=reason)
+    db.session.commit()
+
+    verification_cache.invalidate(cert.verification_code)
+    revocation_list.refresh(force=True)
+
+    return jsonify({
+        "message": "Certificate revoked",
+        "verification_code": cert.verification_code,
+        "revoked_at": cert.revoked_at.isoformat(),
+        "reason": reason
+    })
+
+
+def reinstate_certificate(code):
+    cert = Certificate.query.filter_by(verification_code=code).first()
+    if not cert:
+        return jsonify({"error": "Certificate not found"}), 404
+    if not cert.revoked_at:
+        return jsonify({"error": "Certificate is not revoked"}), 409
+
+    cert.revoked_at = None
+    cert.revocation_reason = None
+    revocation_list.record(cert.verification_code, "reinstate", certificate_id=cert.id)
+    db.session.commit()
+
+    verification_cache.invalidate(cert.verification_code)
+    revocation_list.refresh(force=True)
+
+    return jsonify({
+        "message": "Certificate reinstated",
+        "verification_code": cert.verification_code
+    })
+
+
 def import_certificates_csv():
     file = request.files.get("file")
 
     if not file:
         return jsonify({"error": "File is required"}), 400
 
-    filename = file.filename.lower()
-    created_count = 0
-    errors = []
+    # Large files: hand off to a background job and let the client poll /jobs/<id>
+    if async_requested():
+        job = job_queue.enqueue("certificates", file)
+        return jsonify({
+            "message": "Import queued",
+            "job_id": job.id,
+            "status_url": f"/jobs/{job.id}"
+        }), 202
 
     try:
-        # Handle CSV files
-        if filename.endswith('.csv'):
-            file_content = file.read()
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'windows-1252']
-            decoded_content = None
-            
-            for encoding in encodings:
-                try:
-                    decoded_content = file_content.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if decoded_content is None:
-                return jsonify({"error": "Unable to decode CSV file. Try saving as UTF-8."}), 400
-            
-            stream = StringIO(decoded_content)
-            
-            # Try different delimiters
-            sample = decoded_content[:1000]
-            delimiter = ',' if ',' in sample else '\t' if '\t' in sample else ';'
-            
-            csv_reader = csv.DictReader(stream, delimiter=delimiter)
-            rows = list(csv_reader)
-
-        # Handle Excel files
-        elif filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(file)
-            rows = df.replace({pd.NA: None, float('nan'): None}).to_dict('records')
-        
-        else:
-            return jsonify({"error": "Unsupported file format."}), 400
-
-        if not rows:
-            return jsonify({"error": "No data found in file"}), 400
-
-        # Auto-detect column mapping
-        first_row = rows[0]
-        available_columns = list(first_row.keys())
-        
-        print(f"Available columns: {available_columns}")
-        print(f"First row: {first_row}")
-
-        # Auto-detect name column
-        name_column = None
-        for col in available_columns:
-            col_lower = col.lower().strip()
-            if any(keyword in col_lower for keyword in ['name', 'student', 'full']):
-                name_column = col
-                break
-        if not name_column and available_columns:
-            name_column = available_columns[0]
-
-        # Auto-detect course column
-        course_column = None
-        for col in available_columns:
-            col_lower = col.lower().strip()
-            if any(keyword in col_lower for keyword in ['department', 'course', 'program', 'dept']):
-                course_column = col
-                break
-        if not course_column and len(available_columns) > 1:
-            course_column = available_columns[1]
-
-        # Auto-detect certificate column
-        cert_column = None
-        for col in available_columns:
-            col_lower = col.lower().strip()
-            if any(keyword in col_lower for keyword in ['certificate', 'cert', 'number', 'no', 'code']):
-                cert_column = col
-                break
-        if not cert_column and len(available_columns) > 2:
-            cert_column = available_columns[2]
-
-        print(f"Detected columns - Name: {name_column}, Course: {course_column}, Cert: {cert_column}")
-
-        # Process rows
-        for index, row in enumerate(rows, 1):
-            try:
-                full_name = str(row.get(name_column, '')).strip() if name_column else ''
-                course_name = str(row.get(course_column, '')).strip() if course_column else ''
-                cert_num = str(row.get(cert_column, '')).strip() if cert_column else ''
-
-                if not full_name:
-                    errors.append(f"Row {index}: No name found in column '{name_column}'")
-                    continue
-                if not course_name:
-                    errors.append(f"Row {index}: No course found in column '{course_column}'")
-                    continue
-
-                # Parse name
-                name_parts = full_name.split()
-                first_name = name_parts[0] if name_parts else "Unknown"
-                last_name = ' '.join(name_parts[1:]) if len(name_parts) > 1 else "Student"
-
-                # Generate certificate number if not provided
-                if not cert_num:
-                    cert_num = generate_certificate_number(course_name)
-                else:
-                    # FIX: Check if certificate with this number already exists
-                    existing_cert = Certificate.query.filter_by(verification_code=cert_num).first()
-                    if existing_cert:
-                        errors.append(f"Row {index}: Certificate number '{cert_num}' already exists for student '{existing_cert.student_first_name} {existing_cert.student_last_name}'. Skipping.")
-                        continue
-
-                # Generate QR
-                qr_path = generate_certificate_qr(
-                    full_name,
-                    course_name,
-                    cert_num,
-                    datetime.now().date()
-                )
-
-                # Find or create student
-                student = Student.query.filter_by(
-                    first_name=first_name,
-                    last_name=last_name,
-                    course_name=course_name
-                ).first()
-
-                if not student:
-                    # Create a unique email
-                    base_email = f"{first_name.lower()}.{last_name.lower().replace(' ', '')}@speedlinkng.com"
-                    email = base_email
-                    counter = 1
-                    
-                    # Ensure unique email
-                    while Student.query.filter_by(email=email).first():
-                        email = f"{first_name.lower()}.{last_name.lower().replace(' ', '')}{counter}@speedlinkng.com"
-                        counter += 1
-                    
-                    student = Student(
-                        first_name=first_name,
-                        last_name=last_name,
-                        email=email,
-                        course_name=course_name,
-                        year_of_study="2025"
-                    )
-                    db.session.add(student)
-                    db.session.flush()
-
-                # FIX: Double-check certificate doesn't exist (in case of race condition)
-                existing_cert_final = Certificate.query.filter_by(verification_code=cert_num).first()
-                if existing_cert_final:
-                    errors.append(f"Row {index}: Certificate number '{cert_num}' already exists. Skipping.")
-                    continue
-
-                # Create certificate
-                cert = Certificate(
-                    student_id=student.id,
-                    student_first_name=first_name,
-                    student_last_name=last_name,
-                    course_name=course_name,
-                    course_summary=f"Certificate for {course_name}",
-                    year_of_study="2025",
-                    verification_code=cert_num,
-                    qr_code_url=qr_path,
-                    issued_at=datetime.now().date()
-                )
-
-                db.session.add(cert)
-                created_count += 1
-
-            except Exception as e:
-                errors.append(f"Row {index}: {str(e)}")
-                continue
-
-        db.session.commit()
+        result = import_certificate_rows(
+            read_certificate_rows(file, file.filename),
+            chunk_size=current_app.config.get("IMPORT_CHUNK_SIZE", 500)
+        )
+        return jsonify(result)
 
-        return jsonify({
-            "message": "File processed successfully",
-            "imported": created_count,
-            "errors": errors,
-            "total_rows": len(rows),
-            "detected_columns": {
-                "name_column": name_column,
-                "course_column": course_column, 
-                "cert_column": cert_column
-            }
-        })
+    except ImportFileError as e:
+        return jsonify({"error": str(e)}), 400
 
     except Exception as e:
         db.session.rollback()
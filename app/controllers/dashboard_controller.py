@@ -1,84 +1,60 @@
 # dashboard_controller.py
 from ..models.certificate import Certificate
-from ..models.verification_log import VerificationLog
 from ..models.user import User
 from ..extensions import db
-from sqlalchemy import func
+from ..utils.verification_cache import verification_cache
+from ..utils.verification_log_writer import verification_log_writer
+from ..utils.job_queue import job_queue
+from ..utils.dashboard_metrics import dashboard_metrics
+from ..utils.db_pool import db_pool
+from ..utils.db_replicas import read_replica, replica_router
+from ..utils.asset_storage import asset_storage
+from ..utils.qr_cache import qr_render_cache
+from ..utils.signing import url_signer
+from ..utils.certificate_tokens import certificate_tokens
+from ..utils.revocation_list import revocation_list
+from ..utils.rate_limiter import rate_limiter
+from ..utils.abuse_detector import abuse_detector
+from ..utils.google_drive import drive_service
+from ..utils.google_drive_simple import drive_service as shared_drive_service
+from ..utils.pagination import keyset_paginate, parse_limit, certificate_filters
 from flask import request
-from sqlalchemy.orm import joinedload
 
 
+@read_replica
 def dashboard_summary():
     try:
-        # Metrics
-        total_certs = Certificate.query.count()
-        total_verified_certs = VerificationLog.query.filter_by(status="VALID").count()
-        
-        # Query Student table
-        from ..models.student import Student
-        total_students = Student.query.count()
+        # Metrics come from the materialized counters, not table scans
+        summary = dashboard_metrics.read()
 
-        # Get certificates that have been verified at least once
-        verified_certificate_ids = db.session.query(VerificationLog.certificate_id).filter(
-            VerificationLog.status == "VALID"
-        ).distinct()
-        
-        # Pending = total certificates - verified certificates
-        pending_verifications = total_certs - verified_certificate_ids.count()
-
-        courses_managed = db.session.query(func.count(func.distinct(Certificate.course_name))).scalar()
-
-        # Recent verifications with student names
-        recent_logs = (
-            VerificationLog.query
-            .options(joinedload(VerificationLog.certificate))
-            .filter(VerificationLog.certificate_id.isnot(None))
-            .order_by(VerificationLog.verified_at.desc())
-            .limit(50)
+        # Ten most recently verified certificates, newest first (index on last_verified_at)
+        recent_certificates = (
+            Certificate.query
+            .filter(Certificate.last_verified_at.isnot(None))
+            .order_by(Certificate.last_verified_at.desc())
+            .limit(10)
             .all()
         )
 
-        # Filter to get only the most recent verification for each certificate code
-        seen_codes = set()
-        recent_verifications = []
-        
-        for log in recent_logs:
-            if log.certificate and log.certificate.verification_code not in seen_codes:
-                seen_codes.add(log.certificate.verification_code)
-                recent_verifications.append({
-                    "name": f"{log.certificate.student_first_name} {log.certificate.student_last_name}",
-                    "course": log.certificate.course_name,
-                    "date_verified": log.verified_at.strftime("%Y-%m-%d %H:%M") if log.verified_at else None,
-                    "status": log.status,
-                    "certificate_code": log.certificate.verification_code
-                })
-                
-                # Stop when we have 10 unique certificates
-                if len(recent_verifications) >= 10:
-                    break
-        # recent_verifications = []
-        # for log in recent_logs:
-        #     if log.certificate:
-        #         recent_verifications.append({
-        #             "name": f"{log.certificate.student_first_name} {log.certificate.student_last_name}",
-        #             "course": log.certificate.course_name,
-        #             "date_verified": log.verified_at.strftime("%Y-%m-%d %H:%M") if log.verified_at else None,
-        #             "status": log.status,
-        #             "certificate_code": log.certificate.verification_code
-        #         })
+        recent_verifications = [
+            {
+                "name": f"{cert.student_first_name} {cert.student_last_name}",
+                "course": cert.course_name,
+                "date_verified": cert.last_verified_at.strftime("%Y-%m-%d %H:%M"),
+                "status": cert.last_verification_status,
+                "certificate_code": cert.verification_code
+            }
+            for cert in recent_certificates
+        ]
 
         return {
-            "metrics": {
-                "total_certificates": total_certs,
-                "total_verified_certificates": total_verified_certs,
-                "total_students": total_students,
-                "pending_verifications": pending_verifications,
-                "courses_managed": courses_managed
-            },
+            "metrics": summary["metrics"],
+            "metrics_freshness": summary["freshness"],
             "recent_verifications": recent_verifications
         }
 
     except Exception as e:
+        db.session.rollback()
         print(f"Dashboard error: {str(e)}")
         import traceback
         print(f"Traceback: {traceback.format_exc()}")
@@ -95,9 +71,37 @@ def dashboard_summary():
         }
     
 
+def runtime_stats():
+    """In-process counters for this worker (cache effectiveness, etc.)"""
+    return {
+        "verification_cache": verification_cache.stats(),
+        "verification_log_writer": verification_log_writer.stats(),
+        "import_jobs": job_queue.stats(),
+        "dashboard_metrics": dashboard_metrics.stats(),
+        "db_pool": db_pool.stats(),
+        "read_replicas": replica_router.stats(),
+        "asset_storage": asset_storage.stats(),
+        "qr_render_cache": qr_render_cache.stats(),
+        "signed_links": url_signer.stats(),
+        "certificate_tokens": certificate_tokens.stats(),
+        "revocations": revocation_list.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "abuse_detector": abuse_detector.stats(),
+        "google_drive": {
+            "oauth": drive_service.stats(),
+            "shared_drive": shared_drive_service.stats()
+        }
+    }
+
+
+@read_replica
 def certificates_table():
-    # Remove pagination parameters
-    all_certificates = Certificate.query.order_by(Certificate.issued_at.desc()).all()
+    """Certificates by issue date, newest first, one keyset page at a time (?limit=&cursor=)"""
+    query = Certificate.query.filter(*certificate_filters(Certificate))
+    page, next_cursor = keyset_paginate(
+        query, "certificates_table", Certificate.issued_at, Certificate.id,
+        limit=parse_limit(), cursor=request.args.get("cursor")
+    )
 
     data = [
         {
@@ -108,12 +112,13 @@ def certificates_table():
             "issued_at": cert.issued_at.strftime("%Y-%m-%d") if cert.issued_at else None,
             "student_id": cert.student_id
         }
-        for cert in all_certificates
+        for cert in page
     ]
 
     return {
         "certificates": data,
-        "count": len(data)
+        "count": len(data),
+        "next_cursor": next_cursor
     }
 
 # def certificates_table(page=1, per_page=10):
@@ -0,0 +1,38 @@
+from datetime import datetime
+from ..extensions import db
+from ..models.import_job import ImportJob
+
+
+def get_job(job_id):
+    job = db.session.get(ImportJob, job_id)
+    if not job:
+        return {"message": "Job not found"}, 404
+
+    # Throughput and ETA from the progress recorded so far
+    rows_per_sec = None
+    eta_seconds = None
+    if job.started_at:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+        if elapsed > 0 and job.processed_rows:
+            rows_per_sec = round(job.processed_rows / elapsed, 2)
+            if job.status == "running" and job.total_rows:
+                eta_seconds = round(max(job.total_rows - job.processed_rows, 0) / rows_per_sec, 1)
+
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "filename": job.filename,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "failed_rows": job.failed_rows,
+        "imported_rows": job.imported_rows,
+        "attempts": job.attempts,
+        "rows_per_sec": rows_per_sec,
+        "eta_seconds": eta_seconds,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "result": job.result,
+        "error": job.error
+    }
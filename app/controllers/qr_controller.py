@@ -0,0 +1,61 @@
+from flask import Response, request, jsonify, current_app
+from .verification_controller import lookup_certificate
+from ..utils.verification_cache import normalize_code
+from ..utils.qr_cache import qr_render_cache
+
+QR_MIMETYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml"
+}
+
+
+def _int_arg(name, default, low, high):
+    value = request.args.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+# ===================================
+# QR CODE (rendered on demand)
+# ===================================
+def certificate_qr(code, image_format=None):
+    """
+    The certificate's QR code rendered from its row, so nothing has to be
+    uploaded at issuance. Responses carry a strong ETag (a hash of the QR
+    contents and options) and are revalidated with If-None-Match without
+    rendering; rendered images are kept in a per-worker LRU.
+    """
+    image_format = (image_format or request.args.get("format") or "png").lower()
+    if image_format not in QR_MIMETYPES:
+        return jsonify({"error": "format must be png or svg"}), 400
+
+    try:
+        box_size = _int_arg("size", 10, 1, 40)
+        border = _int_arg("border", 4, 0, 16)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    entry = lookup_certificate(normalize_code(code))
+    if not entry:
+        return jsonify({"status": "INVALID", "message": "Certificate not found"}), 404
+
+    certificate = entry["certificate"]
+    etag = qr_render_cache.etag(certificate, image_format, box_size, border)
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        _, image = qr_render_cache.get(certificate, image_format, box_size, border)
+        response = Response(image, mimetype=QR_MIMETYPES[image_format])
+
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get("QR_CACHE_MAX_AGE", 86400)
+    return response
@@ -1,35 +1,73 @@
 from datetime import datetime
 from io import StringIO
-from flask import Response, request, jsonify
+from flask import Response, request, jsonify, current_app
 from ..models.student import Student
 from ..models.certificate import Certificate
 from ..extensions import db
+from ..utils.verification_cache import verification_cache
+from ..utils.student_import import read_student_rows, import_student_rows
+from ..utils.tabular_reader import ImportFileError
+from ..utils.job_queue import job_queue, async_requested
+from ..utils.dashboard_metrics import dashboard_metrics
+from ..utils.revocation_list import revocation_list
+from ..utils.pagination import keyset_filter, next_page, parse_limit, student_filters, PaginationError
+from ..utils.db_replicas import read_replica
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
 import csv
-import os
 
 # -------------------------
 # LIST STUDENTS (Paginated)
 # -------------------------
+@read_replica
 def list_students():
-    # Remove pagination parameters
-    query = Student.query.order_by(Student.created_at.desc())
-    
-    # Get all students
-    all_students = query.all()
+    """
+    Newest-first students, one keyset page at a time (?limit=&cursor=) with optional filters.
+    Certificate count and first verification code come from a grouped subquery
+    over the page's students, so the whole page is a single query.
+    """
+    try:
+        limit = parse_limit()
+        page_ids = keyset_filter(
+            db.session.query(Student.id).filter(*student_filters(Student)),
+            "students", Student.created_at, Student.id, request.args.get("cursor")
+        ).order_by(Student.created_at.desc(), Student.id.desc()).limit(limit + 1).subquery()
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    certificate_stats = (
+        db.session.query(
+            Certificate.student_id,
+            func.count(Certificate.id).label("certificate_count"),
+            func.min(Certificate.id).label("first_certificate_id")
+        )
+        .filter(Certificate.student_id.in_(select(page_ids.c.id)))
+        .group_by(Certificate.student_id)
+        .subquery()
+    )
+    first_certificate = aliased(Certificate)
+
+    rows = (
+        db.session.query(Student, certificate_stats.c.certificate_count, first_certificate.verification_code)
+        .join(page_ids, page_ids.c.id == Student.id)
+        .outerjoin(certificate_stats, certificate_stats.c.student_id == Student.id)
+        .outerjoin(first_certificate, first_certificate.id == certificate_stats.c.first_certificate_id)
+        .order_by(Student.created_at.desc(), Student.id.desc())
+        .all()
+    )
+    rows, next_cursor = next_page(rows, "students", Student.created_at, limit, entity=lambda row: row[0])
 
     students = []
-    for s in all_students:
+    for s, certificate_count, verification_code in rows:
         # Get student_id from first certificate if exists
         student_id = None
-        if s.certificates:
-            # Take the verification code from the first certificate
-            verification_code = s.certificates[0].verification_code
+        if verification_code:
             # Remove "SHSL/" prefix if present
             if verification_code.startswith("SHSL/"):
                 student_id = verification_code[5:]  # "25B/DM/0027"
             else:
                 student_id = verification_code
-        
+
         students.append({
             "id": s.id,
             "student_id": student_id,  # Add the extracted student_id
@@ -39,15 +77,16 @@ def list_students():
             "phone_number": s.phone_number,
             "course_name": s.course_name,
             "year_of_study": s.year_of_study,
-            "status": "Certified" if s.certificates else "Not Certified",
+            "status": "Certified" if certificate_count else "Not Certified",
             "created_at": s.created_at.strftime("%Y-%m-%d %H:%M:%S") if s.created_at else None,
-            "certificate_count": len(s.certificates) if s.certificates else 0,
-            "verification_code": s.certificates[0].verification_code if s.certificates else None  # Optional: include full code
+            "certificate_count": certificate_count or 0,
+            "verification_code": verification_code  # Optional: include full code
         })
 
     return jsonify({
         "students": students,
-        "count": len(students)
+        "count": len(students),
+        "next_cursor": next_cursor
     })
 
 # def list_students():
@@ -134,6 +173,7 @@ def create_student():
         )
         
         db.session.add(student)
+        dashboard_metrics.bump(students=1)
         db.session.commit()
 
         return {
@@ -203,8 +243,21 @@ def delete_student(student_id):
     if not student:
         return {"message": "Student not found"}, 404
 
+    # Certificates are removed by the cascade; record them as deleted like
+    # delete_certificate does, so their signed tokens stop verifying, and
+    # drop their cached results too
+    verification_codes = [c.verification_code for c in student.certificates]
+    for cert in student.certificates:
+        revocation_list.record(cert.verification_code, "delete", certificate_id=cert.id)
+
+    dashboard_metrics.certificates_removed(student.certificates)
+    dashboard_metrics.bump(students=-1)
     db.session.delete(student)
     db.session.commit()
+
+    verification_cache.invalidate(*verification_codes)
+    if verification_codes:
+        revocation_list.refresh(force=True)
     return {"message": "Student deleted successfully"}
 
 
@@ -216,32 +269,23 @@ def import_students_csv():
     if not file:
         return {"message": "No CSV file provided"}, 400
 
-    # Save uploaded CSV temporarily
-    filepath = os.path.join("tmp", file.filename)
-    os.makedirs("tmp", exist_ok=True)
-    file.save(filepath)
-
-    created_count = 0
-    with open(filepath, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            student = Student(
-                first_name=row.get("first_name"),
-                last_name=row.get("last_name"),
-                email=row.get("email"),
-                phone_number=row.get("phone_number"),
-                course_name=row.get("course_name"),
-                year_of_study=row.get("year_of_study"),
-                program_start_date=row.get("program_start_date"),
-                program_end_date=row.get("program_end_date"),
-                photo_url=row.get("photo_url")
-            )
-            db.session.add(student)
-            created_count += 1
-        db.session.commit()
+    # Large files: hand off to a background job and let the client poll /jobs/<id>
+    if async_requested():
+        job = job_queue.enqueue("students", file)
+        return {
+            "message": "Import queued",
+            "job_id": job.id,
+            "status_url": f"/jobs/{job.id}"
+        }, 202
 
-    os.remove(filepath)
-    return {"message": f"{created_count} students imported successfully"}
+    try:
+        result = import_student_rows(
+            read_student_rows(file), chunk_size=current_app.config.get("IMPORT_CHUNK_SIZE", 500)
+        )
+    except ImportFileError as e:
+        db.session.rollback()
+        return {"message": str(e)}, 400
+    return {"message": result["message"]}
 
 
 
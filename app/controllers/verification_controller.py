@@ -1,49 +1,108 @@
+from contextlib import nullcontext
 from ..models.certificate import Certificate
-from ..models.verification_log import VerificationLog
 from ..extensions import db
-from flask import request
-from datetime import datetime
+from ..utils.verification_cache import verification_cache, normalize_code, CACHE_MISS
+from ..utils.verification_log_writer import verification_log_writer
+from ..utils.db_replicas import read_replica, replica_router, use_primary
+from ..utils.signing import url_signer
+from ..utils.certificate_tokens import certificate_tokens
+from ..utils.revocation_list import revocation_list
+from ..utils.abuse_detector import abuse_detector
+from flask import request, current_app
 
 
+def serialize_certificate(cert):
+    """Public verification payload for a certificate"""
+    return {
+        "student_name": f"{cert.student_first_name} {cert.student_last_name}",
+        "course_name": cert.course_name,
+        "verification_code": cert.verification_code,
+        "issued_at": cert.issued_at.strftime("%Y-%m-%d") if cert.issued_at else None,
+        "qr_code_url": cert.qr_code_url,
+        "year_of_study": cert.year_of_study,
+        "course_summary": cert.course_summary
+    }
 
+
+def _cache_fill_source():
+    """
+    Where cache-filling reads go. For a while after this worker invalidated
+    entries a replica within its lag bound can still return the old row,
+    which would then be cached for the full TTL, so until the lag bound
+    (plus one health check) has passed the reads go to the primary.
+    """
+    if replica_router.enabled and verification_cache.invalidated_within(
+        replica_router.max_lag + replica_router.check_interval
+    ):
+        return use_primary()
+    return nullcontext()
+
+
+@read_replica
+def lookup_certificate(code):
+    """
+    Read-through lookup used by the public verify routes.
+    Returns {"certificate_id", "certificate"} for a valid code or None.
+    """
+    cached = verification_cache.get(code)
+    if cached is not CACHE_MISS:
+        return cached
+
+    generation = verification_cache.generation
+    with _cache_fill_source():
+        cert = Certificate.query.filter_by(verification_code=code).first()
+
+    entry = None
+    if cert:
+        entry = {
+            "certificate_id": cert.id,
+            "certificate": serialize_certificate(cert)
+        }
+
+    verification_cache.set(code, entry, generation=generation)
+    return entry
+
+
+@read_replica
 def verify_certificate(code):
     try:
-        # FIX: Remove is_active filter since it doesn't exist in your model
-        cert = Certificate.query.filter_by(
-            verification_code=code
-            # Remove: is_active=True - this field doesn't exist in your Certificate model
-        ).first()
+        code = normalize_code(code)
+        entry = lookup_certificate(code)
+
+        # Bloom filter first: only codes that were ever revoked cost a query
+        revocation = None
+        if entry and revocation_list.might_be_revoked(code):
+            revocation = revocation_list.check(code)
 
         ip = request.remote_addr
-        status = "VALID" if cert else "INVALID"
+        status = "REVOKED" if revocation else "VALID" if entry else "INVALID"
 
-        # Log attempt
-        log = VerificationLog(
-            certificate_id=cert.id if cert else None,
-            verified_at=datetime.utcnow(),
+        # Log attempt (queued for the background writer, not committed here)
+        verification_log_writer.record(
+            certificate_id=entry["certificate_id"] if entry else None,
             ip_address=ip,
             status=status
         )
-        db.session.add(log)
-        db.session.commit()
+        abuse_detector.observe(code, status)
 
-        if not cert:
+        if not entry:
             return {
                 "status": "INVALID",
                 "message": "Certificate not found"
             }
 
+        if revocation:
+            return {
+                "status": "REVOKED",
+                "message": "Certificate has been revoked",
+                "revoked_at": revocation["revoked_at"],
+                "reason": revocation["reason"],
+                "certificate": dict(entry["certificate"])
+            }
+
         return {
             "status": "VALID",
-            "certificate": {
-                "student_name": f"{cert.student_first_name} {cert.student_last_name}",
-                "course_name": cert.course_name,
-                "verification_code": cert.verification_code,
-                "issued_at": cert.issued_at.strftime("%Y-%m-%d") if cert.issued_at else None,
-                "qr_code_url": cert.qr_code_url,
-                "year_of_study": cert.year_of_study,
-                "course_summary": cert.course_summary
-            }
+            "certificate": dict(entry["certificate"])
         }
 
     except Exception as e:
@@ -57,6 +116,186 @@ def verify_certificate(code):
     
 
 
+def verify_signed_link(token):
+    """
+    Verify a compact QR link (<code>.<signature>). The signature is checked
+    first, so forged or garbled links never reach the cache or database.
+    """
+    code = url_signer.unsign(token)
+    if code is None:
+        return {
+            "status": "INVALID",
+            "message": "Invalid or tampered verification link"
+        }
+    return verify_certificate(code)
+
+
+def verify_certificate_token(token, name=None):
+    """
+    Verify a signed certificate token offline: the signature and claims are
+    checked in memory and nothing is looked up or logged. Only a token whose
+    code is in the revocation filter is confirmed against the certificate
+    (from the verification cache where possible). The filter is kept
+    current by the revocation list, so it is refreshed (throttled) first;
+    until it has loaded, every token is confirmed.
+    """
+    revocation_list.refresh()
+    result = certificate_tokens.verify(token, name=name)
+    if not result["valid"]:
+        return {
+            "status": "INVALID",
+            "message": "Invalid or tampered certificate token"
+        }
+
+    claims = result["claims"]
+    if result["possibly_revoked"] or revocation_list.cursor is None:
+        entry = lookup_certificate(claims["sub"])
+        if not entry:
+            return {
+                "status": "REVOKED",
+                "message": "Certificate has been revoked"
+            }
+        revocation = revocation_list.check(claims["sub"])
+        if revocation:
+            return {
+                "status": "REVOKED",
+                "message": "Certificate has been revoked",
+                "revoked_at": revocation["revoked_at"],
+                "reason": revocation["reason"]
+            }
+        if not certificate_tokens.matches(claims, entry["certificate"]):
+            return {
+                "status": "REVOKED",
+                "message": "Certificate was reissued; this token is no longer valid"
+            }
+
+    if result["name_match"] is False:
+        return {
+            "status": "INVALID",
+            "message": "Name does not match the certificate",
+            "name_match": False
+        }
+
+    return {
+        "status": "VALID",
+        "certificate": {
+            "verification_code": claims["sub"],
+            "course_name": claims["crs"],
+            "issued_at": claims["idt"]
+        },
+        "name_match": result["name_match"]
+    }
+
+
+def bulk_codes_error(codes):
+    """Why `codes` cannot be bulk-verified, or None"""
+    if not isinstance(codes, list) or not all(isinstance(c, str) for c in codes):
+        return "certificate_codes must be a list of strings"
+
+    max_codes = current_app.config.get("BULK_VERIFY_MAX_CODES", 5000)
+    if len(codes) > max_codes:
+        return f"At most {max_codes} certificate codes can be verified per request"
+    return None
+
+
+@read_replica
+def _verify_chunk(codes):
+    """
+    Verify one chunk of a bulk request: cache lookups first, one IN (...)
+    query for the rest, and one multi-row insert for the verification logs.
+    """
+    normalized = [normalize_code(c) for c in codes]
+
+    # Resolve each distinct code once, from the cache where possible
+    entries = {}
+    misses = []
+    for code in dict.fromkeys(normalized):
+        cached = verification_cache.get(code)
+        if cached is CACHE_MISS:
+            misses.append(code)
+        else:
+            entries[code] = cached
+
+    if misses:
+        generation = verification_cache.generation
+        with _cache_fill_source():
+            found = Certificate.query.filter(Certificate.verification_code.in_(misses)).all()
+        by_code = {cert.verification_code: cert for cert in found}
+
+        for code in misses:
+            cert = by_code.get(code)
+            entry = None
+            if cert:
+                entry = {
+                    "certificate_id": cert.id,
+                    "certificate": serialize_certificate(cert)
+                }
+            entries[code] = entry
+            verification_cache.set(code, entry, generation=generation)
+
+    # One query for the codes the revocation filter cannot rule out
+    revoked = revocation_list.check_many([
+        code for code, entry in entries.items() if entry and revocation_list.might_be_revoked(code)
+    ])
+
+    results = []
+    attempts = []
+    for original, code in zip(codes, normalized):
+        entry = entries.get(code)
+        if entry and code in revoked:
+            attempts.append((entry["certificate_id"], "REVOKED"))
+            results.append({
+                "certificate_code": original,
+                "status": "REVOKED",
+                "message": "Certificate has been revoked",
+                "revoked_at": revoked[code]["revoked_at"],
+                "reason": revoked[code]["reason"],
+                "certificate": dict(entry["certificate"])
+            })
+        elif entry:
+            attempts.append((entry["certificate_id"], "VALID"))
+            results.append({
+                "certificate_code": original,
+                "status": "VALID",
+                "certificate": dict(entry["certificate"])
+            })
+        else:
+            attempts.append((None, "INVALID"))
+            results.append({
+                "certificate_code": original,
+                "status": "INVALID",
+                "message": "Certificate not found"
+            })
+
+    verification_log_writer.record_many(attempts, ip_address=request.remote_addr)
+    abuse_detector.observe_many([(code, status) for code, (_, status) in zip(normalized, attempts)], bulk=True)
+    return results
+
+
+def iter_verify_certificates_bulk(codes):
+    """
+    Results for `codes` (already checked with bulk_codes_error), in order,
+    one list per BULK_VERIFY_CHUNK_SIZE codes. Each chunk is looked up,
+    logged and handed out before the next one is read, so a streamed
+    response starts with the first chunk and never holds the whole batch.
+    """
+    chunk_size = max(1, current_app.config.get("BULK_VERIFY_CHUNK_SIZE", 500))
+    for start in range(0, len(codes), chunk_size):
+        yield _verify_chunk(codes[start:start + chunk_size])
+
+
+def verify_certificates_bulk(codes):
+    """
+    Verify many codes at once.
+    Returns (results, error) where results keep the order of `codes`.
+    """
+    error = bulk_codes_error(codes)
+    if error:
+        return None, error
+    return [result for chunk in iter_verify_certificates_bulk(codes) for result in chunk], None
+
+
+
 
 
 
@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from .utils.db_replicas import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession sends reads from @read_replica controllers to a replica
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
@@ -3,6 +3,20 @@ from ..extensions import db
 
 class Certificate(db.Model):
     __tablename__ = "certificates"
+    __table_args__ = (
+        # Keyset pagination for the certificate listings
+        db.Index("ix_certificates_created_at_id", "created_at", "id"),
+        db.Index("ix_certificates_issued_at_id", "issued_at", "id"),
+        db.Index("ix_certificates_course_name", "course_name"),
+        db.Index("ix_certificates_student_id", "student_id"),
+        # Prefix LIKE on certificate numbers (SHSL/25B/DA/%)
+        db.Index(
+            "ix_certificates_verification_code_pattern", "verification_code",
+            postgresql_ops={"verification_code": "text_pattern_ops"}
+        ),
+        # lower(student_first_name|student_last_name) text_pattern_ops indexes
+        # for the name filters are created in the migration only
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -16,8 +30,19 @@ class Certificate(db.Model):
     
     qr_code_url = db.Column(db.String(255), nullable=True)
 
+    # Signed token for offline verification (see utils/certificate_tokens.py)
+    verification_token = db.Column(db.Text, nullable=True)
+
     issued_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    # Set while the certificate is revoked (see utils/revocation_list.py)
+    revoked_at = db.Column(db.DateTime, nullable=True, index=True)
+    revocation_reason = db.Column(db.String(255), nullable=True)
+
+    # Latest verification attempt, maintained by the verification log writer
+    last_verified_at = db.Column(db.DateTime, nullable=True, index=True)
+    last_verification_status = db.Column(db.String(20), nullable=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
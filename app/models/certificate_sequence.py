@@ -0,0 +1,17 @@
+from datetime import datetime
+from ..extensions import db
+
+class CertificateSequence(db.Model):
+    """Last certificate number handed out per SHSL/<yy><A|B>/<course code> prefix"""
+    __tablename__ = "certificate_sequences"
+
+    prefix = db.Column(db.String(50), primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    def __repr__(self):
+        return f"<CertificateSequence {self.prefix} {self.last_value}>"
@@ -0,0 +1,19 @@
+from datetime import datetime
+from ..extensions import db
+
+class DashboardCounter(db.Model):
+    """
+    Running total behind a dashboard metric (certificates, students, ...,
+    plus one `course:<name>` row per course), bumped in the same transaction
+    as the write it counts and periodically reconciled against the tables.
+    """
+    __tablename__ = "dashboard_counters"
+
+    name = db.Column(db.String(300), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    reconciled_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<DashboardCounter {self.name} {self.value}>"
@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+from ..extensions import db
+
+class ImportJob(db.Model):
+    """A bulk import processed in the background; polled through /jobs/<id>"""
+    __tablename__ = "import_jobs"
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = db.Column(db.String(20), nullable=False)  # certificates / students
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued / running / completed / failed
+    filename = db.Column(db.String(255), nullable=True)
+    file_path = db.Column(db.String(512), nullable=True)
+
+    total_rows = db.Column(db.Integer, nullable=True)
+    processed_rows = db.Column(db.Integer, nullable=False, default=0)
+    failed_rows = db.Column(db.Integer, nullable=False, default=0)
+    imported_rows = db.Column(db.Integer, nullable=False, default=0)
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # Heartbeat: bumped on every progress update while running
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    def __repr__(self):
+        return f"<ImportJob {self.id} {self.kind} {self.status}>"
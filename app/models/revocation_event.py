@@ -0,0 +1,24 @@
+from datetime import datetime
+from ..extensions import db
+
+class RevocationEvent(db.Model):
+    """
+    Append-only log of changes that invalidate a certificate or its signed
+    token: revoke / reinstate / delete / reissue (code, name or course
+    edited). Workers and partners follow it by id, re-reading recent events
+    by created_at, to keep their revocation lists current.
+    """
+    __tablename__ = "revocation_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Not a foreign key: deleted certificates keep their events
+    certificate_id = db.Column(db.Integer, nullable=True)
+    verification_code = db.Column(db.String(50), nullable=False, index=True)
+    action = db.Column(db.String(20), nullable=False)  # revoke / reinstate / delete / reissue
+    reason = db.Column(db.String(255), nullable=True)
+
+    # Indexed for the overlap re-read (see utils/revocation_list.py)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<RevocationEvent {self.id} {self.action} {self.verification_code}>"
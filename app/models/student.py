@@ -3,6 +3,14 @@ from ..extensions import db
 
 class Student(db.Model):
     __tablename__ = "students"
+    __table_args__ = (
+        # Exact-match lookup done by the certificate import
+        db.Index("ix_students_name_course", "first_name", "last_name", "course_name"),
+        # Keyset pagination for the student listing
+        db.Index("ix_students_created_at_id", "created_at", "id"),
+        # lower(first_name|last_name) text_pattern_ops indexes for the
+        # name filter are created in the migration only
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(100), nullable=False)
@@ -3,12 +3,19 @@ from datetime import datetime
 
 class VerificationLog(db.Model):
     __tablename__ = 'verification_logs'
+    __table_args__ = (
+        db.Index("ix_verification_logs_certificate_id_verified_at", "certificate_id", "verified_at"),
+        db.Index("ix_verification_logs_verified_at", "verified_at"),
+        # COUNT(DISTINCT certificate_id) WHERE status = 'VALID' as an index-only scan
+        db.Index("ix_verification_logs_status_certificate_id", "status", "certificate_id"),
+        db.Index("ix_verification_logs_ip_address_verified_at", "ip_address", "verified_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     certificate_id = db.Column(db.Integer, db.ForeignKey('certificates.id'))
     verified_at = db.Column(db.DateTime, default=datetime.utcnow)
     ip_address = db.Column(db.String(50))
-    status = db.Column(db.String(20))  # VALID / INVALID / EXPIRED
+    status = db.Column(db.String(20))  # VALID / INVALID / REVOKED / EXPIRED
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -0,0 +1,24 @@
+from flask import Blueprint
+from ..controllers.asset_controller import serve_asset
+from flasgger import swag_from
+
+
+asset_bp = Blueprint("asset_bp", __name__, url_prefix="/assets")
+
+
+@asset_bp.get("/<string:key>")
+@swag_from({
+    "tags": ["Assets"],
+    "summary": "Get a stored asset",
+    "description": "Serves QR codes and PDFs stored with ASSET_STORAGE=local. Keys are content hashes, so responses are cacheable forever (Cache-Control: immutable) and revalidate with If-None-Match.",
+    "parameters": [
+        {"name": "key", "in": "path", "type": "string", "required": True}
+    ],
+    "responses": {
+        "200": {"description": "Asset content"},
+        "304": {"description": "Not modified"},
+        "404": {"description": "Asset not found or assets are not stored locally"}
+    }
+})
+def get_asset(key):
+    return serve_asset(key)
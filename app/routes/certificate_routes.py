@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from ..controllers.certificate_controller import create_certificate, list_certificates, update_certificate, delete_certificate, import_certificates_csv, download_sample_certificate_file
+from ..controllers.certificate_controller import revoke_certificate, reinstate_certificate
 from flasgger import swag_from
 
 
@@ -55,13 +56,19 @@ def create_cert():
 @swag_from({
     "tags": ["Certificates"],
     "summary": "List certificates",
-    "description": "Returns a paginated list of certificates.",
+    "description": "Returns certificates newest first, one page at a time. Pass next_cursor from the response as cursor to get the next page; it is null on the last page.",
     "parameters": [
-        {"in": "query", "name": "page", "type": "integer", "default": 1},
-        {"in": "query", "name": "limit", "type": "integer", "default": 10}
+        {"in": "query", "name": "limit", "type": "integer", "default": 50, "description": "Page size (capped at PAGE_SIZE_MAX)"},
+        {"in": "query", "name": "cursor", "type": "string", "description": "next_cursor from the previous page"},
+        {"in": "query", "name": "course", "type": "string", "description": "Exact course name"},
+        {"in": "query", "name": "year", "type": "string", "description": "Year of study"},
+        {"in": "query", "name": "issued_from", "type": "string", "format": "date", "description": "Issued on or after (YYYY-MM-DD)"},
+        {"in": "query", "name": "issued_to", "type": "string", "format": "date", "description": "Issued on or before (YYYY-MM-DD)"},
+        {"in": "query", "name": "name", "type": "string", "description": "Prefix of the student's first or last name"}
     ],
     "responses": {
-        "200": {"description": "List of certificates returned successfully"}
+        "200": {"description": "List of certificates returned successfully"},
+        "400": {"description": "Invalid cursor, limit or filter"}
     }
 })
 def list_cert():
@@ -117,6 +124,47 @@ def delete_cert(code):
     return delete_certificate(code)
 
 
+@certificate_bp.post("/certificates/<path:code>/revoke")
+@swag_from({
+    "tags": ["Certificates"],
+    "summary": "Revoke a certificate",
+    "description": "Marks a certificate as revoked. It then verifies as REVOKED (also through its QR link and signed token) and appears in GET /certificate/revocations.",
+    "parameters": [
+        {"in": "path", "name": "code", "type": "string", "required": True, "description": "Certificate verification code"},
+        {
+            "in": "body",
+            "name": "body",
+            "required": False,
+            "schema": {"type": "object", "properties": {"reason": {"type": "string"}}}
+        }
+    ],
+    "responses": {
+        "200": {"description": "Certificate revoked"},
+        "404": {"description": "Certificate not found"},
+        "409": {"description": "Certificate is already revoked"}
+    }
+})
+def revoke_cert(code):
+    return revoke_certificate(code)
+
+
+@certificate_bp.post("/certificates/<path:code>/reinstate")
+@swag_from({
+    "tags": ["Certificates"],
+    "summary": "Reinstate a revoked certificate",
+    "parameters": [
+        {"in": "path", "name": "code", "type": "string", "required": True, "description": "Certificate verification code"}
+    ],
+    "responses": {
+        "200": {"description": "Certificate reinstated"},
+        "404": {"description": "Certificate not found"},
+        "409": {"description": "Certificate is not revoked"}
+    }
+})
+def reinstate_cert(code):
+    return reinstate_certificate(code)
+
+
 @certificate_bp.post("/certificates/import")
 @swag_from({
     "tags": ["Certificates"],
@@ -130,21 +178,31 @@ def delete_cert(code):
             "type": "file", 
             "required": True,
             "description": "CSV or Excel file with columns: first_name, last_name, course_name, course_summary, year_of_study, issuance_date"
+        },
+        {
+            "in": "query",
+            "name": "async",
+            "type": "boolean",
+            "required": False,
+            "description": "Process the file in the background and return 202 with a job_id to poll at /jobs/<job_id>"
         }
     ],
     "responses": {
         "200": {
-            "description": "File processed successfully",
+            "description": "File processed; rows of a chunk that could not be written are counted in failed and listed in errors, the rest stay imported",
             "schema": {
                 "type": "object",
                 "properties": {
                     "message": {"type": "string"},
                     "imported": {"type": "integer"},
+                    "failed": {"type": "integer"},
+                    "failed_chunks": {"type": "integer"},
                     "errors": {"type": "array"},
                     "total_rows": {"type": "integer"}
                 }
             }
         },
+        "202": {"description": "Import queued (async=true); poll status_url for progress"},
         "400": {"description": "File not provided or invalid format"},
         "500": {"description": "Server error processing file"}
     }
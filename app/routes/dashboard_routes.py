@@ -1,8 +1,11 @@
 from flask import Blueprint, jsonify, request, abort
-from ..controllers.dashboard_controller import dashboard_summary, certificates_table
+from ..controllers.dashboard_controller import dashboard_summary, certificates_table, runtime_stats
 from flasgger import swag_from
+from ..utils.pagination import PaginationError
 from ..extensions import db
 from ..models.certificate import Certificate
+from ..utils.abuse_detector import abuse_detector
+from ..utils.auth import require_role
 
 
 
@@ -12,7 +15,7 @@ dashboard_bp = Blueprint("dashboard_bp", __name__, url_prefix="/dashboard")
 @swag_from({
     "tags": ["Dashboard"],
     "summary": "Get dashboard summary",
-    "description": "Returns dashboard metrics such as certificate counts, verifications, etc.",
+    "description": "Returns dashboard metrics such as certificate counts, verifications, etc. Metrics are read from counters maintained on every write; metrics_freshness gives when they last changed and when they were last reconciled against the tables.",
     "responses": {
         "200": {
             "description": "Dashboard summary retrieved successfully"
@@ -23,34 +26,84 @@ def summary():
     return jsonify(dashboard_summary())
 
 
+@dashboard_bp.get("/runtime-stats")
+@swag_from({
+    "tags": ["Dashboard"],
+    "summary": "Get runtime stats",
+    "description": "Returns in-process counters for the worker that served the request, such as verification cache hits and misses and database pool checkout waits and saturation.",
+    "responses": {
+        "200": {"description": "Runtime stats retrieved successfully"}
+    }
+})
+def stats():
+    return jsonify(runtime_stats())
+
+
+@dashboard_bp.get("/abuse")
+@swag_from({
+    "tags": ["Dashboard"],
+    "summary": "Get blocked verification clients",
+    "description": "Returns the addresses this worker currently blocks from the verify routes (sequential code scans, INVALID-heavy traffic), why, and for how long, plus recent INVALID-ratio alerts per code prefix. Admins only.",
+    "security": [{"Bearer": []}],
+    "responses": {
+        "200": {"description": "Abuse detector state retrieved successfully"},
+        "401": {"description": "Missing or invalid token"},
+        "403": {"description": "Not an admin"}
+    }
+})
+@require_role(["admin"])
+def abuse():
+    return jsonify(abuse_detector.report())
+
+
+@dashboard_bp.delete("/abuse/blocked/<ip>")
+@swag_from({
+    "tags": ["Dashboard"],
+    "summary": "Unblock a verification client",
+    "description": "Lifts the block on an address and forgets its recent history, on the worker that serves the request. Admins only.",
+    "security": [{"Bearer": []}],
+    "parameters": [
+        {"name": "ip", "in": "path", "type": "string", "required": True}
+    ],
+    "responses": {
+        "200": {"description": "Address unblocked"},
+        "401": {"description": "Missing or invalid token"},
+        "403": {"description": "Not an admin"},
+        "404": {"description": "Address is not blocked"}
+    }
+})
+@require_role(["admin"])
+def unblock(ip):
+    if not abuse_detector.unblock(ip):
+        abort(404, description="Address is not blocked")
+    return jsonify({"message": f"{ip} unblocked"})
+
+
 
 @dashboard_bp.get("/certificates")
 @swag_from({
     "tags": ["Dashboard"],
     "summary": "Get certificates table",
-    "description": "Returns paginated list of certificates with edit/delete IDs",
+    "description": "Returns certificates by issue date, newest first, with edit/delete IDs. Pass next_cursor from the response as cursor to get the next page; it is null on the last page.",
     "parameters": [
-        {
-            "name": "page",
-            "in": "query",
-            "type": "integer",
-            "required": False,
-            "default": 1
-        },
-        {
-            "name": "per_page",
-            "in": "query",
-            "type": "integer",
-            "required": False,
-            "default": 10
-        }
+        {"in": "query", "name": "limit", "type": "integer", "default": 50, "description": "Page size (capped at PAGE_SIZE_MAX)"},
+        {"in": "query", "name": "cursor", "type": "string", "description": "next_cursor from the previous page"},
+        {"in": "query", "name": "course", "type": "string", "description": "Exact course name"},
+        {"in": "query", "name": "year", "type": "string", "description": "Year of study"},
+        {"in": "query", "name": "issued_from", "type": "string", "format": "date", "description": "Issued on or after (YYYY-MM-DD)"},
+        {"in": "query", "name": "issued_to", "type": "string", "format": "date", "description": "Issued on or before (YYYY-MM-DD)"},
+        {"in": "query", "name": "name", "type": "string", "description": "Prefix of the student's first or last name"}
     ],
     "responses": {
-        "200": {"description": "Paginated certificates retrieved successfully"}
+        "200": {"description": "Paginated certificates retrieved successfully"},
+        "400": {"description": "Invalid cursor, limit or filter"}
     }
 })
 def certificates():
-    return jsonify(certificates_table())
+    try:
+        return jsonify(certificates_table())
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
 
 
 @dashboard_bp.put("/certificate/<path:code>")
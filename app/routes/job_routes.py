@@ -0,0 +1,23 @@
+from flask import Blueprint
+from ..controllers.job_controller import get_job
+from flasgger import swag_from
+
+
+job_bp = Blueprint("job_bp", __name__, url_prefix="/jobs")
+
+
+@job_bp.get("/<string:job_id>")
+@swag_from({
+    "tags": ["Import Jobs"],
+    "summary": "Get import job status",
+    "description": "Returns the status and progress of a background import started with ?async=true, including rows/sec and an ETA while it runs, and the import summary once completed.",
+    "parameters": [
+        {"name": "job_id", "in": "path", "type": "string", "required": True}
+    ],
+    "responses": {
+        "200": {"description": "Job status retrieved successfully"},
+        "404": {"description": "Job not found"}
+    }
+})
+def job_status(job_id):
+    return get_job(job_id)
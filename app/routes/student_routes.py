@@ -10,13 +10,18 @@ student_bp = Blueprint("student_bp", __name__, url_prefix="/students")
 @swag_from({
     "tags": ["Student Management"],
     "summary": "List students",
-    "description": "Returns a paginated list of students with certification status.",
+    "description": "Returns students newest first with certification status, one page at a time. Pass next_cursor from the response as cursor to get the next page; it is null on the last page.",
     "parameters": [
-        {"in": "query", "name": "page", "type": "integer", "default": 1},
-        {"in": "query", "name": "limit", "type": "integer", "default": 10}
+        {"in": "query", "name": "limit", "type": "integer", "default": 50, "description": "Page size (capped at PAGE_SIZE_MAX)"},
+        {"in": "query", "name": "cursor", "type": "string", "description": "next_cursor from the previous page"},
+        {"in": "query", "name": "course", "type": "string", "description": "Exact course name"},
+        {"in": "query", "name": "year", "type": "string", "description": "Year of study"},
+        {"in": "query", "name": "name", "type": "string", "description": "Prefix of the first or last name"},
+        {"in": "query", "name": "status", "type": "string", "enum": ["certified", "not_certified"]}
     ],
     "responses": {
-        "200": {"description": "List of students returned successfully"}
+        "200": {"description": "List of students returned successfully"},
+        "400": {"description": "Invalid cursor, limit or filter"}
     }
 })
 def list_students_route():
@@ -103,10 +108,18 @@ def delete_student_route(student_id):
     "description": "Import students in bulk via a CSV file.",
     "consumes": ["multipart/form-data"],
     "parameters": [
-        {"in": "formData", "name": "file", "type": "file", "required": True}
+        {"in": "formData", "name": "file", "type": "file", "required": True},
+        {
+            "in": "query",
+            "name": "async",
+            "type": "boolean",
+            "required": False,
+            "description": "Process the file in the background and return 202 with a job_id to poll at /jobs/<job_id>"
+        }
     ],
     "responses": {
         "200": {"description": "Students imported successfully"},
+        "202": {"description": "Import queued (async=true); poll status_url for progress"},
         "400": {"description": "Invalid file"}
     }
 })
@@ -1,10 +1,24 @@
-from flask import Blueprint, jsonify, request 
-from ..controllers.verification_controller import verify_certificate
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from ..controllers.verification_controller import (
+    verify_certificate, verify_certificates_bulk, verify_signed_link, verify_certificate_token,
+    bulk_codes_error, iter_verify_certificates_bulk
+)
+from ..utils.certificate_tokens import certificate_tokens
+from ..utils.revocation_list import revocation_list
+from ..utils.rate_limiter import rate_limiter
+from ..utils.abuse_detector import abuse_detector
+from ..controllers.qr_controller import certificate_qr
+from ..extensions import db
 from flasgger import swag_from
+import hashlib
+import json
 
 
 verification_bp = Blueprint('verification_bp', __name__, url_prefix='/certificate')
 
+# Compact QR links live at the root to keep them short
+signed_link_bp = Blueprint('signed_link_bp', __name__)
+
 
 @verification_bp.get('/<path:code>')
 @swag_from({
@@ -25,6 +39,8 @@ verification_bp = Blueprint('verification_bp', __name__, url_prefix='/certificat
         "404": {"description": "Certificate not found"}
     }
 })
+@abuse_detector.guard
+@rate_limiter.limit("verify")
 def verify(code):
     try:
         result = verify_certificate(code)
@@ -35,6 +51,33 @@ def verify(code):
             "message": f"Internal server error: {str(e)}"
         }), 500
     
+@verification_bp.get('/<path:code>/qr.png', defaults={"image_format": "png"})
+@verification_bp.get('/<path:code>/qr.svg', defaults={"image_format": "svg"})
+@verification_bp.get('/<path:code>/qr', defaults={"image_format": None})
+@swag_from({
+    "tags": ["Verification"],
+    "summary": "Certificate QR code",
+    "description": "Renders the certificate's QR code on demand (qr.png, qr.svg, or qr?format=). Cacheable by clients and CDNs; revalidate with If-None-Match.",
+    "produces": ["image/png", "image/svg+xml"],
+    "parameters": [
+        {"name": "code", "in": "path", "type": "string", "required": True, "description": "Certificate verification code (can contain slashes)"},
+        {"name": "format", "in": "query", "type": "string", "enum": ["png", "svg"], "description": "Image format for /qr (default png)"},
+        {"name": "size", "in": "query", "type": "integer", "default": 10, "description": "Pixels per QR module, 1-40"},
+        {"name": "border", "in": "query", "type": "integer", "default": 4, "description": "Quiet zone in modules, 0-16"}
+    ],
+    "responses": {
+        "200": {"description": "QR image"},
+        "304": {"description": "Not modified"},
+        "400": {"description": "Invalid format, size or border"},
+        "404": {"description": "Certificate not found"}
+    }
+})
+@abuse_detector.guard
+@rate_limiter.limit("qr")
+def qr_code(code, image_format):
+    return certificate_qr(code, image_format)
+
+
 # @verification_bp.get('/<code>')
 # @swag_from({
 #     "tags": ["Verification"],
@@ -91,6 +134,8 @@ def verify(code):
         "404": {"description": "Certificate not found"}
     }
 })
+@abuse_detector.guard
+@rate_limiter.limit("verify")
 def verify_post():
     try:
         data = request.get_json()
@@ -106,6 +151,199 @@ def verify_post():
             "message": f"Internal server error: {str(e)}"
         }), 500
     
+# --- Bulk POST route (list of codes in JSON body) ---
+@verification_bp.post('/verify/bulk')
+@swag_from({
+    "tags": ["Verification"],
+    "summary": "Verify many certificates (POST)",
+    "description": "Checks a list of certificate codes in one request and returns a status per code, in the order given. "
+                   "Send `?format=ndjson` (or `Accept: application/x-ndjson`) to stream one JSON object per line.",
+    "parameters": [
+        {
+            "name": "body",
+            "in": "body",
+            "required": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "certificate_codes": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["certificate_codes"]
+            }
+        },
+        {
+            "name": "format",
+            "in": "query",
+            "type": "string",
+            "enum": ["json", "ndjson"],
+            "default": "json"
+        }
+    ],
+    "responses": {
+        "200": {"description": "Verification results returned"},
+        "400": {"description": "certificate_codes missing, not a list, or too long"}
+    }
+})
+@abuse_detector.guard
+@rate_limiter.limit("verify_bulk")
+def verify_bulk():
+    try:
+        data = request.get_json(silent=True)
+        if not data or "certificate_codes" not in data:
+            return jsonify({"error": "certificate_codes is required"}), 400
+
+        codes = data["certificate_codes"]
+        error = bulk_codes_error(codes)
+        if error:
+            return jsonify({"error": error}), 400
+
+        wants_ndjson = (
+            request.args.get("format", "").lower() == "ndjson"
+            or request.accept_mimetypes.best == "application/x-ndjson"
+        )
+        if wants_ndjson:
+            # Each chunk is verified as the client reads, not before the response starts
+            def generate():
+                try:
+                    for chunk in iter_verify_certificates_bulk(codes):
+                        yield "".join(json.dumps(result) + "\n" for result in chunk)
+                except Exception as e:
+                    # Headers are already sent; end the stream with an error line
+                    db.session.rollback()
+                    yield json.dumps({"status": "ERROR", "message": f"Verification failed: {str(e)}"}) + "\n"
+
+            return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+        results, _ = verify_certificates_bulk(codes)
+        valid = sum(1 for r in results if r["status"] == "VALID")
+        revoked = sum(1 for r in results if r["status"] == "REVOKED")
+        return jsonify({
+            "results": results,
+            "count": len(results),
+            "valid": valid,
+            "revoked": revoked,
+            "invalid": len(results) - valid - revoked
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "status": "ERROR",
+            "message": f"Internal server error: {str(e)}"
+        }), 500
+
+
+# --- Signed certificate token (checked without a database lookup) ---
+@verification_bp.get('/verify-token')
+@verification_bp.post('/verify-token')
+@swag_from({
+    "tags": ["Verification"],
+    "summary": "Verify a signed certificate token",
+    "description": "Checks the token issued with a certificate (`verification_token`) statelessly: the signature, code, course and issue date are verified in memory without a database lookup. "
+                   "Pass `name` to also check the holder's name against the hash in the token. Send the token in the JSON body or as `?token=`.",
+    "parameters": [
+        {
+            "name": "body",
+            "in": "body",
+            "required": False,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "token": {"type": "string"},
+                    "name": {"type": "string"}
+                }
+            }
+        },
+        {"name": "token", "in": "query", "type": "string", "description": "Token (GET)"},
+        {"name": "name", "in": "query", "type": "string", "description": "Holder's full name to check (GET)"}
+    ],
+    "responses": {
+        "200": {"description": "VALID, INVALID or REVOKED"},
+        "400": {"description": "Token not provided"}
+    }
+})
+@abuse_detector.guard
+@rate_limiter.limit("verify_token")
+def verify_token():
+    try:
+        data = request.get_json(silent=True) if request.method == "POST" else None
+        data = data or request.args
+        token = data.get("token")
+        if not token:
+            return jsonify({"error": "token is required"}), 400
+
+        result = verify_certificate_token(token, name=data.get("name"))
+        return jsonify(result)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "status": "ERROR",
+            "message": f"Internal server error: {str(e)}"
+        }), 500
+
+
+@verification_bp.get('/token-keys')
+@swag_from({
+    "tags": ["Verification"],
+    "summary": "Certificate token public keys",
+    "description": "JWKS of the Ed25519 keys that sign certificate tokens (CERT_TOKEN_ALGORITHM=EdDSA), for partners verifying tokens themselves. Empty with HS256.",
+    "responses": {
+        "200": {"description": "JSON Web Key Set"}
+    }
+})
+def token_keys():
+    response = jsonify(certificate_tokens.public_keys())
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response
+
+
+# --- Revocation list for partners (full, or changes since a cursor) ---
+@verification_bp.get('/revocations')
+@swag_from({
+    "tags": ["Verification"],
+    "summary": "Certificate revocation list",
+    "description": "Codes that no longer verify (revoked or deleted). Without `since` the full list; with `since` (the `cursor` of an earlier response) only the codes revoked or reinstated after it, so partners can keep a cached copy current. "
+                   "`encoding=front` front-codes the sorted lists: each entry is `<n>:<suffix>`, sharing n leading characters with the previous code.",
+    "parameters": [
+        {"name": "since", "in": "query", "type": "integer", "default": 0, "description": "Cursor from an earlier response"},
+        {"name": "encoding", "in": "query", "type": "string", "enum": ["plain", "front"], "default": "plain"}
+    ],
+    "responses": {
+        "200": {"description": "Revocation list or delta"},
+        "304": {"description": "Not modified"},
+        "400": {"description": "Invalid since or encoding"}
+    }
+})
+@rate_limiter.limit("revocations")
+def revocations():
+    try:
+        since = int(request.args.get("since", 0))
+    except ValueError:
+        return jsonify({"error": "since must be an integer"}), 400
+    encoding = request.args.get("encoding", "plain")
+    if since < 0 or encoding not in ("plain", "front"):
+        return jsonify({"error": "since must be >= 0 and encoding plain or front"}), 400
+
+    try:
+        result = revocation_list.published(since=since, encoding=encoding)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "status": "ERROR",
+            "message": f"Internal server error: {str(e)}"
+        }), 500
+
+    # Late commits can change the list without moving the cursor, so tag the content
+    digest = hashlib.sha256(json.dumps(result, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    etag = f"rev-{since}-{result['cursor']}-{digest}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(result)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={current_app.config.get('REVOCATION_LIST_MAX_AGE', 60)}"
+    return response
+
+
 # def verify_post():
 #     data = request.get_json()
 #     if not data or "certificate_code" not in data:
@@ -114,3 +352,31 @@ def verify_post():
 #     code = data["certificate_code"]
 #     result = verify_certificate(code)
 #     return jsonify(result)
+
+
+@signed_link_bp.get('/V/<path:token>')
+@signed_link_bp.get('/v/<path:token>')
+@swag_from({
+    "tags": ["Verification"],
+    "summary": "Verify a compact QR link",
+    "description": "Target of QR codes generated with QR_PAYLOAD=signed_url. The token is the certificate code and an HMAC signature (<code>.<signature>); links with a bad signature are rejected without a database lookup.",
+    "parameters": [
+        {"name": "token", "in": "path", "type": "string", "required": True, "description": "Signed certificate code"}
+    ],
+    "responses": {
+        "200": {"description": "Verification result returned"}
+    }
+})
+@abuse_detector.guard
+@rate_limiter.limit("verify")
+def verify_signed(token):
+    try:
+        result = verify_signed_link(token)
+        if isinstance(result, tuple):
+            return jsonify(result[0]), result[1]
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({
+            "status": "ERROR",
+            "message": f"Internal server error: {str(e)}"
+        }), 500
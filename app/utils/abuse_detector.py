@@ -0,0 +1,317 @@
+# utils/abuse_detector.py
+import functools
+import math
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from flask import jsonify
+from .rate_limiter import client_ip, rate_limiter
+
+_NUMBERED_CODE = re.compile(r"^(.*?)(\d+)$")
+
+
+def split_code(code):
+    """("SHSL/25B/DM/", 27) for SHSL/25B/DM/0027; (code, None) when it does not end in a number"""
+    match = _NUMBERED_CODE.match(code or "")
+    if not match:
+        return code, None
+    return match.group(1), int(match.group(2))
+
+
+class SlidingWindow:
+    """
+    Event count over the last `window` seconds, kept in `buckets` fixed
+    slots of a ring indexed by time: two small arrays, no per-event storage.
+    Accurate to one slot (window / buckets seconds).
+    """
+
+    __slots__ = ("slot_seconds", "counts", "stamps")
+
+    def __init__(self, window=300, buckets=10):
+        self.slot_seconds = window / buckets
+        self.counts = array("I", [0]) * buckets
+        self.stamps = array("q", [-1]) * buckets
+
+    def add(self, now, n=1):
+        slot = int(now // self.slot_seconds)
+        index = slot % len(self.counts)
+        if self.stamps[index] != slot:
+            self.stamps[index] = slot
+            self.counts[index] = 0
+        self.counts[index] += n
+
+    def total(self, now):
+        slot = int(now // self.slot_seconds)
+        size = len(self.counts)
+        return sum(count for count, stamp in zip(self.counts, self.stamps) if slot - stamp < size)
+
+
+class _Client:
+    __slots__ = ("requests", "invalid", "bulk_sequential", "recent")
+
+    def __init__(self, window, buckets, run_length):
+        self.requests = SlidingWindow(window, buckets)
+        self.invalid = SlidingWindow(window, buckets)
+        # Bulk-verified codes that sat next to another code of their prefix
+        self.bulk_sequential = SlidingWindow(window, buckets)
+        # (prefix, number) of the latest numbered codes tried
+        self.recent = deque(maxlen=run_length)
+
+
+class AbuseDetector:
+    """
+    Streaming detector for code enumeration on the verify routes.
+
+    The verify controllers report every attempted code with its outcome
+    (observe / observe_many). Per client IP it keeps sliding-window counts
+    of requests and INVALID results and the last `run_length` numbered
+    codes, and blocks the IP for `block_seconds` when either
+
+    - sequential scan: most consecutive attempts step through one prefix
+      a few numbers at a time (SHSL/25B/DM/0027, 0028, 0030 ...). Bulk
+      requests only feed their INVALID codes into this, since a vendor
+      checking a whole cohort sends consecutive VALID numbers,
+    - bulk scan: `bulk_scan_codes` or more bulk-verified codes in the
+      window, VALID or not, that sit within `max_step` of another code of
+      the same prefix in their request (harvesting a cohort through
+      /certificate/verify/bulk), or
+    - INVALID ratio: at least `min_requests` in the window and more than
+      `invalid_ratio` of them INVALID (guessing codes).
+
+    Per code prefix it keeps the same window counts and records an alert
+    when a prefix's INVALID ratio spikes, which catches a scan spread over
+    many addresses. The block list is a dict, so the verify routes check it
+    in O(1) (@abuse_detector.guard). Everything is per worker process;
+    partners using an API key and ABUSE_ALLOWLIST addresses are exempt.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.window = 300
+        self.buckets = 10
+        self.min_requests = 30
+        self.invalid_ratio = 0.5
+        self.run_length = 20
+        self.max_step = 5
+        self.bulk_scan_codes = 1000
+        self.block_seconds = 900
+        self.max_tracked = 50000
+        self.allowlist = set()
+
+        self._clients = OrderedDict()
+        self._prefixes = OrderedDict()
+        self._blocked = {}
+        self._alerted = {}
+        self._lock = threading.Lock()
+
+        self.observed = 0
+        self.blocks = 0
+        self.rejected = 0
+        self.events = deque(maxlen=100)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("ABUSE_DETECTION", self.enabled)
+        self.window = app.config.get("ABUSE_WINDOW_SECONDS", self.window)
+        self.min_requests = app.config.get("ABUSE_MIN_REQUESTS", self.min_requests)
+        self.invalid_ratio = app.config.get("ABUSE_INVALID_RATIO", self.invalid_ratio)
+        self.run_length = max(3, app.config.get("ABUSE_SEQUENTIAL_RUN", self.run_length))
+        self.max_step = app.config.get("ABUSE_SEQUENTIAL_MAX_STEP", self.max_step)
+        self.bulk_scan_codes = app.config.get("ABUSE_BULK_SCAN_CODES", self.bulk_scan_codes)
+        self.block_seconds = app.config.get("ABUSE_BLOCK_SECONDS", self.block_seconds)
+        self.max_tracked = app.config.get("ABUSE_MAX_TRACKED", self.max_tracked)
+        self.allowlist = set(app.config.get("ABUSE_ALLOWLIST", ()))
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._prefixes.clear()
+            self._blocked.clear()
+            self._alerted.clear()
+
+    # -------------------------
+    # BLOCK LIST
+    # -------------------------
+    def blocked_for(self, ip):
+        """Seconds `ip` stays blocked, 0 if it is not"""
+        entry = self._blocked.get(ip)
+        if entry is None:
+            return 0
+        remaining = entry[0] - time.monotonic()
+        if remaining <= 0:
+            self._blocked.pop(ip, None)
+            return 0
+        return remaining
+
+    def block(self, ip, reason, seconds=None):
+        seconds = seconds or self.block_seconds
+        self._blocked[ip] = (time.monotonic() + seconds, reason)
+        self.blocks += 1
+        self.events.append({"ip": ip, "reason": reason, "seconds": seconds, "at": time.time()})
+        print(f"Blocked {ip} from verification for {seconds}s: {reason}")
+
+    def unblock(self, ip):
+        with self._lock:
+            client = self._clients.pop(ip, None)
+        return self._blocked.pop(ip, None) is not None or client is not None
+
+    def guard(self, view):
+        """Decorator answering 403 to blocked clients before the view (and the rate limiter) runs"""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if self.enabled and self._blocked:
+                remaining = self.blocked_for(client_ip())
+                if remaining:
+                    self.rejected += 1
+                    response = jsonify({
+                        "status": "BLOCKED",
+                        "message": "Too many suspicious verification requests from this address",
+                        "retry_after": math.ceil(remaining)
+                    })
+                    response.status_code = 403
+                    response.headers["Retry-After"] = str(math.ceil(remaining))
+                    return response
+            return view(*args, **kwargs)
+        return wrapper
+
+    # -------------------------
+    # EVENTS
+    # -------------------------
+    def observe(self, code, status):
+        """Feed one verification attempt of the current request"""
+        self.observe_many([(code, status)])
+
+    def observe_many(self, attempts, bulk=False):
+        """
+        Feed (code, status) attempts of the current request. With `bulk`,
+        VALID and REVOKED codes still count as requests but are left out of
+        the sequential-scan check; the bulk-scan check counts them instead.
+        """
+        if not self.enabled or not attempts:
+            return
+        ip = client_ip()
+        if ip in self.allowlist or rate_limiter.api_client():
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self.observed += len(attempts)
+            client = self._clients.get(ip)
+            if client is None:
+                client = self._clients[ip] = _Client(self.window, self.buckets, self.run_length)
+                while len(self._clients) > self.max_tracked:
+                    self._clients.popitem(last=False)
+            else:
+                self._clients.move_to_end(ip)
+
+            invalid = 0
+            numbered = defaultdict(set)
+            for code, status in attempts:
+                failed = status == "INVALID"
+                invalid += failed
+                prefix, number = split_code(code)
+                if number is not None:
+                    if failed or not bulk:
+                        client.recent.append((prefix, number))
+                    if bulk:
+                        numbered[prefix].add(number)
+                    self._count_prefix(prefix, failed, now)
+            client.requests.add(now, len(attempts))
+            if invalid:
+                client.invalid.add(now, invalid)
+            sequential = self._sequential_codes(numbered) if numbered else 0
+            if sequential:
+                client.bulk_sequential.add(now, sequential)
+
+            reason = self._verdict(client, invalid, sequential, now)
+            if reason:
+                client.recent.clear()
+                self.block(ip, reason)
+
+    def _count_prefix(self, prefix, failed, now):
+        windows = self._prefixes.get(prefix)
+        if windows is None:
+            windows = self._prefixes[prefix] = (SlidingWindow(self.window, self.buckets), SlidingWindow(self.window, self.buckets))
+            # Guessed codes can invent prefixes; keep the table bounded
+            while len(self._prefixes) > 1000:
+                self._prefixes.popitem(last=False)
+        else:
+            self._prefixes.move_to_end(prefix)
+        windows[0].add(now)
+        if not failed:
+            return
+        windows[1].add(now)
+
+        requests, invalid = windows[0].total(now), windows[1].total(now)
+        if requests >= self.min_requests and invalid / requests > self.invalid_ratio:
+            if now - self._alerted.get(prefix, -math.inf) >= self.window:
+                self._alerted[prefix] = now
+                self.events.append({"prefix": prefix, "reason": f"INVALID ratio {invalid}/{requests}", "at": time.time()})
+                print(f"INVALID ratio spike for prefix {prefix!r}: {invalid} of {requests} in {self.window}s")
+
+    def _is_step(self, previous, current):
+        return previous[0] == current[0] and 1 <= abs(current[1] - previous[1]) <= self.max_step
+
+    def _sequential_codes(self, numbered):
+        """How many of the numbers (prefix -> set) lie within `max_step` of another one of their prefix"""
+        count = 0
+        for numbers in numbered.values():
+            ordered = sorted(numbers)
+            gaps = [current - previous <= self.max_step for previous, current in zip(ordered, ordered[1:])]
+            # A number counts when the gap before or after it is small
+            count += sum(1 for before, after in zip([False, *gaps], [*gaps, False]) if before or after)
+        return count
+
+    def _verdict(self, client, new_invalid, new_sequential, now):
+        recent = client.recent
+        # A scan ends in a small step, so most requests skip the full pass
+        if len(recent) == recent.maxlen and self._is_step(recent[-2], recent[-1]):
+            codes = list(recent)
+            steps = sum(1 for previous, current in zip(codes, codes[1:]) if self._is_step(previous, current))
+            if steps >= 0.8 * (len(codes) - 1) and len(set(codes)) >= 0.8 * len(codes):
+                return f"sequential scan of {codes[-1][0]}* ({steps} small steps in {len(codes)} codes)"
+
+        if new_sequential and self.bulk_scan_codes:
+            sequential = client.bulk_sequential.total(now)
+            if sequential >= self.bulk_scan_codes:
+                return f"bulk scan ({sequential} sequential codes in {self.window}s)"
+
+        # The ratio can only cross the threshold on an INVALID result
+        if new_invalid:
+            requests = client.requests.total(now)
+            if requests >= self.min_requests:
+                invalid = client.invalid.total(now)
+                if invalid / requests > self.invalid_ratio:
+                    return f"{invalid} of {requests} verifications INVALID in {self.window}s"
+        return None
+
+    def stats(self):
+        """Counters only; addresses and reasons are in report(), which is admin-only"""
+        now = time.monotonic()
+        return {
+            "enabled": self.enabled,
+            "observed": self.observed,
+            "tracked_clients": len(self._clients),
+            "tracked_prefixes": len(self._prefixes),
+            "blocks": self.blocks,
+            "blocked": sum(1 for expires, _ in list(self._blocked.values()) if expires > now),
+            "rejected": self.rejected
+        }
+
+    def report(self):
+        """stats() plus the blocked addresses, why and for how long, and recent alerts"""
+        now = time.monotonic()
+        return {
+            **self.stats(),
+            "blocked": [
+                {"ip": ip, "reason": reason, "seconds_left": round(expires - now)}
+                for ip, (expires, reason) in list(self._blocked.items()) if expires > now
+            ],
+            "recent_events": list(self.events)[-20:]
+        }
+
+
+# Global instance
+abuse_detector = AbuseDetector()
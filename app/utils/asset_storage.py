@@ -0,0 +1,373 @@
+# utils/asset_storage.py
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+import time
+
+# Stored assets never change under the same key, so clients and CDNs may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}(\.[a-z0-9]{1,8})?$")
+
+
+class AssetStorageError(RuntimeError):
+    """An asset could not be stored"""
+
+
+def content_key(data, filename):
+    """Content-addressed key: sha256 of the bytes plus the filename's extension"""
+    extension = os.path.splitext(filename)[1].lower()
+    return hashlib.sha256(data).hexdigest() + extension
+
+
+# ===================================
+# LOCAL DIRECTORY
+# ===================================
+class LocalStorage:
+    """
+    Content-addressed files under `root`, served by GET /assets/<key>.
+
+    Identical bytes map to the same file, so storing an asset twice is a
+    no-op. Files are written to a temporary name and renamed into place, so
+    a concurrent reader never sees a partial file.
+    """
+
+    name = "local"
+
+    def __init__(self, root, base_url=""):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+
+    def path_for(self, key):
+        if not _KEY_PATTERN.match(key or ""):
+            return None
+        return os.path.join(self.root, key[:2], key)
+
+    def put(self, data, filename, content_type):
+        key = content_key(data, filename)
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        return f"{self.base_url}/assets/{key}"
+
+    def owns(self, url):
+        return url.startswith(f"{self.base_url}/assets/")
+
+    def delete(self, url):
+        path = self.path_for(url.rsplit("/assets/", 1)[-1])
+        if path and os.path.exists(path):
+            os.remove(path)
+            return True
+        return False
+
+
+# ===================================
+# S3-COMPATIBLE OBJECT STORE
+# ===================================
+class S3Storage:
+    """
+    Content-addressed objects in an S3 bucket (AWS, MinIO, R2 ...).
+
+    Objects are written with one PUT and a long-lived Cache-Control header;
+    public read access comes from the bucket policy, not per-object ACLs.
+    boto3 is only needed (and imported) when this driver is used.
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket, endpoint_url=None, region=None, access_key_id=None,
+                 secret_access_key=None, prefix="", public_url=None, max_connections=10):
+        if not bucket:
+            raise AssetStorageError("ASSET_S3_BUCKET is not set")
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url or None
+        self.region = region or "us-east-1"
+        self.access_key_id = access_key_id or None
+        self.secret_access_key = secret_access_key or None
+        self.prefix = prefix or ""
+        self.max_connections = max_connections
+
+        if public_url:
+            self.public_url = public_url.rstrip("/")
+        elif self.endpoint_url:
+            # MinIO and most self-hosted stores use path-style URLs
+            self.public_url = f"{self.endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            self.public_url = f"https://{bucket}.s3.{self.region}.amazonaws.com"
+
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def client(self):
+        # boto3 clients hold connection pools that must not be shared across fork()
+        if self._client is not None and self._pid == os.getpid():
+            return self._client
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                try:
+                    import boto3
+                    from botocore.config import Config as BotoConfig
+                except ImportError as e:
+                    raise AssetStorageError("The s3 asset storage needs boto3 (pip install boto3)") from e
+
+                self._client = boto3.client(
+                    "s3",
+                    endpoint_url=self.endpoint_url,
+                    region_name=self.region,
+                    aws_access_key_id=self.access_key_id,
+                    aws_secret_access_key=self.secret_access_key,
+                    config=BotoConfig(
+                        max_pool_connections=self.max_connections,
+                        s3={"addressing_style": "path" if self.endpoint_url else "auto"}
+                    )
+                )
+                self._pid = os.getpid()
+        return self._client
+
+    def put(self, data, filename, content_type):
+        key = self.prefix + content_key(data, filename)
+        self.client().put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL
+        )
+        return f"{self.public_url}/{key}"
+
+    def owns(self, url):
+        return url.startswith(f"{self.public_url}/")
+
+    def delete(self, url):
+        key = url[len(self.public_url) + 1:]
+        self.client().delete_object(Bucket=self.bucket, Key=key)
+        return True
+
+
+# ===================================
+# GOOGLE DRIVE
+# ===================================
+class DriveStorage:
+    """
+    Files in the configured Google Drive folder.
+
+    The folder is shared with "anyone with the link" once per process and
+    files inherit that, so each upload is a single create call instead of
+    create + permissions. If the folder cannot be shared, put_many() grants
+    the per-file permissions in batch requests.
+    """
+
+    name = "drive"
+
+    def __init__(self, service=None):
+        if service is None:
+            from .google_drive import drive_service as service
+        self._service = service
+        self._folder_public = None
+        self._lock = threading.Lock()
+
+    def _folder_is_public(self, drive):
+        if self._folder_public is None:
+            with self._lock:
+                if self._folder_public is None:
+                    try:
+                        self._folder_public = drive.share_folder()
+                    except Exception as e:
+                        print(f"Could not share the Drive folder, files will be shared one by one: {e}")
+                        self._folder_public = False
+        return self._folder_public
+
+    def _drive(self):
+        drive = self._service.get()
+        if not drive.is_authenticated():
+            raise AssetStorageError("Google Drive is not authenticated. Run setup_google_drive.py")
+        if not drive.folder_id:
+            raise AssetStorageError("GOOGLE_DRIVE_FOLDER_ID is not set")
+        return drive
+
+    def put(self, data, filename, content_type):
+        drive = self._drive()
+        return drive.create_file(data, filename, content_type, make_public=not self._folder_is_public(drive))
+
+    def put_many(self, items):
+        drive = self._drive()
+        return drive.upload_many(items, make_public=not self._folder_is_public(drive))
+
+    def owns(self, url):
+        return "google.com" in url
+
+    def delete(self, url):
+        return self._service.get().delete_file(url)
+
+
+# ===================================
+# STORAGE FRONT END
+# ===================================
+class AssetStorage:
+    """
+    Where QR codes and certificate PDFs are stored, picked by ASSET_STORAGE.
+
+    put() returns the asset's public URL and raises AssetStorageError when
+    it cannot be stored (there is no silent fallback to a temp directory).
+    delete() routes a URL to the driver that issued it, so rows written
+    before a switch of driver can still be cleaned up.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self._backends = []
+        self.upload_batch_size = 50
+        self._lock = threading.Lock()
+
+        self.puts = 0
+        self.failures = 0
+        self.deletes = 0
+        self.bytes_stored = 0
+        self.put_seconds = 0.0
+
+    def init_app(self, app):
+        kind = app.config.get("ASSET_STORAGE", "drive").lower()
+        self.upload_batch_size = app.config.get("QR_UPLOAD_BATCH_SIZE", self.upload_batch_size)
+        if kind == "local":
+            backend = LocalStorage(app.config.get("ASSET_LOCAL_DIR", "storage/assets"), app.config.get("ASSET_BASE_URL", ""))
+        elif kind == "s3":
+            backend = S3Storage(
+                app.config.get("ASSET_S3_BUCKET"),
+                endpoint_url=app.config.get("ASSET_S3_ENDPOINT_URL"),
+                region=app.config.get("ASSET_S3_REGION"),
+                access_key_id=app.config.get("ASSET_S3_ACCESS_KEY_ID"),
+                secret_access_key=app.config.get("ASSET_S3_SECRET_ACCESS_KEY"),
+                prefix=app.config.get("ASSET_S3_PREFIX", ""),
+                public_url=app.config.get("ASSET_S3_PUBLIC_URL"),
+                max_connections=max(10, app.config.get("QR_UPLOAD_CONCURRENCY", 8))
+            )
+        elif kind == "drive":
+            backend = DriveStorage()
+        else:
+            raise ValueError(f"Unknown ASSET_STORAGE {kind!r} (expected drive, local or s3)")
+        self.configure(backend)
+
+    def configure(self, backend):
+        self.backend = backend
+        # Earlier rows point at Google Drive; keep being able to delete them
+        self._backends = [backend] if isinstance(backend, DriveStorage) else [backend, DriveStorage()]
+
+    def _backend(self):
+        if self.backend is None:
+            with self._lock:
+                if self.backend is None:
+                    self.configure(DriveStorage())
+        return self.backend
+
+    def put(self, data, filename, content_type=None):
+        """Store `data` and return its public URL; raises AssetStorageError"""
+        backend = self._backend()
+        content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        started = time.perf_counter()
+        try:
+            url = backend.put(data, filename, content_type)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            raise AssetStorageError(f"Could not store {filename} in {backend.name} storage: {e}") from e
+
+        with self._lock:
+            self.puts += 1
+            self.bytes_stored += len(data)
+            self.put_seconds += time.perf_counter() - started
+        return url
+
+    def batch_size(self):
+        """How many assets put_many() should get at once (1 when the driver has no batch path)"""
+        if hasattr(self._backend(), "put_many"):
+            return max(1, self.upload_batch_size)
+        return 1
+
+    def put_many(self, items):
+        """
+        Store several (data, filename, content_type) assets. Returns their
+        URLs in the same order, None where an asset could not be stored.
+        """
+        backend = self._backend()
+        started = time.perf_counter()
+        if hasattr(backend, "put_many"):
+            try:
+                results = backend.put_many(items)
+            except Exception as e:
+                results = [e] * len(items)
+        else:
+            results = []
+            for data, filename, content_type in items:
+                try:
+                    results.append(backend.put(data, filename, content_type))
+                except Exception as e:
+                    results.append(e)
+
+        urls = []
+        for (data, filename, _), result in zip(items, results):
+            if isinstance(result, Exception):
+                print(f"Could not store {filename} in {backend.name} storage: {result}")
+                urls.append(None)
+            else:
+                urls.append(result)
+
+        stored = [data for (data, _, _), url in zip(items, urls) if url]
+        with self._lock:
+            self.puts += len(stored)
+            self.failures += len(items) - len(stored)
+            self.bytes_stored += sum(len(data) for data in stored)
+            self.put_seconds += time.perf_counter() - started
+        return urls
+
+    def delete(self, url):
+        """Delete the asset behind `url`; False if it is unknown or could not be deleted"""
+        if not url:
+            return False
+        self._backend()
+        for backend in self._backends:
+            if backend.owns(url):
+                try:
+                    deleted = bool(backend.delete(url))
+                except Exception as e:
+                    print(f"Could not delete asset {url}: {e}")
+                    return False
+                if deleted:
+                    with self._lock:
+                        self.deletes += 1
+                return deleted
+        return False
+
+    def local_path(self, key):
+        """File behind /assets/<key>, or None when assets are not stored locally"""
+        if isinstance(self.backend, LocalStorage):
+            return self.backend.path_for(key)
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.backend.name if self.backend else None,
+                "puts": self.puts,
+                "failures": self.failures,
+                "deletes": self.deletes,
+                "bytes_stored": self.bytes_stored,
+                "avg_put_ms": round(self.put_seconds / self.puts * 1000, 2) if self.puts else 0.0
+            }
+
+
+# Global instance
+asset_storage = AssetStorage()
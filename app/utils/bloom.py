@@ -0,0 +1,66 @@
+# utils/bloom.py
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for `capacity` items at a false positive rate of `error_rate`
+    (10,000 items at 0.1% take about 18 KB). `item in filter` is False for
+    anything never added and True, rarely wrongly, for the rest, so a hit
+    has to be confirmed against the source of truth. The k bit positions
+    come from one blake2b digest split into two 64-bit hashes (double
+    hashing), and nothing can be removed.
+    """
+
+    def __init__(self, capacity=10000, error_rate=0.001):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        positions = self._positions(item)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        with self._lock:
+            self._bits = bytearray(len(self._bits))
+            self.count = 0
+
+    def stats(self):
+        return {
+            "items": self.count,
+            "capacity": self.capacity,
+            "bits": self.size,
+            "hashes": self.hash_count,
+            "bytes": len(self._bits),
+            # Expected false positive rate at the current fill
+            "false_positive_rate": round((1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count, 6)
+        }
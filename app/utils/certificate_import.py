@@ -0,0 +1,411 @@
+# utils/certificate_import.py
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import chain, islice
+from flask import current_app
+from sqlalchemy import insert, or_, select
+from ..extensions import db
+from ..models.certificate import Certificate
+from ..models.student import Student
+from .certificate_number import reserve_certificate_numbers
+from .dashboard_metrics import dashboard_metrics
+from .qr_pipeline import render_and_upload_qr_codes
+from .qr_generator import certificate_qr_url
+from .tabular_reader import ImportFileError, iter_rows, chunked, estimate_row_count
+from .verification_cache import verification_cache
+from .certificate_tokens import certificate_tokens
+
+
+# ===================================
+# READ UPLOADED FILE
+# ===================================
+def read_certificate_rows(file, filename):
+    """Lazily yield the rows of a CSV or Excel upload (binary file-like object) as dicts"""
+    return iter_rows(file, filename)
+
+
+# ===================================
+# COLUMN DETECTION
+# ===================================
+def detect_columns(available_columns):
+    """Guess the name, course and certificate-number columns from the header"""
+
+    # Auto-detect name column
+    name_column = None
+    for col in available_columns:
+        col_lower = col.lower().strip()
+        if any(keyword in col_lower for keyword in ['name', 'student', 'full']):
+            name_column = col
+            break
+    if not name_column and available_columns:
+        name_column = available_columns[0]
+
+    # Auto-detect course column
+    course_column = None
+    for col in available_columns:
+        col_lower = col.lower().strip()
+        if any(keyword in col_lower for keyword in ['department', 'course', 'program', 'dept']):
+            course_column = col
+            break
+    if not course_column and len(available_columns) > 1:
+        course_column = available_columns[1]
+
+    # Auto-detect certificate column
+    cert_column = None
+    for col in available_columns:
+        col_lower = col.lower().strip()
+        if any(keyword in col_lower for keyword in ['certificate', 'cert', 'number', 'no', 'code']):
+            cert_column = col
+            break
+    if not cert_column and len(available_columns) > 2:
+        cert_column = available_columns[2]
+
+    return name_column, course_column, cert_column
+
+
+# ===================================
+# IMPORT ENGINE
+# ===================================
+def import_certificate_rows(rows, chunk_size=500, on_progress=None, resume=None):
+    """
+    Create students and certificates for the given rows.
+
+    `rows` may be any iterable, including the lazy reader above: rows are
+    pulled, processed and committed `chunk_size` at a time, so memory stays
+    flat and a long import makes steady, durable progress. After each chunk
+    `on_progress(processed, failed, imported)` is called with running totals.
+    `resume` ({"processed", "failed", "imported"} of an interrupted run)
+    skips the rows already committed and continues its totals. A chunk that
+    cannot be written is rolled back and its rows are reported as failed
+    (earlier chunks stay committed), and the import goes on with the next
+    one. Returns the summary returned by the import endpoint.
+    """
+    started = time.perf_counter()
+    resume = resume or {}
+    errors = []
+    created_count = resume.get("imported", 0)
+    failed_count = resume.get("failed", 0)
+    total_rows = resume.get("processed", 0)
+    failed_chunks = 0
+    qr_totals = Counter()
+
+    chunks = chunked(islice(rows, total_rows, None), chunk_size)
+    first_chunk = next(chunks, None)
+    if not first_chunk and not total_rows:
+        raise ImportFileError("No data found in file")
+
+    # Auto-detect column mapping (a resumed run may have no rows left)
+    first_row = first_chunk[0] if first_chunk else {}
+    available_columns = list(first_row.keys())
+
+    print(f"Available columns: {available_columns}")
+    print(f"First row: {first_row}")
+
+    name_column, course_column, cert_column = detect_columns(available_columns)
+
+    print(f"Detected columns - Name: {name_column}, Course: {course_column}, Cert: {cert_column}")
+
+    def row_values(row):
+        full_name = str(row.get(name_column, '')).strip() if name_column else ''
+        course_name = str(row.get(course_column, '')).strip() if course_column else ''
+        cert_num = str(row.get(cert_column, '')).strip() if cert_column else ''
+        return full_name, course_name, cert_num
+
+    for chunk in chain([first_chunk] if first_chunk else [], chunks):
+        chunk_start = total_rows
+        total_rows += len(chunk)
+
+        # Parse and validate rows
+        parsed = []
+        for index, row in enumerate(chunk, chunk_start + 1):
+            try:
+                full_name, course_name, cert_num = row_values(row)
+
+                if not full_name:
+                    errors.append(f"Row {index}: No name found in column '{name_column}'")
+                    failed_count += 1
+                    continue
+                if not course_name:
+                    errors.append(f"Row {index}: No course found in column '{course_column}'")
+                    failed_count += 1
+                    continue
+
+                # Parse name
+                name_parts = full_name.split()
+                first_name = name_parts[0] if name_parts else "Unknown"
+                last_name = ' '.join(name_parts[1:]) if len(name_parts) > 1 else "Student"
+
+                parsed.append((index, full_name, first_name, last_name, course_name, cert_num))
+
+            except Exception as e:
+                errors.append(f"Row {index}: {str(e)}")
+                failed_count += 1
+
+        try:
+            created, chunk_errors, chunk_failed, qr_stats = _import_chunk(parsed)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Import chunk of rows {chunk_start + 1}-{total_rows} failed: {str(e)}")
+            failed_chunks += 1
+            failed_count += len(parsed)
+            if parsed:
+                row_numbers = [index for index, *_ in parsed]
+                # Rows that failed validation are already reported on their own
+                if len(row_numbers) == row_numbers[-1] - row_numbers[0] + 1:
+                    rows_text = f"{row_numbers[0]}-{row_numbers[-1]}"
+                else:
+                    rows_text = ", ".join(str(index) for index in row_numbers)
+                errors.append(f"Rows {rows_text}: Not imported ({str(e)}). Upload these rows again.")
+            if on_progress:
+                on_progress(total_rows, failed_count, created_count)
+            continue
+
+        errors.extend(chunk_errors)
+        failed_count += chunk_failed
+        created_count += len(created)
+
+        for key in ("qr_codes", "render_seconds", "upload_seconds", "wall_seconds"):
+            qr_totals[key] += qr_stats[key]
+        qr_totals["render_workers"] = max(qr_totals["render_workers"], qr_stats["render_workers"])
+        qr_totals["upload_workers"] = qr_stats["upload_workers"]
+        qr_totals["upload_batch_size"] = max(qr_totals["upload_batch_size"], qr_stats["upload_batch_size"])
+
+        verification_cache.invalidate(*created)
+
+        if on_progress:
+            on_progress(total_rows, failed_count, created_count)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "message": "File processed with errors; some rows were not imported" if failed_chunks else "File processed successfully",
+        "imported": created_count,
+        "failed": failed_count,
+        "failed_chunks": failed_chunks,
+        "errors": errors,
+        "total_rows": total_rows,
+        "throughput": {
+            "qr_codes": qr_totals["qr_codes"],
+            "render_workers": qr_totals["render_workers"],
+            "upload_workers": qr_totals["upload_workers"],
+            "upload_batch_size": qr_totals["upload_batch_size"],
+            "render_seconds": round(qr_totals["render_seconds"], 3),
+            "upload_seconds": round(qr_totals["upload_seconds"], 3),
+            "qr_wall_seconds": round(qr_totals["wall_seconds"], 3),
+            "total_seconds": round(elapsed, 3),
+            "rows_per_sec": round(total_rows / elapsed, 2) if elapsed > 0 else None
+        },
+        "detected_columns": {
+            "name_column": name_column,
+            "course_column": course_column,
+            "cert_column": cert_column
+        }
+    }
+
+
+# ===================================
+# SET-BASED CHUNK WRITER
+# ===================================
+def _email_local_part(first_name, last_name):
+    return f"{first_name.lower()}.{last_name.lower().replace(' ', '')}"
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _existing_codes(codes):
+    """verification_code -> (first_name, last_name) for codes already issued"""
+    if not codes:
+        return {}
+    found = db.session.execute(
+        select(Certificate.verification_code, Certificate.student_first_name, Certificate.student_last_name)
+        .where(Certificate.verification_code.in_(codes))
+    ).all()
+    return {code: (first, last) for code, first, last in found}
+
+
+def _existing_students(keys):
+    """(first_name, last_name, course_name) -> student id for students already on file"""
+    if not keys:
+        return {}
+    found = db.session.execute(
+        select(Student.id, Student.first_name, Student.last_name, Student.course_name)
+        .where(
+            Student.first_name.in_({k[0] for k in keys}),
+            Student.last_name.in_({k[1] for k in keys}),
+            Student.course_name.in_({k[2] for k in keys})
+        )
+        .order_by(Student.id)
+    ).all()
+
+    students = {}
+    for student_id, first, last, course in found:
+        key = (first, last, course)
+        if key in keys:
+            students.setdefault(key, student_id)
+    return students
+
+
+def _taken_emails(local_parts):
+    """Existing emails that a new student with one of these local parts could collide with"""
+    if not local_parts:
+        return set()
+
+    bases = {f"{local}@speedlinkng.com" for local in local_parts}
+    taken = set(db.session.scalars(select(Student.email).where(Student.email.in_(bases))))
+
+    # Only locals whose plain address is taken need their numbered variants
+    clashing = [local for local in local_parts if f"{local}@speedlinkng.com" in taken]
+    if clashing:
+        taken.update(db.session.scalars(
+            select(Student.email).where(or_(*[
+                Student.email.like(f"{_escape_like(local)}%@speedlinkng.com", escape="\\")
+                for local in clashing
+            ]))
+        ))
+    return taken
+
+
+def _import_chunk(parsed):
+    """
+    Write one chunk of validated rows with a fixed number of queries.
+
+    `parsed` holds (index, full_name, first_name, last_name, course_name, cert_num)
+    tuples. Existing codes, students and emails are loaded with a few IN
+    queries, duplicates and email suffixes are resolved in memory, and the
+    new students and certificates are written with one bulk insert each.
+    Returns (created_codes, errors, failed_count, qr_stats).
+    """
+    errors = []
+    failed_count = 0
+
+    # Reserve certificate numbers per course in one round trip each,
+    # for the rows that will need a generated number
+    numbers_needed = Counter(course_name for *_, course_name, cert_num in parsed if not cert_num)
+    reserved_numbers = {
+        course_name: iter(reserve_certificate_numbers(course_name, count))
+        for course_name, count in numbers_needed.items()
+    }
+    parsed = [
+        (index, full_name, first_name, last_name, course_name, cert_num or next(reserved_numbers[course_name]))
+        for index, full_name, first_name, last_name, course_name, cert_num in parsed
+    ]
+
+    existing_codes = _existing_codes({cert_num for *_, cert_num in parsed})
+
+    # Drop rows whose certificate number already exists (on file or earlier in this upload)
+    accepted = []
+    seen_codes = set()
+    for index, full_name, first_name, last_name, course_name, cert_num in parsed:
+        if cert_num in existing_codes:
+            owner_first, owner_last = existing_codes[cert_num]
+            errors.append(f"Row {index}: Certificate number '{cert_num}' already exists for student '{owner_first} {owner_last}'. Skipping.")
+            failed_count += 1
+            continue
+        if cert_num in seen_codes:
+            errors.append(f"Row {index}: Certificate number '{cert_num}' already exists. Skipping.")
+            failed_count += 1
+            continue
+
+        seen_codes.add(cert_num)
+        accepted.append((index, full_name, first_name, last_name, course_name, cert_num))
+
+    if not accepted:
+        _, qr_stats = render_and_upload_qr_codes([])
+        return [], errors, failed_count, qr_stats
+
+    # Find or create students
+    keys = {(first_name, last_name, course_name) for _, _, first_name, last_name, course_name, _ in accepted}
+    student_ids = _existing_students(keys)
+    new_keys = [key for key in dict.fromkeys(
+        (first_name, last_name, course_name) for _, _, first_name, last_name, course_name, _ in accepted
+    ) if key not in student_ids]
+
+    if new_keys:
+        taken = _taken_emails({_email_local_part(first, last) for first, last, _ in new_keys})
+
+        new_students = []
+        for first_name, last_name, course_name in new_keys:
+            local = _email_local_part(first_name, last_name)
+            email = f"{local}@speedlinkng.com"
+            counter = 1
+            while email in taken:
+                email = f"{local}{counter}@speedlinkng.com"
+                counter += 1
+            taken.add(email)
+
+            new_students.append({
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": email,
+                "course_name": course_name,
+                "year_of_study": "2025"
+            })
+
+        inserted = db.session.execute(
+            insert(Student).returning(Student.id, Student.email), new_students
+        ).all()
+        id_by_email = {email: student_id for student_id, email in inserted}
+        for key, student in zip(new_keys, new_students):
+            student_ids[key] = id_by_email[student["email"]]
+
+    issued_at = datetime.now().date()
+    if current_app.config.get("QR_STORE_ON_ISSUE"):
+        # Render QR codes in parallel and upload them concurrently
+        qr_urls, qr_stats = render_and_upload_qr_codes(
+            [(full_name, course_name, cert_num, issued_at) for _, full_name, _, _, course_name, cert_num in accepted],
+            render_workers=current_app.config.get("QR_RENDER_WORKERS"),
+            upload_workers=current_app.config.get("QR_UPLOAD_CONCURRENCY", 8),
+            min_parallel_rows=current_app.config.get("QR_PARALLEL_MIN_ROWS", 50)
+        )
+    else:
+        # Rendered on demand by GET /certificate/<code>/qr.png
+        qr_urls = [certificate_qr_url(cert_num) for *_, cert_num in accepted]
+        _, qr_stats = render_and_upload_qr_codes([])
+
+    certificates = []
+    for (index, _, first_name, last_name, course_name, cert_num), qr_url in zip(accepted, qr_urls):
+        if not qr_url:
+            errors.append(f"Row {index}: Certificate '{cert_num}' created but QR upload failed")
+
+        certificates.append({
+            "student_id": student_ids[(first_name, last_name, course_name)],
+            "student_first_name": first_name,
+            "student_last_name": last_name,
+            "course_name": course_name,
+            "course_summary": f"Certificate for {course_name}",
+            "year_of_study": "2025",
+            "verification_code": cert_num,
+            "qr_code_url": qr_url,
+            "verification_token": certificate_tokens.issue(cert_num, f"{first_name} {last_name}", course_name, issued_at),
+            "issued_at": issued_at
+        })
+
+    db.session.execute(insert(Certificate), certificates)
+    dashboard_metrics.bump(
+        courses=Counter(cert["course_name"] for cert in certificates),
+        certificates=len(certificates),
+        students=len(new_keys)
+    )
+    db.session.commit()
+
+    return [cert["verification_code"] for cert in certificates], errors, failed_count, qr_stats
+
+
+def run_certificate_import_job(file_path, filename, progress, resume):
+    """JobQueue handler for background certificate imports"""
+    progress(total=estimate_row_count(file_path, filename))
+
+    with open(file_path, 'rb') as f:
+        result = import_certificate_rows(
+            read_certificate_rows(f, filename),
+            chunk_size=current_app.config.get("IMPORT_CHUNK_SIZE", 500),
+            resume=resume,
+            on_progress=lambda processed, failed, imported: progress(
+                processed=processed, failed=failed, imported=imported
+            )
+        )
+
+    progress(total=result["total_rows"])
+    return result
@@ -1,67 +1,133 @@
 from ..models.certificate import Certificate
+from ..models.certificate_sequence import CertificateSequence
 from ..extensions import db
 from datetime import datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 
 
-def generate_certificate_number(course_name, issuance_date=None):
+def get_course_code(full_course_name):
     """
-    Generate certificate number with course code from first letters of words
-    and batch letter (A/B) based on issuance date.
-    
+    Course code from the first letters of the course name's words.
+
     Examples:
     - "Software Engineering" -> "SE"
     - "Data Analytics" -> "DA"
-    - Issued in June 2025 -> "25A/" (first half)
-    - Issued in July 2025 -> "25B/" (second half)
     """
-    
-    def get_course_code(full_course_name):
-        if not full_course_name:
-            return "GN"  # General as fallback
-        
-        words = full_course_name.split()
-        code = ''.join([word[0].upper() for word in words if word])
-        
-        if 2 <= len(code) <= 4:
-            return code
-        elif len(code) > 4:
-            return code[:4]
-        else:
-            return full_course_name[:2].upper() if len(full_course_name) >= 2 else "GN"
-
-    def get_batch_letter(date):
-        """
-        Determine batch letter based on date:
-        - A: January to June (first half)
-        - B: July to December (second half)
-        """
-        if date.month <= 6:
-            return "A"  # First half of year
-        else:
-            return "B"  # Second half of year
+    if not full_course_name:
+        return "GN"  # General as fallback
+
+    words = full_course_name.split()
+    code = ''.join([word[0].upper() for word in words if word])
+
+    if 2 <= len(code) <= 4:
+        return code
+    elif len(code) > 4:
+        return code[:4]
+    else:
+        return full_course_name[:2].upper() if len(full_course_name) >= 2 else "GN"
+
 
+def get_batch_letter(date):
+    """
+    Determine batch letter based on date:
+    - A: January to June (first half)
+    - B: July to December (second half)
+    """
+    if date.month <= 6:
+        return "A"  # First half of year
+    else:
+        return "B"  # Second half of year
+
+
+def certificate_prefix(course_name, issuance_date=None):
+    """
+    Prefix shared by every certificate of a course batch, e.g. "SHSL/25B/DA".
+    - Issued in June 2025 -> "25A" (first half)
+    - Issued in July 2025 -> "25B" (second half)
+    """
     course_code = get_course_code(course_name)
-    
+
     # Use provided issuance_date or current date
     if issuance_date:
         target_date = issuance_date
     else:
         target_date = datetime.utcnow()
-    
+
     year = target_date.year % 100   # 2025 -> 25
     batch_letter = get_batch_letter(target_date)
 
-    prefix = f"SHSL/{year}{batch_letter}/{course_code}"
+    return f"SHSL/{year}{batch_letter}/{course_code}"
+
+
+def _highest_issued_number(conn, prefix):
+    """Largest <nnnn> already used under `prefix` (only read when a prefix gets its counter)"""
+    codes = conn.execute(
+        select(Certificate.verification_code).where(
+            Certificate.verification_code.like(f"{prefix}/%")
+        )
+    ).scalars()
+
+    highest = 0
+    for code in codes:
+        suffix = code[len(prefix) + 1:]
+        if suffix.isdigit():
+            highest = max(highest, int(suffix))
+    return highest
+
+
+def _allocate(prefix, count):
+    """
+    Atomically advance the counter for `prefix` by `count` and return the new
+    last value. Runs in its own short transaction so the row lock is released
+    straight away instead of being held until the caller commits; a rolled
+    back issuance therefore leaves a gap, never a duplicate.
+    """
+    table = CertificateSequence.__table__
+    bump = (
+        update(table)
+        .where(table.c.prefix == prefix)
+        .values(last_value=table.c.last_value + count, updated_at=datetime.utcnow())
+        .returning(table.c.last_value)
+    )
+
+    with db.engine.begin() as conn:
+        last_value = conn.execute(bump).scalar()
+
+        if last_value is None:
+            # First number for this prefix: seed the counter from what is already issued
+            seed = _highest_issued_number(conn, prefix)
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(table).values(prefix=prefix, last_value=seed))
+            except IntegrityError:
+                pass  # Another worker seeded it first
+            last_value = conn.execute(bump).scalar()
+
+    return last_value
+
+
+def reserve_certificate_numbers(course_name, count, issuance_date=None):
+    """
+    Reserve `count` consecutive certificate numbers in one round trip.
+    Used by bulk imports; returns them in order.
+    """
+    if count <= 0:
+        return []
+
+    prefix = certificate_prefix(course_name, issuance_date)
+    last_value = _allocate(prefix, count)
+    first_value = last_value - count + 1
 
-    # Count how many certificates already exist for this course+year+batch
-    existing_count = Certificate.query.filter(
-        Certificate.verification_code.like(f"{prefix}/%")
-    ).count()
+    return [f"{prefix}/{str(n).zfill(4)}" for n in range(first_value, last_value + 1)]
 
-    new_number = existing_count + 1
-    formatted_number = str(new_number).zfill(4)
 
-    return f"{prefix}/{formatted_number}"
+def generate_certificate_number(course_name, issuance_date=None):
+    """
+    Generate certificate number with course code from first letters of words
+    and batch letter (A/B) based on issuance date, e.g. "SHSL/25B/DA/0007".
+    """
+    return reserve_certificate_numbers(course_name, 1, issuance_date)[0]
 
 
 
@@ -0,0 +1,266 @@
+# utils/certificate_tokens.py
+import base64
+import hashlib
+import hmac
+import threading
+from datetime import date, datetime
+import jwt
+from .bloom import BloomFilter
+
+TOKEN_VERSION = 1
+
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _issue_date(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def name_hash(code, name):
+    """
+    96-bit hash of the holder's name, salted with the certificate code so
+    equal names on different certificates do not hash alike. Case and
+    spacing are ignored.
+    """
+    normalized = " ".join((name or "").split()).casefold()
+    return _b64url(hashlib.sha256(f"{code}|{normalized}".encode("utf-8")).digest()[:12])
+
+
+def _load_pem(value):
+    """PEM text, or the path of a PEM file"""
+    if value.lstrip().startswith("-----BEGIN"):
+        return value.encode("utf-8")
+    with open(value, "rb") as f:
+        return f.read()
+
+
+class CertificateTokens:
+    """
+    Signed, self-contained certificate tokens (compact JWS / JWT).
+
+    A token carries the certificate code (`sub`), a hash of the holder's
+    name (`nh`), the course (`crs`) and the issue date (`idt`), signed with
+    HS256 (a server-side secret) or EdDSA (an Ed25519 key pair, so partners
+    can also check tokens themselves with the keys from
+    GET /certificate/token-keys). verify() needs no database: the only
+    state is an optional in-memory Bloom filter of codes whose earlier
+    tokens may no longer hold (revoked, deleted or edited certificates, fed
+    by the revocation list). A filter hit is reported as `possibly_revoked`
+    for the caller to confirm.
+    """
+
+    def __init__(self):
+        self.algorithm = "HS256"
+        self.issuer = None
+        self._signing_key = None
+        self._kid = None
+        self._verify_keys = {}
+        self.revocations = None
+        self._revocation_capacity = 100000
+        self._revocation_error_rate = 0.001
+        self._lock = threading.Lock()
+
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+        self.possibly_revoked = 0
+
+    def init_app(self, app):
+        self.algorithm = app.config.get("CERT_TOKEN_ALGORITHM", "HS256")
+        self.issuer = app.config.get("CERT_TOKEN_ISSUER") or app.config.get("PUBLIC_BASE_URL") or "speedlinkng.com"
+
+        if self.algorithm == "HS256":
+            secret = app.config.get("CERT_TOKEN_SECRET")
+            if not secret:
+                # Derived, so the SECRET_KEY itself never signs anything public
+                secret = hmac.new(app.config["SECRET_KEY"].encode("utf-8"), b"certificate-tokens", hashlib.sha256).hexdigest()
+            self._set_hmac_keys(secret, app.config.get("CERT_TOKEN_OLD_KEYS", ()))
+        elif self.algorithm == "EdDSA":
+            private_key = app.config.get("CERT_TOKEN_PRIVATE_KEY")
+            if not private_key:
+                raise ValueError("CERT_TOKEN_ALGORITHM=EdDSA needs CERT_TOKEN_PRIVATE_KEY (an Ed25519 PEM key or its path)")
+            self._set_ed25519_keys(private_key, app.config.get("CERT_TOKEN_OLD_KEYS", ()))
+        else:
+            raise ValueError(f"Unknown CERT_TOKEN_ALGORITHM {self.algorithm!r} (expected HS256 or EdDSA)")
+
+        if app.config.get("CERT_TOKEN_REVOCATION_FILTER", True):
+            self._revocation_capacity = app.config.get("CERT_TOKEN_REVOCATION_CAPACITY", 100000)
+            self._revocation_error_rate = app.config.get("CERT_TOKEN_REVOCATION_ERROR_RATE", 0.001)
+            self.revocations = BloomFilter(self._revocation_capacity, self._revocation_error_rate)
+        else:
+            self.revocations = None
+
+    # ===================================
+    # KEYS
+    # ===================================
+    def _set_hmac_keys(self, secret, old_secrets=()):
+        keys = [k.encode("utf-8") if isinstance(k, str) else k for k in [secret, *old_secrets] if k]
+        self._verify_keys = {hashlib.sha256(key).hexdigest()[:8]: key for key in keys}
+        self._signing_key = keys[0]
+        self._kid = next(iter(self._verify_keys))
+
+    def _set_ed25519_keys(self, private_key, old_public_keys=()):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+
+        signing_key = serialization.load_pem_private_key(_load_pem(private_key), password=None)
+        if not isinstance(signing_key, Ed25519PrivateKey):
+            raise ValueError("CERT_TOKEN_PRIVATE_KEY is not an Ed25519 key")
+
+        public_keys = [signing_key.public_key()]
+        for value in old_public_keys:
+            key = serialization.load_pem_public_key(_load_pem(value))
+            if not isinstance(key, Ed25519PublicKey):
+                raise ValueError("CERT_TOKEN_OLD_KEYS must be Ed25519 public keys")
+            public_keys.append(key)
+
+        self._verify_keys = {}
+        for key in public_keys:
+            raw = key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+            self._verify_keys[hashlib.sha256(raw).hexdigest()[:8]] = key
+        self._signing_key = signing_key
+        self._kid = next(iter(self._verify_keys))
+
+    def public_keys(self):
+        """JWKS of the EdDSA verification keys (empty for HS256, whose key is secret)"""
+        if self.algorithm != "EdDSA":
+            return {"keys": []}
+
+        from cryptography.hazmat.primitives import serialization
+
+        return {"keys": [
+            {
+                "kty": "OKP",
+                "crv": "Ed25519",
+                "alg": "EdDSA",
+                "use": "sig",
+                "kid": kid,
+                "x": _b64url(key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw))
+            }
+            for kid, key in self._verify_keys.items()
+        ]}
+
+    # ===================================
+    # ISSUE / VERIFY
+    # ===================================
+    def issue(self, code, name, course, issued_at):
+        """Signed token for a certificate, as issued"""
+        if self._signing_key is None:
+            raise RuntimeError("CertificateTokens has no key; call init_app() first")
+
+        token = jwt.encode(
+            {
+                "iss": self.issuer,
+                "sub": code,
+                "nh": name_hash(code, name),
+                "crs": course,
+                "idt": _issue_date(issued_at),
+                "ver": TOKEN_VERSION
+            },
+            self._signing_key,
+            algorithm=self.algorithm,
+            headers={"kid": self._kid, "typ": None}
+        )
+        with self._lock:
+            self.issued += 1
+        return token
+
+    def issue_for(self, cert):
+        """Token for a Certificate row"""
+        return self.issue(
+            cert.verification_code,
+            f"{cert.student_first_name} {cert.student_last_name}",
+            cert.course_name,
+            cert.issued_at
+        )
+
+    def _decode(self, token):
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError:
+            return None
+
+        # Missing or unknown kid: try every key rather than reject outright
+        keys = [self._verify_keys[kid]] if kid in self._verify_keys else self._verify_keys.values()
+        for key in keys:
+            try:
+                return jwt.decode(
+                    token, key,
+                    algorithms=[self.algorithm],
+                    issuer=self.issuer,
+                    options={"require": ["iss", "sub", "nh", "crs", "idt"]}
+                )
+            except jwt.InvalidSignatureError:
+                continue
+            except jwt.InvalidTokenError:
+                return None
+        return None
+
+    def verify(self, token, name=None):
+        """
+        Check a token without touching the database. Returns a dict with
+        `valid`, the decoded `claims`, `name_match` (None when no name is
+        given) and `possibly_revoked`.
+        """
+        claims = self._decode(token) if isinstance(token, str) else None
+        if claims is None:
+            with self._lock:
+                self.rejected += 1
+            return {"valid": False, "claims": None, "name_match": None, "possibly_revoked": False}
+
+        name_match = None
+        if name is not None:
+            name_match = hmac.compare_digest(name_hash(claims["sub"], name), claims["nh"])
+
+        possibly_revoked = self.revocations is not None and claims["sub"] in self.revocations
+        with self._lock:
+            self.verified += 1
+            if possibly_revoked:
+                self.possibly_revoked += 1
+        return {"valid": True, "claims": claims, "name_match": name_match, "possibly_revoked": possibly_revoked}
+
+    def matches(self, claims, certificate):
+        """Whether decoded claims still describe a serialized certificate"""
+        return (
+            claims["sub"] == certificate["verification_code"]
+            and claims["crs"] == certificate["course_name"]
+            and claims["idt"] == certificate["issued_at"]
+            and hmac.compare_digest(name_hash(claims["sub"], certificate["student_name"]), claims["nh"])
+        )
+
+    def revoke(self, *codes):
+        """Mark the tokens issued for these codes as needing a check before they are trusted"""
+        if self.revocations is not None:
+            self.revocations.update(code for code in codes if code)
+
+    def replace_revocations(self, codes):
+        """
+        Swap in a filter holding exactly `codes`. Bloom filters cannot drop
+        entries, so this is how reinstated certificates leave the filter.
+        """
+        if self.revocations is None:
+            return
+        codes = [code for code in codes if code]
+        bloom = BloomFilter(max(self._revocation_capacity, len(codes) * 2), self._revocation_error_rate)
+        bloom.update(codes)
+        self.revocations = bloom
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "algorithm": self.algorithm,
+                "issued": self.issued,
+                "verified": self.verified,
+                "rejected": self.rejected,
+                "possibly_revoked": self.possibly_revoked
+            }
+        stats["revocation_filter"] = self.revocations.stats() if self.revocations is not None else None
+        return stats
+
+
+# Global instance
+certificate_tokens = CertificateTokens()
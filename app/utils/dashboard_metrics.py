@@ -0,0 +1,290 @@
+# utils/dashboard_metrics.py
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from ..models.certificate import Certificate
+from ..models.dashboard_counter import DashboardCounter
+from ..models.student import Student
+from ..models.verification_log import VerificationLog
+
+
+COURSE_PREFIX = "course:"
+CORE_COUNTERS = ("certificates", "students", "valid_verifications", "verified_certificates")
+
+
+class DashboardMetrics:
+    """
+    Materialized counters for GET /dashboard/summary.
+
+    Writers call bump() (or record_verifications()) inside their own
+    transaction, so a counter moves if and only if the write commits. The
+    summary then reads a handful of small rows instead of scanning
+    certificates and verification_logs. A background thread reconciles the
+    counters with real aggregates every `reconcile_seconds` to correct any
+    drift (writes made outside the app, races between first verifications).
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = True
+        self.reconcile_seconds = 900
+
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        self.bumps = 0
+        self.reconciliations = 0
+        self.last_reconcile_seconds = None
+        self.last_error = None
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("DASHBOARD_COUNTERS", self.enabled)
+        self.reconcile_seconds = app.config.get("DASHBOARD_RECONCILE_SECONDS", self.reconcile_seconds)
+
+    # -------------------------
+    # WRITE SIDE
+    # -------------------------
+    def bump(self, courses=None, **deltas):
+        """
+        Add `deltas` (e.g. certificates=1, students=-1) and per-course
+        certificate deltas (`courses` = {course_name: delta}) in the current
+        transaction; the caller commits.
+        """
+        if not self.enabled:
+            return
+
+        changes = {name: delta for name, delta in deltas.items() if delta}
+        for course_name, delta in (courses or {}).items():
+            if course_name and delta:
+                changes[COURSE_PREFIX + course_name] = changes.get(COURSE_PREFIX + course_name, 0) + delta
+        if not changes:
+            return
+
+        table = DashboardCounter.__table__
+        now = datetime.utcnow()
+
+        # Always lock counter rows in name order so concurrent writers cannot deadlock
+        for name in sorted(changes):
+            delta = changes[name]
+            bump = (
+                update(table)
+                .where(table.c.name == name)
+                .values(value=table.c.value + delta, updated_at=now)
+            )
+            if db.session.execute(bump).rowcount:
+                continue
+
+            # A core counter without a row has never been reconciled; the
+            # first read seeds it from the tables, so there is nothing to add to
+            if not name.startswith(COURSE_PREFIX) or delta < 0:
+                continue
+
+            # First certificate for a new course
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(table).values(name=name, value=delta, updated_at=now))
+            except IntegrityError:
+                db.session.execute(bump)
+
+        self.bumps += 1
+
+    def record_verifications(self, rows, first_verified=0):
+        """
+        Count verification log rows written in the current transaction;
+        `first_verified` is how many certificates had never been verified before.
+        """
+        if not self.enabled or not rows:
+            return
+
+        valid = sum(1 for row in rows if row["status"] == "VALID")
+        self.bump(valid_verifications=valid, verified_certificates=first_verified)
+
+    def certificates_removed(self, certificates):
+        """Bump for certificates about to be deleted in the current transaction"""
+        certificates = list(certificates)
+        if not self.enabled or not certificates:
+            return
+
+        ids = [cert.id for cert in certificates]
+        verified = db.session.scalar(
+            select(func.count(func.distinct(VerificationLog.certificate_id))).where(
+                VerificationLog.status == "VALID",
+                VerificationLog.certificate_id.in_(ids)
+            )
+        ) or 0
+
+        self.bump(
+            courses={course: -count for course, count in Counter(cert.course_name for cert in certificates).items()},
+            certificates=-len(certificates),
+            verified_certificates=-verified
+        )
+
+    # -------------------------
+    # READ SIDE
+    # -------------------------
+    def aggregate(self):
+        """Current values computed straight from the tables (the slow path)"""
+        values = {
+            "certificates": db.session.scalar(select(func.count(Certificate.id))) or 0,
+            "students": db.session.scalar(select(func.count(Student.id))) or 0,
+            "valid_verifications": db.session.scalar(
+                select(func.count(VerificationLog.id)).where(VerificationLog.status == "VALID")
+            ) or 0,
+            "verified_certificates": db.session.scalar(
+                select(func.count(func.distinct(VerificationLog.certificate_id))).where(VerificationLog.status == "VALID")
+            ) or 0
+        }
+        courses = db.session.execute(
+            select(Certificate.course_name, func.count(Certificate.id)).group_by(Certificate.course_name)
+        ).all()
+        values.update({COURSE_PREFIX + course: count for course, count in courses if course})
+        return values
+
+    def read(self):
+        """
+        Dashboard metrics plus their freshness:
+        {"metrics": {...}, "updated_at": ..., "reconciled_at": ..., "source": "counters" | "aggregate"}
+        """
+        if not self.enabled:
+            return self._summary(self.aggregate(), None, None, "aggregate")
+
+        self._ensure_worker()
+
+        rows = db.session.execute(select(DashboardCounter.__table__)).all()
+        if not any(row.name == "certificates" for row in rows):
+            # Never reconciled (fresh install): seed the counters now
+            self.reconcile()
+            rows = db.session.execute(select(DashboardCounter.__table__)).all()
+
+        values = {row.name: row.value for row in rows}
+        updated_at = max((row.updated_at for row in rows if row.updated_at), default=None)
+        reconciled_at = min(
+            (row.reconciled_at for row in rows if row.name in CORE_COUNTERS and row.reconciled_at),
+            default=None
+        )
+        return self._summary(values, updated_at, reconciled_at, "counters")
+
+    def _summary(self, values, updated_at, reconciled_at, source):
+        total_certificates = values.get("certificates", 0)
+        return {
+            "metrics": {
+                "total_certificates": total_certificates,
+                "total_verified_certificates": values.get("valid_verifications", 0),
+                "total_students": values.get("students", 0),
+                "pending_verifications": max(total_certificates - values.get("verified_certificates", 0), 0),
+                "courses_managed": sum(
+                    1 for name, value in values.items() if name.startswith(COURSE_PREFIX) and value > 0
+                )
+            },
+            "freshness": {
+                "source": source,
+                "updated_at": updated_at.isoformat() if updated_at else None,
+                "reconciled_at": reconciled_at.isoformat() if reconciled_at else None
+            }
+        }
+
+    # -------------------------
+    # RECONCILIATION
+    # -------------------------
+    def reconcile(self):
+        """
+        Overwrite every counter with freshly aggregated values.
+
+        The counter rows are locked first, so writes that commit while the
+        aggregates run wait and then apply their delta on top of the new
+        values instead of being lost.
+        """
+        started = datetime.utcnow()
+        table = DashboardCounter.__table__
+
+        try:
+            # Lock in the order bump() does (Python's sorted(), i.e. code point
+            # order, which is the "C" collation on Postgres) so the two cannot deadlock
+            name_order = table.c.name.collate("C") if db.session.get_bind().dialect.name == "postgresql" else table.c.name
+            db.session.execute(select(table.c.name).order_by(name_order).with_for_update()).all()
+            values = self.aggregate()
+            now = datetime.utcnow()
+
+            # Courses that no longer have certificates
+            db.session.execute(
+                delete(table).where(
+                    table.c.name.like(COURSE_PREFIX + "%"),
+                    table.c.name.notin_([name for name in values if name.startswith(COURSE_PREFIX)])
+                )
+            )
+
+            for name, value in values.items():
+                row = {"value": value, "updated_at": now, "reconciled_at": now}
+                if db.session.execute(update(table).where(table.c.name == name).values(**row)).rowcount:
+                    continue
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(table).values(name=name, **row))
+                except IntegrityError:
+                    db.session.execute(update(table).where(table.c.name == name).values(**row))
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.last_error = str(e)
+            raise
+
+        self.reconciliations += 1
+        self.last_reconcile_seconds = round((datetime.utcnow() - started).total_seconds(), 3)
+        return values
+
+    def _ensure_worker(self):
+        if not self.reconcile_seconds:
+            return
+
+        # Threads do not survive fork(), so a pre-forked worker starts its own
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="dashboard-reconciler", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        stop = threading.Event()
+        while not stop.wait(self.reconcile_seconds):
+            try:
+                with self.app.app_context():
+                    # Every worker runs this loop; skip if another one reconciled recently
+                    oldest = db.session.scalar(
+                        select(func.min(DashboardCounter.reconciled_at)).where(
+                            DashboardCounter.name.in_(CORE_COUNTERS)
+                        )
+                    )
+                    if oldest and datetime.utcnow() - oldest < timedelta(seconds=self.reconcile_seconds):
+                        continue
+                    self.reconcile()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Dashboard counter reconciliation failed: {str(e)}")
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "reconcile_seconds": self.reconcile_seconds,
+            "reconciler_running": self._thread is not None and self._pid == os.getpid() and self._thread.is_alive(),
+            "bumps": self.bumps,
+            "reconciliations": self.reconciliations,
+            "last_reconcile_seconds": self.last_reconcile_seconds,
+            "last_error": self.last_error
+        }
+
+
+# Global instance
+dashboard_metrics = DashboardMetrics()
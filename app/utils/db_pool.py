@@ -0,0 +1,190 @@
+# utils/db_pool.py
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last one is open-ended
+WAIT_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000]
+
+
+def psycopg_url(url):
+    """
+    Point postgres:// and postgresql:// URLs at the psycopg 3 driver.
+    SQLAlchemy would otherwise pick psycopg2, which is not installed.
+    """
+    if not url:
+        return url
+    parsed = make_url(url)
+    if parsed.drivername in ("postgres", "postgresql"):
+        return parsed.set(drivername="postgresql+psycopg").render_as_string(hide_password=False)
+    return url
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited to `db_pool`"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            db_pool.record_timeout(time.perf_counter() - start)
+            raise
+        db_pool.record_checkout(time.perf_counter() - start, self.checkedout(), pool_capacity(self))
+        return conn
+
+
+def pool_capacity(pool):
+    """Most connections the pool will open at once (None when overflow is unlimited)"""
+    if pool._max_overflow < 0:
+        return None
+    return pool.size() + pool._max_overflow
+
+
+class DatabasePool:
+    """
+    Connection pool settings for the SQLAlchemy engine, plus checkout metrics.
+
+    init_app() turns the DB_POOL_* / DB_STATEMENT_TIMEOUT_MS / DB_PGBOUNCER
+    config into SQLALCHEMY_ENGINE_OPTIONS, so it must run before
+    db.init_app(). Explicit SQLALCHEMY_ENGINE_OPTIONS keys win.
+
+    Every worker process has its own pool, so Postgres sees up to
+    workers x (pool_size + max_overflow) connections. The metrics here are
+    for this process: checkout wait times, timeouts and how often a
+    checkout found the pool at capacity.
+    """
+
+    def __init__(self):
+        self.options = {}
+        self.pgbouncer = False
+        self.statement_timeout_ms = 0
+        self._lock = threading.Lock()
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.saturated_checkouts = 0
+        self.peak_checked_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def init_app(self, app):
+        config = app.config
+        uri = psycopg_url(config.get("SQLALCHEMY_DATABASE_URI"))
+        config["SQLALCHEMY_DATABASE_URI"] = uri
+
+        self.pgbouncer = config.get("DB_PGBOUNCER", False)
+        self.statement_timeout_ms = config.get("DB_STATEMENT_TIMEOUT_MS", 0)
+        self._reset_metrics()
+
+        options = {}
+        backend = make_url(uri).get_backend_name() if uri else None
+        in_memory = backend == "sqlite" and make_url(uri).database in (None, "", ":memory:")
+
+        if not in_memory:
+            options.update({
+                "poolclass": InstrumentedQueuePool,
+                "pool_size": config.get("DB_POOL_SIZE", 5),
+                "max_overflow": config.get("DB_MAX_OVERFLOW", 10),
+                "pool_timeout": config.get("DB_POOL_TIMEOUT", 30),
+                "pool_recycle": config.get("DB_POOL_RECYCLE", 1800),
+                "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+                "pool_use_lifo": True
+            })
+
+        if backend == "postgresql":
+            connect_args = {}
+            if self.pgbouncer:
+                # Transaction pooling hands each transaction to any server
+                # connection: no server-side prepared statements, no startup options
+                connect_args["prepare_threshold"] = None
+            elif self.statement_timeout_ms:
+                connect_args["options"] = f"-c statement_timeout={int(self.statement_timeout_ms)}"
+            options["connect_args"] = connect_args
+
+        options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+        self.options = options
+
+        if backend == "postgresql" and self.pgbouncer and self.statement_timeout_ms:
+            if not event.contains(Engine, "begin", self._set_local_statement_timeout):
+                event.listen(Engine, "begin", self._set_local_statement_timeout)
+
+    def _set_local_statement_timeout(self, conn):
+        """Behind pgbouncer the timeout is set per transaction instead of per connection"""
+        if self.pgbouncer and self.statement_timeout_ms and conn.dialect.name == "postgresql":
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}")
+
+    # ===================================
+    # METRICS
+    # ===================================
+    def record_checkout(self, seconds, checked_out, capacity):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            # This checkout took the last free slot; the next one will wait
+            if capacity is not None and checked_out >= capacity:
+                self.saturated_checkouts += 1
+            self.wait_buckets[self._bucket(seconds)] += 1
+
+    def record_timeout(self, seconds):
+        with self._lock:
+            self.timeouts += 1
+            self.max_wait = max(self.max_wait, seconds)
+            self.wait_buckets[-1] += 1
+
+    @staticmethod
+    def _bucket(seconds):
+        ms = seconds * 1000
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if ms <= bound:
+                return i
+        return len(WAIT_BUCKETS_MS)
+
+    def stats(self):
+        from ..extensions import db
+
+        pool = db.engine.pool
+        current = {"pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            capacity = pool_capacity(pool)
+            current.update({
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "capacity": capacity,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "utilization": round(pool.checkedout() / capacity, 3) if capacity else None
+            })
+
+        with self._lock:
+            histogram = {
+                f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)
+            }
+            histogram["gt_{}ms".format(WAIT_BUCKETS_MS[-1])] = self.wait_buckets[-1]
+            return {
+                **current,
+                "pgbouncer": self.pgbouncer,
+                "statement_timeout_ms": self.statement_timeout_ms,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "saturated_checkouts": self.saturated_checkouts,
+                "peak_checked_out": self.peak_checked_out,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "wait_histogram": histogram
+            }
+
+
+# Global instance
+db_pool = DatabasePool()
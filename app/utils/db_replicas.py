@@ -0,0 +1,228 @@
+# utils/db_replicas.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from .db_pool import psycopg_url
+
+
+# True inside a @read_replica controller
+_use_replica = ContextVar("use_replica", default=False)
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it received
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() IS NOT NULL
+             AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def read_replica(func):
+    """Let the plain SELECTs issued by `func` go to a healthy read replica"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+@contextmanager
+def use_primary():
+    """Send everything in the block to the primary, even inside a @read_replica controller"""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _locks_or_writes(clause):
+    return getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None
+
+
+class RoutingSession(Session):
+    """
+    db.session that sends reads from @read_replica controllers to a replica.
+
+    Only SELECTs are routed. Once the session writes (a flush or an
+    INSERT / UPDATE / DELETE) or locks rows (SELECT ... FOR UPDATE) it
+    stays on the primary until it is removed at the end of the request, so
+    a controller always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or _locks_or_writes(clause):
+                self.info["pinned_to_primary"] = True
+            elif _use_replica.get() and not self.info.get("pinned_to_primary") and getattr(clause, "is_select", False):
+                engine = replica_router.pick()
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class Replica:
+    def __init__(self, url, engine):
+        self.url = url
+        self.engine = engine
+        self.healthy = False
+        self.lag_seconds = None
+        self.checked_at = None
+        self.last_error = None
+        self.reads = 0
+
+
+class ReplicaRouter:
+    """
+    Read replica engines and their health.
+
+    A background thread checks every replica each `check_interval` seconds
+    (replication lag on Postgres, a plain SELECT 1 elsewhere). A replica is
+    used only while its last check passed and it was at most `max_lag`
+    seconds behind; a connection error on a replica takes it out of
+    rotation at once. With no usable replica, reads fall back to the
+    primary. Replicas start out unused until their first check passes.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.max_lag = 10
+        self.check_interval = 5
+        self.replicas = []
+
+        self._next = 0
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        self.routed_reads = 0
+        self.fallbacks = 0
+
+    def init_app(self, app):
+        """Must run after db_pool.init_app(), whose engine options the replicas reuse"""
+        self.app = app
+        self.max_lag = app.config.get("REPLICA_MAX_LAG_SECONDS", self.max_lag)
+        self.check_interval = app.config.get("REPLICA_HEALTH_INTERVAL", self.check_interval)
+
+        options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+        # Checkout metrics in db_pool describe the primary's pool
+        if options.get("poolclass") is not None:
+            options["poolclass"] = QueuePool
+
+        self.replicas = []
+        for url in app.config.get("DATABASE_REPLICA_URLS") or []:
+            engine = create_engine(psycopg_url(url), **options)
+            replica = Replica(make_url(psycopg_url(url)).render_as_string(hide_password=True), engine)
+            event.listen(engine, "handle_error", self._on_error(replica))
+            self.replicas.append(replica)
+
+    @property
+    def enabled(self):
+        return bool(self.replicas)
+
+    def _on_error(self, replica):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None:
+                replica.healthy = False
+                replica.last_error = str(context.original_exception)
+                print(f"Read replica {replica.url} taken out of rotation: {replica.last_error}")
+        return handle_error
+
+    def pick(self):
+        """Engine of the next healthy replica (round robin), or None to use the primary"""
+        if not self.replicas:
+            return None
+        self._ensure_worker()
+
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            self.fallbacks += 1
+            return None
+
+        replica = healthy[self._next % len(healthy)]
+        self._next += 1
+        replica.reads += 1
+        self.routed_reads += 1
+        return replica.engine
+
+    # -------------------------
+    # HEALTH CHECKS
+    # -------------------------
+    def check(self, replica):
+        try:
+            with replica.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = 0.0
+            replica.lag_seconds = round(lag, 3)
+            replica.healthy = lag <= self.max_lag
+            replica.last_error = None if replica.healthy else f"lag {lag:.1f}s exceeds {self.max_lag}s"
+        except Exception as e:
+            replica.healthy = False
+            replica.last_error = str(e)
+        replica.checked_at = time.time()
+        return replica.healthy
+
+    def check_all(self):
+        return [self.check(replica) for replica in self.replicas]
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so a pre-forked worker starts its own
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="replica-health", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        stop = threading.Event()
+        while True:
+            self.check_all()
+            if stop.wait(self.check_interval):
+                return
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "max_lag_seconds": self.max_lag,
+            "check_interval": self.check_interval,
+            "checker_running": self._thread is not None and self._pid == os.getpid() and self._thread.is_alive(),
+            "routed_reads": self.routed_reads,
+            "fallbacks": self.fallbacks,
+            "replicas": [
+                {
+                    "url": replica.url,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "checked_at": replica.checked_at,
+                    "reads": replica.reads,
+                    "checked_out": replica.engine.pool.checkedout() if isinstance(replica.engine.pool, QueuePool) else None,
+                    "last_error": replica.last_error
+                }
+                for replica in self.replicas
+            ]
+        }
+
+
+# Global instance
+replica_router = ReplicaRouter()
@@ -0,0 +1,175 @@
+# utils/drive_client.py
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+
+class DriveUnavailable(RuntimeError):
+    """The Google Drive client could not be initialized"""
+
+
+@lru_cache(maxsize=None)
+def _discovery_document(api, version):
+    # The client library ships the discovery documents; read and parse them once per process.
+    # build_from_document only ever adds the same derived keys to it, so it can be shared.
+    from googleapiclient import discovery_cache
+
+    document = discovery_cache.get_static_doc(api, version)
+    if document is None:
+        raise DriveUnavailable(f"No bundled discovery document for {api} {version}")
+    return json.loads(document)
+
+
+def build_drive(credentials, root_url=None):
+    """
+    Drive v3 client from the bundled discovery document (no network round trip).
+    `root_url` (default GOOGLE_DRIVE_API_URL) points it at another server, e.g. a fake for benchmarks.
+    """
+    from googleapiclient.discovery import build_from_document
+
+    document = _discovery_document("drive", "v3")
+    root_url = root_url or os.getenv("GOOGLE_DRIVE_API_URL")
+    if root_url:
+        root_url = root_url.rstrip("/") + "/"
+        document = dict(document, rootUrl=root_url, baseUrl=root_url + document["servicePath"])
+    return build_from_document(document, credentials=credentials)
+
+
+def is_retryable(error):
+    """Rate limited (429, 403 rate limit) or server-side (5xx) Drive errors worth retrying"""
+    status = getattr(getattr(error, "resp", None), "status", None)
+    if status is None:
+        return False
+    status = int(status)
+    if status == 429 or status >= 500:
+        return True
+    return status == 403 and b"ateLimitExceeded" in (getattr(error, "content", b"") or b"")
+
+
+def backoff_seconds(attempt):
+    """Randomized exponential backoff, as googleapiclient uses for num_retries"""
+    return random.random() * 2 ** attempt
+
+
+class TransportPool:
+    """
+    Authorized HTTP transports shared by all threads that call Drive.
+
+    httplib2.Http is not thread-safe, so every call checks a transport out
+    and returns it afterwards. Returned transports keep their keep-alive
+    connection, so the next call (from any thread) skips the TCP and TLS
+    handshakes; thread-local transports were lost with every short-lived
+    upload thread. At most `max_idle` transports are kept.
+    """
+
+    def __init__(self, credentials, max_idle=16, timeout=60):
+        self.credentials = credentials
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle = []
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @contextmanager
+    def connection(self):
+        http = None
+        with self._lock:
+            # Connections must not be shared across fork()
+            if self._pid != os.getpid():
+                self._idle = []
+                self._pid = os.getpid()
+            if self._idle:
+                http = self._idle.pop()
+                self.reused += 1
+
+        if http is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+            with self._lock:
+                self.created += 1
+
+        try:
+            yield http
+        finally:
+            with self._lock:
+                if self._pid == os.getpid() and len(self._idle) < self.max_idle:
+                    self._idle.append(http)
+
+    def stats(self):
+        with self._lock:
+            return {"idle": len(self._idle), "created": self.created, "reused": self.reused}
+
+
+class LazyDriveService:
+    """
+    Stands in for a Drive service global and builds the real one on first use.
+
+    Loading credentials (and possibly refreshing them over the network) and
+    importing the Google client libraries used to happen while the app was
+    being imported; now it happens the first time an upload or delete needs
+    Drive, so the app starts and serves verification without Google. The
+    instance is built once per process under a lock. A failed build is
+    retried after `retry_seconds` instead of on every call.
+    """
+
+    def __init__(self, factory, retry_seconds=60):
+        self._factory = factory
+        self._retry_seconds = retry_seconds
+        self._instance = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        self.init_seconds = None
+        self.last_error = None
+        self._failed_at = None
+
+    def get(self):
+        """The real service object, building it if needed; raises DriveUnavailable"""
+        # Clients hold HTTP connections that must not be shared across fork()
+        if self._instance is not None and self._pid == os.getpid():
+            return self._instance
+
+        with self._lock:
+            if self._instance is not None and self._pid == os.getpid():
+                return self._instance
+
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self._retry_seconds:
+                raise DriveUnavailable(self.last_error)
+
+            started = time.perf_counter()
+            try:
+                instance = self._factory()
+            except Exception as e:
+                self._instance = None
+                self._failed_at = time.monotonic()
+                self.last_error = str(e)
+                print(f"Google Drive client initialization failed: {self.last_error}")
+                raise DriveUnavailable(self.last_error) from e
+
+            self.init_seconds = round(time.perf_counter() - started, 3)
+            self.last_error = None
+            self._failed_at = None
+            self._pid = os.getpid()
+            self._instance = instance
+            return instance
+
+    @property
+    def initialized(self):
+        return self._instance is not None and self._pid == os.getpid()
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def stats(self):
+        return {
+            "initialized": self.initialized,
+            "init_seconds": self.init_seconds,
+            "last_error": self.last_error
+        }
@@ -2,22 +2,39 @@ import os
 import io
 import pickle
 import tempfile
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
+import time
+from .drive_client import LazyDriveService, TransportPool, build_drive, is_retryable, backoff_seconds
+
+# The Google client libraries are imported where they are used, so importing
+# this module (and starting the app) does not pay for them
+
+PUBLIC_READER = {
+    'type': 'anyone',
+    'role': 'reader',
+    'allowFileDiscovery': False
+}
+
+# The Drive batch endpoint takes at most 100 calls per request
+BATCH_LIMIT = 100
 
 class GoogleDriveService:
-    def __init__(self):
+    def __init__(self, credentials=None):
         self.SCOPES = ['https://www.googleapis.com/auth/drive.file']
         self.creds = None
         self.service = None
+        self.transports = None
         self.folder_id = os.getenv('GOOGLE_DRIVE_FOLDER_ID')
-        self._authenticate()
+        # Retries with exponential backoff on 429 / 5xx
+        self.max_retries = int(os.getenv('GOOGLE_DRIVE_MAX_RETRIES', 5))
+        if credentials is not None:
+            self._connect(credentials)
+        else:
+            self._authenticate()
         
     def _authenticate(self):
         """Authenticate using OAuth 2.0 - loads existing token or creates new one"""
+        from google.auth.transport.requests import Request
+
         token_path = os.path.join(tempfile.gettempdir(), 'drive_token.pickle')
         
         print("Initializing Google Drive...")
@@ -45,11 +62,21 @@ class GoogleDriveService:
             with open(token_path, 'wb') as token:
                 pickle.dump(self.creds, token)
         
-        # Build the service
-        self.service = build('drive', 'v3', credentials=self.creds)
+        self._connect(self.creds)
         print(f"Google Drive authenticated successfully")
         print(f"Using folder ID: {self.folder_id}")
     
+    def _connect(self, credentials):
+        """Build the service and the transport pool its calls run on"""
+        self.creds = credentials
+        self.service = build_drive(credentials)
+        self.transports = TransportPool(credentials)
+    
+    def _execute(self, request):
+        """Run a request on a pooled transport, retrying 429 / 5xx with exponential backoff"""
+        with self.transports.connection() as http:
+            return request.execute(http=http, num_retries=self.max_retries)
+    
     def is_authenticated(self):
         """Check if we're authenticated"""
         return self.service is not None
@@ -65,44 +92,146 @@ class GoogleDriveService:
             return self._save_temp(file_bytes, filename)
         
         try:
-            print(f"Uploading {filename}...")
-            
-            file_metadata = {
-                'name': filename,
-                'parents': [self.folder_id]
-            }
-            
-            file_obj = io.BytesIO(file_bytes)
-            media = MediaIoBaseUpload(file_obj, mimetype=mime_type)
-            
-            # Upload file
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id, name'
-            ).execute()
-            
-            file_id = file.get('id')
-            print(f"File uploaded, ID: {file_id}")
-            
-            # Make file publicly readable
-            self.service.permissions().create(
+            return self.create_file(file_bytes, filename, mime_type)
+        except Exception as error:
+            print(f"Upload failed: {error}")
+            return self._save_temp(file_bytes, filename)
+    
+    def create_file(self, file_bytes, filename, mime_type='image/png', make_public=True):
+        """Upload file into the folder and return its public URL (raises on failure)"""
+        file_id = self._create(file_bytes, filename, mime_type)
+        
+        # Make file publicly readable (not needed when the folder already is)
+        if make_public:
+            self._execute(self.service.permissions().create(
                 fileId=file_id,
-                body={
-                    'type': 'anyone',
-                    'role': 'reader',
-                    'allowFileDiscovery': False
-                }
-            ).execute()
+                body=PUBLIC_READER,
+                fields='id'
+            ))
+        
+        return self.file_url(file_id)
+    
+    def upload_many(self, files, make_public=True):
+        """
+        Upload several (file_bytes, filename, mime_type) files.
+        
+        Files go up one after another on one pooled connection; the public
+        permissions are then granted in batch requests (the batch endpoint
+        does not accept uploads). Returns a list in the same order holding
+        the public URL, or the exception for files that failed.
+        """
+        results = []
+        for file_bytes, filename, mime_type in files:
+            try:
+                results.append(self._create(file_bytes, filename, mime_type))
+            except Exception as error:
+                print(f"Upload of {filename} failed: {error}")
+                results.append(error)
+        
+        if make_public:
+            file_ids = [result for result in results if isinstance(result, str)]
+            errors = self._share_files(file_ids)
+            results = [errors.get(result, result) if isinstance(result, str) else result for result in results]
+        
+        return [self.file_url(result) if isinstance(result, str) else result for result in results]
+    
+    def _create(self, file_bytes, filename, mime_type):
+        """Create the file with a single multipart upload and return its ID"""
+        from googleapiclient.http import MediaIoBaseUpload
+
+        file_metadata = {
+            'name': filename,
+            'parents': [self.folder_id]
+        }
+        
+        # QR codes are a few KB: one multipart request, not a resumable session
+        media = MediaIoBaseUpload(io.BytesIO(file_bytes), mimetype=mime_type, resumable=False)
+        
+        file = self._execute(self.service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id'
+        ))
+        return file.get('id')
+    
+    def _share_files(self, file_ids):
+        """Grant public read access in batch requests; returns {file_id: exception} for failures"""
+        errors = {}
+        pending = list(file_ids)
+        
+        for attempt in range(self.max_retries + 1):
+            retry = []
+            
+            def on_response(file_id, response, exception):
+                if exception is None:
+                    errors.pop(file_id, None)
+                    return
+                errors[file_id] = exception
+                if is_retryable(exception):
+                    retry.append(file_id)
             
-            # Return direct view link
-            url = f"https://drive.google.com/uc?export=view&id={file_id}"
-            print(f"Public URL: {url}")
-            return url
+            for start in range(0, len(pending), BATCH_LIMIT):
+                chunk = pending[start:start + BATCH_LIMIT]
+                batch = self.service.new_batch_http_request(callback=on_response)
+                for file_id in chunk:
+                    batch.add(
+                        self.service.permissions().create(fileId=file_id, body=PUBLIC_READER, fields='id'),
+                        request_id=file_id
+                    )
+                try:
+                    with self.transports.connection() as http:
+                        batch.execute(http=http)
+                except Exception as error:
+                    # The whole batch request failed
+                    for file_id in chunk:
+                        errors[file_id] = error
+                    if is_retryable(error):
+                        retry.extend(chunk)
             
+            if not retry or attempt == self.max_retries:
+                break
+            time.sleep(backoff_seconds(attempt))
+            pending = retry
+        
+        for file_id, error in errors.items():
+            print(f"Could not make {file_id} public: {error}")
+        return errors
+    
+    @staticmethod
+    def file_url(file_id):
+        """Direct view link"""
+        return f"https://drive.google.com/uc?export=view&id={file_id}"
+    
+    def share_folder(self):
+        """Make the upload folder readable by anyone with the link; files created in it inherit that"""
+        permissions = self._execute(self.service.permissions().list(
+            fileId=self.folder_id,
+            fields='permissions(type, role)'
+        ))
+        
+        for permission in permissions.get('permissions', []):
+            if permission.get('type') == 'anyone' and permission.get('role') in ('reader', 'commenter', 'writer'):
+                return True
+        
+        self._execute(self.service.permissions().create(
+            fileId=self.folder_id,
+            body=PUBLIC_READER,
+            fields='id'
+        ))
+        print(f"Folder {self.folder_id} shared with anyone with the link")
+        return True
+    
+    def delete_file(self, file_url):
+        """Delete a file from Google Drive using its URL"""
+        try:
+            if 'id=' in file_url:
+                file_id = file_url.split('id=')[1].split('&')[0]
+                self._execute(self.service.files().delete(fileId=file_id))
+                print(f"File deleted: {file_id}")
+                return True
         except Exception as error:
-            print(f"Upload failed: {error}")
-            return self._save_temp(file_bytes, filename)
+            print(f"Error deleting file: {error}")
+        return False
     
     def _save_temp(self, file_bytes, filename):
         """Fallback: save to temporary directory"""
@@ -120,5 +249,5 @@ class GoogleDriveService:
             print(f"Failed to save locally: {e}")
             return None
 
-# Global instance
-drive_service = GoogleDriveService()
\ No newline at end of file
+# Global instance, authenticated on first use
+drive_service = LazyDriveService(GoogleDriveService)
\ No newline at end of file
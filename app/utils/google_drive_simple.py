@@ -2,13 +2,14 @@
 import os
 import io
 import tempfile
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
-from googleapiclient.errors import HttpError
+from .drive_client import LazyDriveService, build_drive
+
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
 
 class GoogleDriveService:
     def __init__(self):
+        from google.oauth2 import service_account
+
         # Get service account info from environment variables
         service_account_info = {
             "type": "service_account",
@@ -33,7 +34,7 @@ class GoogleDriveService:
         )
         
         # Build the service
-        self.service = build('drive', 'v3', credentials=self.creds)
+        self.service = build_drive(self.creds)
         
         # Get Shared Drive ID from environment
         self.drive_id = os.getenv('GOOGLE_SHARED_DRIVE_ID')  # The SHARED DRIVE ID
@@ -51,6 +52,9 @@ class GoogleDriveService:
     
     def upload_file(self, file_bytes, filename, mime_type='image/png'):
         """Upload file to Shared Drive"""
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import MediaIoBaseUpload
+
         try:
             if not self.folder_id:
                 raise Exception("GOOGLE_DRIVE_FOLDER_ID not set")
@@ -65,7 +69,8 @@ class GoogleDriveService:
             
             # Create media upload
             file_obj = io.BytesIO(file_bytes)
-            media = MediaIoBaseUpload(file_obj, mimetype=mime_type, resumable=True)
+            # Resumable sessions cost an extra round trip; only worth it for large files
+            media = MediaIoBaseUpload(file_obj, mimetype=mime_type, resumable=len(file_bytes) > RESUMABLE_THRESHOLD)
             
             # Upload parameters for Shared Drive
             upload_params = {
@@ -81,7 +86,7 @@ class GoogleDriveService:
                 upload_params['supportsAllDrives'] = True
             
             # Upload the file
-            file = self.service.files().create(**upload_params).execute()
+            file = self.service.files().create(**upload_params).execute(num_retries=5)
             
             file_id = file.get('id')
             print(f"File uploaded, ID: {file_id}")
@@ -96,7 +101,7 @@ class GoogleDriveService:
                         'allowFileDiscovery': False
                     },
                     supportsAllDrives=True
-                ).execute()
+                ).execute(num_retries=5)
                 print("File made publicly accessible")
             except Exception as perm_error:
                 print(f"Could not set public permissions: {perm_error}")
@@ -157,8 +162,8 @@ class GoogleDriveService:
         
         return False
 
-# Global instance
-drive_service = GoogleDriveService()
+# Global instance, built on first use
+drive_service = LazyDriveService(GoogleDriveService)
 
 
 
@@ -0,0 +1,332 @@
+# utils/job_queue.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import request
+from sqlalchemy import select, update
+from werkzeug.utils import secure_filename
+from ..extensions import db
+from ..models.import_job import ImportJob
+
+
+def async_requested():
+    """True when the client asked for background processing (?async=true)"""
+    return request.args.get("async", "").lower() in ("1", "true", "yes")
+
+
+class JobInterrupted(Exception):
+    """Raised from progress() when the worker is shutting down"""
+
+
+class JobQueue:
+    """
+    Runs long imports outside the request/response cycle.
+
+    The upload is spooled to disk and an ImportJob row is created, then a
+    worker thread from a small pool processes it. Handlers report progress
+    through a callback that updates the row, so any worker process can
+    answer GET /jobs/<id>; every update also bumps `updated_at`, which is
+    the job's heartbeat.
+
+    A sweeper thread, started with the worker (start()) and repeated every
+    `sweep_seconds`, picks up what a crash, deploy or worker recycle left
+    behind: `running` jobs whose heartbeat is older than `stale_seconds`
+    go back to `queued` while their spool file is still here and they have
+    attempts left, otherwise they are failed and the file is removed; then
+    every queued job whose file is on this host is run. A re-run picks up
+    after the last chunk the interrupted run reported, with its counts.
+
+    When the worker exits (shutdown()), running jobs stop at their next
+    progress update, after the chunk in hand is committed, and go back to
+    `queued` for another worker to resume without using up an attempt.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.max_workers = 2
+        self.spool_dir = "tmp/imports"
+        self.stale_seconds = 600
+        self.sweep_seconds = 60
+        self.max_attempts = 3
+        self._handlers = {}
+        self._executor = None
+        self._pid = None
+        self._submitted = set()
+        self._running = set()
+        self._stopping = threading.Event()
+        self._sweeper = None
+        self._lock = threading.Lock()
+
+        self.requeued = 0
+        self.handed_off = 0
+        self.abandoned = 0
+        self.last_error = None
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = app.config.get("IMPORT_JOB_WORKERS", self.max_workers)
+        self.spool_dir = app.config.get("IMPORT_SPOOL_DIR", self.spool_dir)
+        self.stale_seconds = app.config.get("IMPORT_JOB_STALE_SECONDS", self.stale_seconds)
+        self.sweep_seconds = app.config.get("IMPORT_JOB_SWEEP_SECONDS", self.sweep_seconds)
+        self.max_attempts = app.config.get("IMPORT_JOB_MAX_ATTEMPTS", self.max_attempts)
+
+    def register(self, kind, handler):
+        """
+        `handler(file_path, filename, progress, resume)` runs the import and
+        returns its summary; `progress(total=..., processed=..., failed=..., imported=...)`
+        records how far it got. `resume` holds the processed / failed /
+        imported counts of an interrupted earlier run (all 0 the first time):
+        the handler skips the first `processed` rows and counts on from there.
+        """
+        self._handlers[kind] = handler
+
+    def _get_executor(self):
+        # Pools do not survive fork(), so a pre-forked worker builds its own
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                return self._executor
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="import-job"
+            )
+            self._pid = os.getpid()
+            self._submitted = set()
+            self._running = set()
+            return self._executor
+
+    def _submit(self, job_id):
+        if self._stopping.is_set():
+            return
+        with self._lock:
+            if job_id in self._submitted:
+                return
+            self._submitted.add(job_id)
+        self._get_executor().submit(self._run, job_id)
+
+    def enqueue(self, kind, file):
+        """Spool an uploaded file and queue it for `kind`; returns the ImportJob"""
+        if kind not in self._handlers:
+            raise ValueError(f"No import handler registered for '{kind}'")
+
+        job = ImportJob(kind=kind, filename=file.filename, status="queued")
+        db.session.add(job)
+        db.session.flush()
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        job.file_path = os.path.join(self.spool_dir, f"{job.id}_{secure_filename(file.filename) or 'upload'}")
+        file.save(job.file_path)
+        db.session.commit()
+
+        self.start()
+        self._submit(job.id)
+        return job
+
+    def shutdown(self, timeout=10):
+        """
+        Stop taking jobs and ask the running ones to hand themselves back;
+        waits up to `timeout` seconds and returns how many are still running
+        (the sweeper elsewhere picks those up once their heartbeat is stale).
+        """
+        self._stopping.set()
+        if self._executor is None or self._pid != os.getpid():
+            return 0
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        deadline = time.monotonic() + timeout
+        while self._running and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if self._running:
+            print(f"{len(self._running)} import job(s) still running at worker exit")
+        return len(self._running)
+
+    # -------------------------
+    # RECOVERY
+    # -------------------------
+    def start(self):
+        """Start this worker's sweeper; its first pass runs right away"""
+        if not self.sweep_seconds:
+            return
+
+        # Threads do not survive fork(), so a pre-forked worker starts its own
+        if self._sweeper is not None and self._pid == os.getpid() and self._sweeper.is_alive():
+            return
+
+        self._get_executor()
+        with self._lock:
+            if self._sweeper is not None and self._pid == os.getpid() and self._sweeper.is_alive():
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="import-job-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stopping.is_set():
+            try:
+                with self.app.app_context():
+                    self.recover()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Import job sweep failed: {str(e)}")
+            self._stopping.wait(self.sweep_seconds)
+
+    def recover(self):
+        """Re-queue or fail interrupted jobs, then run the queued jobs whose spool file is on this host"""
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.stale_seconds)
+
+        stale = db.session.execute(
+            select(ImportJob.id, ImportJob.file_path, ImportJob.attempts)
+            .where(ImportJob.status == "running", ImportJob.updated_at < cutoff)
+        ).all()
+        for job_id, file_path, attempts in stale:
+            has_file = bool(file_path) and os.path.exists(file_path)
+            if has_file and (attempts or 0) < self.max_attempts:
+                values = {"status": "queued", "updated_at": now}
+            else:
+                reason = "its upload is no longer available" if not has_file else f"after {attempts} attempts"
+                values = {
+                    "status": "failed",
+                    "error": f"Import was interrupted and cannot be resumed ({reason}); upload the file again",
+                    "finished_at": now
+                }
+            # Conditional, so only one worker sweeps each job
+            swept = db.session.execute(
+                update(ImportJob)
+                .where(ImportJob.id == job_id, ImportJob.status == "running", ImportJob.updated_at < cutoff)
+                .values(**values)
+            ).rowcount
+            db.session.commit()
+            if not swept:
+                continue
+            if values["status"] == "queued":
+                self.requeued += 1
+                print(f"Import job {job_id} was interrupted; queued again")
+            else:
+                self.abandoned += 1
+                print(f"Import job {job_id} was interrupted; marked failed")
+                if has_file:
+                    os.remove(file_path)
+
+        queued = db.session.execute(
+            select(ImportJob.id, ImportJob.file_path)
+            .where(ImportJob.status == "queued")
+            .order_by(ImportJob.created_at)
+        ).all()
+        for job_id, file_path in queued:
+            if file_path and os.path.exists(file_path):
+                self._submit(job_id)
+            else:
+                # The file is saved before the job is committed, so it is gone for good
+                abandoned = db.session.execute(
+                    update(ImportJob)
+                    .where(ImportJob.id == job_id, ImportJob.status == "queued")
+                    .values(
+                        status="failed",
+                        error="Import upload is no longer available; upload the file again",
+                        finished_at=now
+                    )
+                ).rowcount
+                db.session.commit()
+                self.abandoned += abandoned
+
+    # -------------------------
+    # EXECUTION
+    # -------------------------
+    def _run(self, job_id):
+        try:
+            self._run_job(job_id)
+        finally:
+            with self._lock:
+                self._submitted.discard(job_id)
+
+    def _run_job(self, job_id):
+        with self.app.app_context():
+            # Claim the job; another worker may have picked it up already
+            now = datetime.utcnow()
+            claimed = db.session.execute(
+                update(ImportJob)
+                .where(ImportJob.id == job_id, ImportJob.status == "queued")
+                .values(status="running", started_at=now, updated_at=now, attempts=ImportJob.attempts + 1)
+            ).rowcount
+            db.session.commit()
+            if not claimed:
+                return
+            self._running.add(job_id)
+
+            job = db.session.get(ImportJob, job_id)
+            file_path, filename = job.file_path, job.filename
+            resume = {
+                "processed": job.processed_rows or 0,
+                "failed": job.failed_rows or 0,
+                "imported": job.imported_rows or 0
+            }
+
+            def progress(**counts):
+                values = {
+                    key + "_rows": value
+                    for key, value in counts.items()
+                    if key in ("total", "processed", "failed", "imported")
+                }
+                db.session.execute(
+                    update(ImportJob).where(ImportJob.id == job_id).values(
+                        updated_at=datetime.utcnow(), **values
+                    )
+                )
+                db.session.commit()
+                # Chunk updates come right after a commit, a clean point to stop
+                if self._stopping.is_set() and "processed" in counts:
+                    raise JobInterrupted()
+
+            keep_file = False
+            try:
+                result = self._handlers[job.kind](file_path, filename, progress, resume)
+                db.session.execute(
+                    update(ImportJob).where(ImportJob.id == job_id).values(
+                        status="completed", result=result, finished_at=datetime.utcnow()
+                    )
+                )
+                db.session.commit()
+            except JobInterrupted:
+                db.session.rollback()
+                db.session.execute(
+                    update(ImportJob).where(ImportJob.id == job_id).values(
+                        status="queued", attempts=ImportJob.attempts - 1, updated_at=datetime.utcnow()
+                    )
+                )
+                db.session.commit()
+                keep_file = True
+                self.handed_off += 1
+                print(f"Import job {job_id} handed back at worker exit")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Import job {job_id} failed: {str(e)}")
+                db.session.execute(
+                    update(ImportJob).where(ImportJob.id == job_id).values(
+                        status="failed", error=str(e), finished_at=datetime.utcnow()
+                    )
+                )
+                db.session.commit()
+            finally:
+                self._running.discard(job_id)
+                if not keep_file and file_path and os.path.exists(file_path):
+                    os.remove(file_path)
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "pool_started": self._executor is not None and self._pid == os.getpid(),
+            "sweeper_running": self._sweeper is not None and self._pid == os.getpid() and self._sweeper.is_alive(),
+            "handlers": sorted(self._handlers),
+            "running": len(self._running),
+            "requeued": self.requeued,
+            "handed_off": self.handed_off,
+            "abandoned": self.abandoned,
+            "last_error": self.last_error
+        }
+
+
+# Global instance
+job_queue = JobQueue()
@@ -0,0 +1,185 @@
+# utils/pagination.py
+import base64
+import json
+from datetime import date, datetime, timedelta
+from flask import current_app, request
+from sqlalchemy import func, tuple_
+
+
+class PaginationError(ValueError):
+    """Bad cursor, limit or filter value (shown to the user as a 400)"""
+
+
+# ===================================
+# CURSORS
+# ===================================
+def encode_cursor(key, value, row_id):
+    """Opaque token for the position just after (value, row_id) in `key` order"""
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    payload = json.dumps({"k": key, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, key):
+    """Returns (value, row_id) from a token made by encode_cursor for the same `key`"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] != key:
+            raise ValueError("cursor belongs to a different listing")
+        value = payload["v"]
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value, int(payload["id"])
+    except Exception:
+        raise PaginationError("Invalid cursor")
+
+
+# ===================================
+# REQUEST ARGS
+# ===================================
+def parse_limit():
+    """`limit` query arg, defaulting to PAGE_SIZE_DEFAULT and capped at PAGE_SIZE_MAX"""
+    default = current_app.config.get("PAGE_SIZE_DEFAULT", 50)
+    maximum = current_app.config.get("PAGE_SIZE_MAX", 500)
+
+    limit = request.args.get("limit", default)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+    return min(limit, maximum)
+
+
+def parse_date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise PaginationError(f"{name} must be a date in YYYY-MM-DD format")
+
+
+def prefix_pattern(value):
+    """Case-insensitive LIKE pattern for `value%` (match against func.lower(column))"""
+    escaped = value.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+# ===================================
+# KEYSET PAGINATION
+# ===================================
+def keyset_filter(query, key, sort_column, id_column, cursor=None):
+    """Restrict `query` to the rows after `cursor` in newest-first (sort_column, id_column) order"""
+    if not cursor:
+        return query
+    value, row_id = decode_cursor(cursor, key)
+    return query.filter(tuple_(sort_column, id_column) < tuple_(value, row_id))
+
+
+def next_page(rows, key, sort_column, limit, entity=None):
+    """
+    Trim rows fetched with limit + 1 and build the cursor for the page after them.
+    `entity(row)` picks the model instance out of multi-column rows.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = entity(rows[-1]) if entity else rows[-1]
+    return rows, encode_cursor(key, getattr(last, sort_column.key), last.id)
+
+
+def keyset_paginate(query, key, sort_column, id_column, limit, cursor=None):
+    """
+    Newest-first page of `query` ordered by (sort_column, id_column).
+
+    Instead of OFFSET, the next page starts strictly after the last row of
+    the previous one, so every page costs the same index range scan no
+    matter how deep it is. Returns (rows, next_cursor); next_cursor is None
+    on the last page.
+    """
+    query = keyset_filter(query, key, sort_column, id_column, cursor)
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+    return next_page(rows, key, sort_column, limit)
+
+
+# ===================================
+# CERTIFICATE FILTERS
+# ===================================
+def certificate_filters(model):
+    """
+    Conditions for the certificate listings from the query string:
+    course, year, issued_from / issued_to (YYYY-MM-DD, inclusive) and
+    name (prefix of the first or last name).
+    """
+    conditions = []
+
+    course = request.args.get("course", "").strip()
+    if course:
+        conditions.append(model.course_name == course)
+
+    year = request.args.get("year", "").strip()
+    if year:
+        conditions.append(model.year_of_study == year)
+
+    issued_from = parse_date_arg("issued_from")
+    if issued_from:
+        conditions.append(model.issued_at >= issued_from)
+
+    issued_to = parse_date_arg("issued_to")
+    if issued_to:
+        conditions.append(model.issued_at < issued_to + timedelta(days=1))
+
+    name = request.args.get("name", "").strip()
+    if name:
+        pattern = prefix_pattern(name)
+        conditions.append(
+            func.lower(model.student_first_name).like(pattern, escape="\\")
+            | func.lower(model.student_last_name).like(pattern, escape="\\")
+        )
+
+    return conditions
+
+
+# ===================================
+# STUDENT FILTERS
+# ===================================
+def student_filters(model):
+    """
+    Conditions for the student listing from the query string:
+    course, year, name (prefix of the first or last name) and
+    status (certified / not_certified).
+    """
+    conditions = []
+
+    course = request.args.get("course", "").strip()
+    if course:
+        conditions.append(model.course_name == course)
+
+    year = request.args.get("year", "").strip()
+    if year:
+        conditions.append(model.year_of_study == year)
+
+    name = request.args.get("name", "").strip()
+    if name:
+        pattern = prefix_pattern(name)
+        conditions.append(
+            func.lower(model.first_name).like(pattern, escape="\\")
+            | func.lower(model.last_name).like(pattern, escape="\\")
+        )
+
+    status = request.args.get("status", "").strip().lower()
+    if status == "certified":
+        conditions.append(model.certificates.any())
+    elif status == "not_certified":
+        conditions.append(~model.certificates.any())
+    elif status:
+        raise PaginationError("status must be certified or not_certified")
+
+    return conditions
@@ -1,10 +1,13 @@
 from fpdf import FPDF
 import os
+import tempfile
+from .asset_storage import asset_storage
 
-def generate_certificate_pdf(student_name, course_name, certificate_number, qr_path, output_dir='pdfs'):
-    os.makedirs(output_dir, exist_ok=True)
-    pdf_path = os.path.join(output_dir, f"{certificate_number.replace('/', '_')}.pdf")
+def generate_certificate_pdf(student_name, course_name, certificate_number, qr_image):
+    """Render the certificate PDF and store it in the asset storage; returns its URL.
 
+    `qr_image` is the QR code as PNG bytes or a path to a PNG file.
+    """
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=18, style="B")
@@ -16,12 +19,17 @@ def generate_certificate_pdf(student_name, course_name, certificate_number, qr_p
     pdf.cell(200, 10, f"Course: {course_name}", ln=True, align='C')
     pdf.cell(200, 10, f"Certificate No: {certificate_number}", ln=True, align='C')
 
-    # Embed QR Code
-    pdf.image(qr_path, x=80, y=80, w=50, h=50)
-
-    pdf.output(pdf_path)
-
-    return pdf_path
+    # Embed QR Code (fpdf only reads images from files)
+    if isinstance(qr_image, (bytes, bytearray)):
+        with tempfile.NamedTemporaryFile(suffix='.png') as qr_file:
+            qr_file.write(qr_image)
+            qr_file.flush()
+            pdf.image(qr_file.name, x=80, y=80, w=50, h=50)
+    else:
+        pdf.image(qr_image, x=80, y=80, w=50, h=50)
+
+    pdf_bytes = pdf.output(dest='S').encode('latin-1')
+    return asset_storage.put(pdf_bytes, f"{certificate_number.replace('/', '_')}.pdf", "application/pdf")
 
 
 
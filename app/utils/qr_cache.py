@@ -0,0 +1,101 @@
+# utils/qr_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from .qr_generator import qr_payload, render_qr
+
+# Bump when the rendering changes, so clients holding an old ETag get the new image
+RENDER_VERSION = "1"
+
+
+def qr_etag(qr_data, image_format, box_size, border):
+    """Strong ETag for a rendered QR: a hash of everything that goes into the image"""
+    key = f"{RENDER_VERSION}|{image_format}|{box_size}|{border}|{qr_data}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+class QRRenderCache:
+    """
+    Bounded LRU of rendered QR images, keyed by ETag.
+
+    The ETag covers the QR payload and rendering options, so an update to
+    a certificate (or a switch of QR_PAYLOAD) produces a new key and stale images simply age out; there
+    is nothing to invalidate. The cache lives in the worker process.
+    """
+
+    def __init__(self, max_size=2000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.render_seconds = 0.0
+
+    def init_app(self, app):
+        self.max_size = app.config.get("QR_CACHE_SIZE", self.max_size)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def etag(self, certificate, image_format="png", box_size=10, border=4):
+        """ETag of the image get() would return, without rendering it"""
+        return qr_etag(self._payload(certificate), image_format, box_size, border)
+
+    @staticmethod
+    def _payload(certificate):
+        return qr_payload(
+            certificate["student_name"],
+            certificate["course_name"],
+            certificate["verification_code"],
+            certificate["issued_at"]
+        )
+
+    def get(self, certificate, image_format="png", box_size=10, border=4):
+        """
+        (etag, image bytes) for a serialized certificate (as returned by the
+        verification lookup). Renders on a miss.
+        """
+        etag = self.etag(certificate, image_format, box_size, border)
+
+        with self._lock:
+            image = self._entries.get(etag)
+            if image is not None:
+                self._entries.move_to_end(etag)
+                self.hits += 1
+                return etag, image
+            self.misses += 1
+
+        started = time.perf_counter()
+        image = render_qr(self._payload(certificate), box_size=box_size, border=border, image_format=image_format)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.render_seconds += elapsed
+            if self.max_size > 0:
+                self._entries[etag] = image
+                self._entries.move_to_end(etag)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return etag, image
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "bytes": sum(len(image) for image in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "avg_render_ms": round(self.render_seconds / self.misses * 1000, 2) if self.misses else 0.0
+            }
+
+
+# Global instance
+qr_render_cache = QRRenderCache()
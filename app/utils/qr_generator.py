@@ -3,10 +3,13 @@ import qrcode
 import json
 import io
 from datetime import datetime
-from .google_drive import drive_service
+from urllib.parse import quote, urlsplit
+from flask import current_app, url_for
+from .asset_storage import asset_storage
+from .signing import url_signer
 
-def generate_certificate_qr(student_name, course_name, certificate_number, issued_at):
-    """Generate QR code and upload to Google Drive"""
+def certificate_qr_data(student_name, course_name, certificate_number, issued_at):
+    """JSON text encoded in the certificate QR code"""
     
     # Format date
     if hasattr(issued_at, 'isoformat'):
@@ -25,36 +28,95 @@ def generate_certificate_qr(student_name, course_name, certificate_number, issue
         "verify_url": f"https://speedlinktraining.com/verify/{certificate_number}"
     }
     
-    json_str = json.dumps(qr_data)
+    return json.dumps(qr_data)
+
+
+def check_public_base_url(app):
+    """
+    Stored QR links and signed QR payloads are handed to third-party
+    verifiers, so they must be absolute. Background imports have no request
+    to take the host from, so without PUBLIC_BASE_URL (or SERVER_NAME) the
+    app refuses to start instead of storing relative links.
+    """
+    if app.config.get("PUBLIC_BASE_URL") or app.config.get("SERVER_NAME"):
+        return
+    on_demand_qr = not app.config.get("QR_STORE_ON_ISSUE")
+    signed_qr = app.config.get("QR_PAYLOAD", "json") == "signed_url" and not app.config.get("QR_VERIFY_BASE_URL")
+    if on_demand_qr or signed_qr:
+        raise ValueError(
+            "PUBLIC_BASE_URL is required (e.g. https://api.example.com): certificate QR links are stored "
+            "and shared with verifiers, so they need this API's public address"
+        )
+
+
+def public_base_url():
+    """PUBLIC_BASE_URL, else this app's root URL as Flask builds it (request host or SERVER_NAME)"""
+    base_url = current_app.config.get("PUBLIC_BASE_URL", "").rstrip("/")
+    return base_url or url_for("index", _external=True).rstrip("/")
+
+
+def compact_verify_url(certificate_number):
+    """Short signed verification link (<base>/V/<code>.<signature>) for the compact QR payload"""
+    base_url = (current_app.config.get("QR_VERIFY_BASE_URL") or public_base_url()).rstrip("/")
+    # Scheme and host are case-insensitive; upper case keeps the link in the denser QR alphanumeric mode
+    if not urlsplit(base_url).path:
+        base_url = base_url.upper()
+    return f"{base_url}/V/{quote(url_signer.sign(certificate_number), safe='/')}"
+
+
+def qr_payload(student_name, course_name, certificate_number, issued_at):
+    """What the certificate QR encodes: the JSON document, or a signed link with QR_PAYLOAD=signed_url"""
+    if current_app.config.get("QR_PAYLOAD", "json") == "signed_url":
+        return compact_verify_url(certificate_number)
+    return certificate_qr_data(student_name, course_name, certificate_number, issued_at)
+
+
+def render_qr(data, box_size=10, border=4, image_format="png"):
+    """Render QR code data to PNG (or SVG) bytes (pure CPU work, safe to run in a process pool)"""
     
     # Generate QR code
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
+        box_size=box_size,
+        border=border,
     )
-    qr.add_data(json_str)
+    qr.add_data(data)
     qr.make(fit=True)
     
-    # Create image
-    img = qr.make_image(fill_color="black", back_color="white")
-    
     # Convert to bytes
     img_bytes = io.BytesIO()
-    img.save(img_bytes, format='PNG')
-    img_bytes = img_bytes.getvalue()
-    
-    # Generate filename
-    filename = f"{certificate_number.replace('/', '_')}.png"
-    
-    try:
-        # Upload to Google Drive
-        drive_url = drive_service.upload_file(img_bytes, filename)
-        return drive_url
-    except Exception as e:
-        # If not authenticated, raise an error
-        raise Exception(f"Google Drive not authenticated. Please authenticate first: {str(e)}")
+    if image_format == "svg":
+        from qrcode.image.svg import SvgPathImage
+        qr.make_image(image_factory=SvgPathImage).save(img_bytes)
+    else:
+        img = qr.make_image(fill_color="black", back_color="white")
+        img.save(img_bytes, format='PNG')
+    return img_bytes.getvalue()
+
+
+def _certificate_qr_path(certificate_number):
+    return f"/certificate/{quote(certificate_number, safe='/')}/qr.png"
+
+
+def certificate_qr_url(certificate_number):
+    """Absolute public URL of the on-demand QR image (GET /certificate/<code>/qr.png)"""
+    return public_base_url() + _certificate_qr_path(certificate_number)
+
+
+def is_certificate_qr_url(url, certificate_number):
+    """Whether a stored qr_code_url is the on-demand image of this code, whatever host (or none) it was stored with"""
+    return bool(url) and urlsplit(url).path == _certificate_qr_path(certificate_number)
+
+
+def qr_filename(certificate_number):
+    return f"{certificate_number.replace('/', '_')}.png"
+
+
+def generate_certificate_qr(student_name, course_name, certificate_number, issued_at):
+    """Generate QR code and store it in the asset storage; returns its URL (raises AssetStorageError)"""
+    img_bytes = render_qr(qr_payload(student_name, course_name, certificate_number, issued_at))
+    return asset_storage.put(img_bytes, qr_filename(certificate_number), "image/png")
 
 
 
@@ -0,0 +1,110 @@
+# utils/qr_pipeline.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from .qr_generator import qr_payload, render_qr, qr_filename
+from .asset_storage import asset_storage
+
+
+def _render(data):
+    started = time.perf_counter()
+    img_bytes = render_qr(data)
+    return img_bytes, time.perf_counter() - started
+
+
+def _upload(batch):
+    started = time.perf_counter()
+    urls = asset_storage.put_many([
+        (img_bytes, qr_filename(certificate_number), "image/png") for certificate_number, img_bytes in batch
+    ])
+    return urls, time.perf_counter() - started
+
+
+def render_and_upload_qr_codes(items, render_workers=None, upload_workers=8, min_parallel_rows=50):
+    """
+    Render and upload QR codes for many certificates.
+
+    `items` is a list of (student_name, course_name, certificate_number, issued_at).
+    Rendering runs in a process pool (it is CPU-bound PIL work) and each
+    image is handed to a bounded thread pool for upload as soon as it is
+    rendered, so the two stages overlap. Small batches are rendered inline
+    because starting worker processes costs more than it saves. Storage
+    drivers with a batch path (Google Drive) get the images in groups of
+    up to QR_UPLOAD_BATCH_SIZE, spread over the upload threads.
+
+    Returns (urls, stats): urls line up with `items` and are None where the
+    upload failed. render_seconds is summed per image and upload_seconds
+    per upload call, wall_seconds is the elapsed time of the whole pipeline.
+    """
+    started = time.perf_counter()
+    if not items:
+        return [], _stats(0, 0.0, 0.0, 0.0, 0, 0, 0)
+
+    render_workers = render_workers or os.cpu_count() or 1
+    use_processes = render_workers > 1 and len(items) >= min_parallel_rows
+
+    render_pool = ProcessPoolExecutor(max_workers=render_workers) if use_processes else None
+    upload_workers = max(1, upload_workers)
+    upload_pool = ThreadPoolExecutor(max_workers=upload_workers)
+    futures = []
+    render_seconds = 0.0
+    upload_seconds = 0.0
+
+    try:
+        # Payloads are built here (signing needs the app config), images in the pool
+        payloads = [qr_payload(*item) for item in items]
+        if render_pool:
+            chunksize = max(1, len(items) // (render_workers * 4))
+            rendered = render_pool.map(_render, payloads, chunksize=chunksize)
+        else:
+            rendered = map(_render, payloads)
+
+        # Enough batches to keep every upload thread busy
+        batch_size = max(1, min(asset_storage.batch_size(), -(-len(items) // upload_workers)))
+
+        batch = []
+        for item, (img_bytes, seconds) in zip(items, rendered):
+            render_seconds += seconds
+            batch.append((item[2], img_bytes))
+            if len(batch) >= batch_size:
+                futures.append((len(batch), upload_pool.submit(_upload, batch)))
+                batch = []
+        if batch:
+            futures.append((len(batch), upload_pool.submit(_upload, batch)))
+
+        urls = []
+        for count, future in futures:
+            try:
+                batch_urls, seconds = future.result()
+                upload_seconds += seconds
+                urls.extend(batch_urls)
+            except Exception as e:
+                print(f"QR upload failed: {str(e)}")
+                urls.extend([None] * count)
+    finally:
+        upload_pool.shutdown(wait=True)
+        if render_pool:
+            render_pool.shutdown(wait=True)
+
+    return urls, _stats(
+        len(items),
+        render_seconds,
+        upload_seconds,
+        time.perf_counter() - started,
+        render_workers if use_processes else 1,
+        upload_workers,
+        batch_size
+    )
+
+
+def _stats(count, render_seconds, upload_seconds, wall_seconds, render_workers, upload_workers, upload_batch_size):
+    return {
+        "qr_codes": count,
+        "render_workers": render_workers,
+        "upload_workers": upload_workers,
+        "upload_batch_size": upload_batch_size,
+        "render_seconds": round(render_seconds, 3),
+        "upload_seconds": round(upload_seconds, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "qr_per_sec": round(count / wall_seconds, 2) if wall_seconds > 0 else None
+    }
@@ -0,0 +1,285 @@
+# utils/rate_limiter.py
+import functools
+import hmac
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, jsonify, make_response, request
+
+_RATE_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(s|sec|second|m|min|minute|h|hour|d|day)s?\s*$")
+_PERIODS = {"s": 1, "sec": 1, "second": 1, "m": 60, "min": 60, "minute": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+
+def parse_rate(rate):
+    """
+    "60/minute" -> (capacity 60, refill 1.0 token per second). Also accepts
+    "10/second", "1000/hour", "5/10s" ... The bucket holds `capacity`
+    tokens, so a client can burst that many requests and then continue at
+    the refill rate.
+    """
+    match = _RATE_PATTERN.match(rate or "")
+    if not match:
+        raise ValueError(f"Invalid rate {rate!r} (expected e.g. 60/minute)")
+    count, multiplier, unit = match.groups()
+    period = int(multiplier or 1) * _PERIODS[unit]
+    return int(count), int(count) / period
+
+
+def client_ip():
+    """
+    Address of the client. With RATE_LIMIT_TRUSTED_PROXIES = n, the n-th
+    X-Forwarded-For entry from the right is used (the address the nearest
+    trusted proxy saw); entries further left can be forged by the client.
+    """
+    hops = current_app.config.get("RATE_LIMIT_TRUSTED_PROXIES", 0)
+    if hops:
+        forwarded = [part.strip() for part in request.headers.get("X-Forwarded-For", "").split(",") if part.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.remote_addr or "unknown"
+
+
+# ===================================
+# IN-PROCESS BUCKETS
+# ===================================
+class MemoryBuckets:
+    """
+    Token buckets in a bounded LRU dict, per worker process. With several
+    workers each keeps its own buckets, so a client gets up to
+    workers x the limit; use the redis backend for exact shared limits.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, cost=1):
+        """(allowed, tokens left, seconds until `cost` tokens are available)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                # The least recently seen client; a full bucket would be recreated the same way
+                self._buckets.popitem(last=False)
+        return allowed, tokens, 0.0 if allowed else (cost - tokens) / rate
+
+    def size(self):
+        return len(self._buckets)
+
+
+# ===================================
+# SHARED BUCKETS (REDIS)
+# ===================================
+# Refill, take and store in one atomic step, on the Redis clock so workers
+# with skewed clocks agree. Idle buckets expire once they would be full again.
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBuckets:
+    """
+    Token buckets shared by every worker and instance through Redis (or a
+    Redis-compatible server such as Valkey, KeyDB or fakeredis in tests).
+    One EVALSHA per check. The redis package is only needed, and imported,
+    when this backend is used.
+    """
+
+    name = "redis"
+
+    def __init__(self, url=None, prefix="ratelimit:", client=None, timeout=0.25):
+        self.url = url
+        self.prefix = prefix
+        self.timeout = timeout
+        self._client = client
+        self._script = None
+        self._pid = os.getpid() if client is not None else None
+        self._lock = threading.Lock()
+
+    def client(self):
+        # Connection pools must not be shared across fork()
+        if self._client is not None and self._pid == os.getpid():
+            return self._client
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                try:
+                    import redis
+                except ImportError as e:
+                    raise RuntimeError("The redis rate limit backend needs the redis package (pip install redis)") from e
+                if not self.url:
+                    raise RuntimeError("RATE_LIMIT_REDIS_URL is not set")
+                self._client = redis.Redis.from_url(
+                    self.url, socket_timeout=self.timeout, socket_connect_timeout=self.timeout
+                )
+                self._script = None
+                self._pid = os.getpid()
+        return self._client
+
+    def take(self, key, capacity, rate, cost=1):
+        client = self.client()
+        if self._script is None:
+            self._script = client.register_script(_TAKE_SCRIPT)
+        allowed, tokens = self._script(keys=[self.prefix + key], args=[capacity, rate, cost], client=client)
+        tokens = float(tokens)
+        return bool(allowed), tokens, 0.0 if allowed else (cost - tokens) / rate
+
+    def size(self):
+        return None
+
+
+# ===================================
+# LIMITER
+# ===================================
+class RateLimiter:
+    """
+    Token-bucket rate limits for the public endpoints.
+
+    Routes opt in with @rate_limiter.limit("<name>"); RATE_LIMITS maps each
+    name to a rate ("verify": "60/minute"). Requests are keyed by client:
+    a known X-API-Key gets its own bucket at RATE_LIMIT_CLIENT_RATE,
+    everyone else is keyed by IP. A throttled request is answered 429 with
+    Retry-After before the view runs, so it never reaches the database.
+    If the shared backend is unreachable requests are let through
+    (RATE_LIMIT_FAIL_OPEN), so Redis trouble does not take verification down.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.backend = MemoryBuckets()
+        self.limits = {}
+        self.client_rate = None
+        self.api_keys = {}
+        self.fail_open = True
+        self._lock = threading.Lock()
+
+        self.allowed = 0
+        self.throttled = 0
+        self.errors = 0
+        self.throttled_by_route = {}
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RATE_LIMIT_ENABLED", self.enabled)
+        self.fail_open = app.config.get("RATE_LIMIT_FAIL_OPEN", self.fail_open)
+        self.limits = {name: parse_rate(rate) for name, rate in app.config.get("RATE_LIMITS", {}).items() if rate}
+        client_rate = app.config.get("RATE_LIMIT_CLIENT_RATE")
+        self.client_rate = parse_rate(client_rate) if client_rate else None
+        self.api_keys = dict(app.config.get("RATE_LIMIT_API_KEYS", {}))
+
+        kind = app.config.get("RATE_LIMIT_BACKEND", "memory").lower()
+        if kind == "memory":
+            self.backend = MemoryBuckets(app.config.get("RATE_LIMIT_MAX_KEYS", 100000))
+        elif kind == "redis":
+            self.backend = RedisBuckets(app.config.get("RATE_LIMIT_REDIS_URL"), app.config.get("RATE_LIMIT_REDIS_PREFIX", "ratelimit:"))
+        else:
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND {kind!r} (expected memory or redis)")
+
+    def api_client(self):
+        """Name of the partner whose X-API-Key the current request carries, or None"""
+        api_key = request.headers.get("X-API-Key")
+        if api_key:
+            for client_name, key in self.api_keys.items():
+                if hmac.compare_digest(api_key, key):
+                    return client_name
+        return None
+
+    def _client(self):
+        """(bucket key, is a known API client)"""
+        client_name = self.api_client()
+        if client_name:
+            return f"client:{client_name}", True
+        return f"ip:{client_ip()}", False
+
+    def check(self, name):
+        """(allowed, headers) for the current request against limit `name`"""
+        limit = self.limits.get(name)
+        if not self.enabled or not limit:
+            return True, {}
+
+        key, known_client = self._client()
+        capacity, rate = self.client_rate if known_client and self.client_rate else limit
+        try:
+            allowed, tokens, retry_after = self.backend.take(f"{name}:{key}", capacity, rate)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"Rate limit check failed ({self.backend.name}): {str(e)}")
+            return self.fail_open, {}
+
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.throttled += 1
+                self.throttled_by_route[name] = self.throttled_by_route.get(name, 0) + 1
+
+        headers = {"X-RateLimit-Limit": str(capacity), "X-RateLimit-Remaining": str(int(tokens))}
+        if not allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return allowed, headers
+
+    def limit(self, name):
+        """Decorator applying limit `name` to a view"""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                allowed, headers = self.check(name)
+                if not allowed:
+                    response = jsonify({
+                        "status": "RATE_LIMITED",
+                        "message": "Too many requests, retry later",
+                        "retry_after": int(headers.get("Retry-After", 1))
+                    })
+                    response.status_code = 429
+                else:
+                    response = make_response(view(*args, **kwargs))
+                response.headers.extend(headers)
+                return response
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "backend": self.backend.name,
+                "limits": {name: f"{capacity} burst, {round(rate, 4)}/s" for name, (capacity, rate) in self.limits.items()},
+                "allowed": self.allowed,
+                "throttled": self.throttled,
+                "throttled_by_route": dict(self.throttled_by_route),
+                "errors": self.errors,
+                "tracked_clients": self.backend.size()
+            }
+
+
+# Global instance
+rate_limiter = RateLimiter()
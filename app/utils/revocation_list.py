@@ -0,0 +1,287 @@
+# utils/revocation_list.py
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_, select
+from ..extensions import db
+from ..models.certificate import Certificate
+from ..models.revocation_event import RevocationEvent
+from .bloom import BloomFilter
+from .certificate_tokens import certificate_tokens
+
+# Actions that make a certificate code stop verifying
+REVOKING_ACTIONS = ("revoke", "delete")
+
+
+def front_code(codes):
+    """
+    Front-code a sorted list of strings: each entry is "<n>:<suffix>" where
+    n is how many leading characters it shares with the previous one.
+    Certificate numbers share long prefixes (SHSL/25B/DS/...), so this is
+    typically a third of the plain list.
+    """
+    encoded = []
+    previous = ""
+    for code in codes:
+        shared = 0
+        limit = min(len(previous), len(code))
+        while shared < limit and previous[shared] == code[shared]:
+            shared += 1
+        encoded.append(f"{shared}:{code[shared:]}")
+        previous = code
+    return encoded
+
+
+class RevocationList:
+    """
+    Per-worker view of revoked certificates, kept current from the
+    revocation_events table.
+
+    `might_be_revoked(code)` is a Bloom filter lookup: False means the code
+    has never been revoked (the common case, answered without a query),
+    True means check() has to confirm it against the certificate row. The
+    filter is loaded once, then every worker applies only the events added
+    since its cursor, at most every `refresh_seconds` and right after its
+    own writes. Ids are assigned before commit, so an event can become
+    visible after a higher id was read; each refresh also re-reads the
+    events of the last `overlap_seconds` and applies the ones it has not
+    seen. Reinstated codes cannot be removed from a Bloom filter, so both
+    filters are rebuilt every `rebuild_seconds`, and sooner once
+    reinstatements make up a quarter of the revoked filter.
+
+    The same events feed the signed-token filter (certificate_tokens), so
+    deletes and edits made on any worker reach every worker's token checks.
+    """
+
+    def __init__(self):
+        self.refresh_seconds = 5
+        self.overlap_seconds = 60
+        self.rebuild_seconds = 3600
+        self.capacity = 100000
+        self.error_rate = 0.001
+
+        self.filter = BloomFilter(self.capacity, self.error_rate)
+        self.cursor = None
+        self.stale = 0
+        # Ids of applied events still inside the overlap window -> created_at
+        self._seen = {}
+        self._next_refresh = 0.0
+        self._next_rebuild = 0.0
+        self._lock = threading.Lock()
+
+        self.refreshes = 0
+        self.rebuilds = 0
+        self.events_applied = 0
+        self.late_events = 0
+        self.filter_hits = 0
+        self.confirmed = 0
+        self.last_error = None
+
+    def init_app(self, app):
+        self.refresh_seconds = app.config.get("REVOCATION_REFRESH_SECONDS", self.refresh_seconds)
+        self.overlap_seconds = app.config.get("REVOCATION_OVERLAP_SECONDS", self.overlap_seconds)
+        self.rebuild_seconds = app.config.get("REVOCATION_REBUILD_SECONDS", self.rebuild_seconds)
+        self.capacity = app.config.get("REVOCATION_FILTER_CAPACITY", self.capacity)
+        self.error_rate = app.config.get("REVOCATION_FILTER_ERROR_RATE", self.error_rate)
+        self.filter = BloomFilter(self.capacity, self.error_rate)
+        self.cursor = None
+        self.stale = 0
+        self._seen = {}
+        self._next_refresh = 0.0
+        self._next_rebuild = 0.0
+
+    # -------------------------
+    # WRITE SIDE
+    # -------------------------
+    def record(self, code, action, certificate_id=None, reason=None):
+        """Add an event in the current transaction; the caller commits, then calls refresh(force=True)"""
+        db.session.add(RevocationEvent(
+            certificate_id=certificate_id,
+            verification_code=code,
+            action=action,
+            reason=reason
+        ))
+
+    # -------------------------
+    # REFRESH
+    # -------------------------
+    def _horizon(self):
+        """Events created after this may still be committing behind a higher id"""
+        return datetime.utcnow() - timedelta(seconds=self.overlap_seconds)
+
+    def _rebuild_filters(self):
+        """Both filters from the current tables, so reinstated codes drop out"""
+        revoked = db.session.scalars(
+            select(Certificate.verification_code).where(Certificate.revoked_at.isnot(None))
+        ).all()
+        bloom = BloomFilter(max(self.capacity, len(revoked) * 2), self.error_rate)
+        bloom.update(revoked)
+
+        # Tokens need a check while revoked, and forever once their
+        # certificate was deleted or edited (the old token no longer matches)
+        replaced = db.session.scalars(
+            select(RevocationEvent.verification_code.distinct())
+            .where(RevocationEvent.action.in_(("delete", "reissue")))
+        ).all()
+        certificate_tokens.replace_revocations([*revoked, *replaced])
+
+        self.filter = bloom
+        self.stale = 0
+        self.rebuilds += 1
+        self._next_rebuild = time.monotonic() + self.rebuild_seconds
+
+    def _load(self):
+        # Read the cursor first: anything committed after it is applied by the next refresh
+        cursor = db.session.scalar(select(func.max(RevocationEvent.id))) or 0
+        self._seen = dict(db.session.execute(
+            select(RevocationEvent.id, RevocationEvent.created_at)
+            .where(RevocationEvent.id <= cursor, RevocationEvent.created_at >= self._horizon())
+        ).all())
+        self._rebuild_filters()
+        self.cursor = cursor
+
+    def _apply_new_events(self):
+        horizon = self._horizon()
+        events = db.session.execute(
+            select(RevocationEvent.id, RevocationEvent.verification_code, RevocationEvent.action, RevocationEvent.created_at)
+            .where(or_(RevocationEvent.id > self.cursor, RevocationEvent.created_at >= horizon))
+            .order_by(RevocationEvent.id)
+        ).all()
+
+        applied = 0
+        for event_id, code, action, created_at in events:
+            if event_id in self._seen:
+                continue
+            if event_id <= self.cursor:
+                # Committed after a higher id had already been read
+                self.late_events += 1
+            self._seen[event_id] = created_at
+
+            if action == "revoke":
+                self.filter.add(code)
+            elif action == "reinstate":
+                self.stale += 1
+            if action != "reinstate":
+                certificate_tokens.revoke(code)
+            self.cursor = max(self.cursor, event_id)
+            applied += 1
+        self.events_applied += applied
+
+        self._seen = {
+            event_id: created_at for event_id, created_at in self._seen.items()
+            if created_at is not None and created_at >= horizon
+        }
+
+    def refresh(self, force=False):
+        """Apply new events; a no-op until `refresh_seconds` have passed unless forced"""
+        if not force and time.monotonic() < self._next_refresh:
+            return
+        # Only one thread per worker refreshes; the others keep using the current filter
+        if not self._lock.acquire(blocking=force):
+            return
+        try:
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+            if self.cursor is None:
+                self._load()
+            else:
+                self._apply_new_events()
+                if time.monotonic() >= self._next_rebuild or self.stale > max(100, len(self.filter) // 4):
+                    self._rebuild_filters()
+            self.refreshes += 1
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Revocation list refresh failed: {str(e)}")
+        finally:
+            self._lock.release()
+
+    # -------------------------
+    # READ SIDE
+    # -------------------------
+    def might_be_revoked(self, code):
+        """False if `code` has certainly never been revoked"""
+        self.refresh()
+        hit = code in self.filter
+        if hit:
+            self.filter_hits += 1
+        return hit
+
+    def check(self, code):
+        """{"revoked_at", "reason"} if the certificate is revoked now, else None"""
+        return self.check_many([code]).get(code)
+
+    def check_many(self, codes):
+        """code -> {"revoked_at", "reason"} for the revoked ones among `codes`"""
+        if not codes:
+            return {}
+        rows = db.session.execute(
+            select(Certificate.verification_code, Certificate.revoked_at, Certificate.revocation_reason)
+            .where(Certificate.verification_code.in_(codes), Certificate.revoked_at.isnot(None))
+        ).all()
+        self.confirmed += len(rows)
+        return {
+            code: {"revoked_at": revoked_at.isoformat(), "reason": reason}
+            for code, revoked_at, reason in rows
+        }
+
+    # -------------------------
+    # PUBLISHED LIST
+    # -------------------------
+    def published(self, since=0, encoding="plain"):
+        """
+        Revocation list for partners. With `since=0` the full list of codes
+        that no longer verify; otherwise only what changed after that
+        cursor (newly revoked or deleted codes, and reinstated ones). Pass
+        the returned `cursor` as `since` next time.
+
+        The returned cursor stops at the newest event older than
+        `overlap_seconds`, so an event still committing behind a higher id
+        is included by a later call instead of being skipped for good; the
+        most recent events are therefore sent again next time, which
+        changes nothing for the partner.
+        """
+        settled = db.session.scalar(
+            select(func.max(RevocationEvent.id)).where(RevocationEvent.created_at < self._horizon())
+        ) or 0
+        events = db.session.execute(
+            select(RevocationEvent.verification_code, RevocationEvent.action)
+            .where(RevocationEvent.id > since, RevocationEvent.action != "reissue")
+            .order_by(RevocationEvent.id)
+        ).all()
+
+        # Latest action per code wins
+        latest = {}
+        for code, action in events:
+            latest[code] = action
+        revoked = sorted(code for code, action in latest.items() if action in REVOKING_ACTIONS)
+        reinstated = sorted(code for code, action in latest.items() if action not in REVOKING_ACTIONS) if since else []
+
+        if encoding == "front":
+            revoked, reinstated = front_code(revoked), front_code(reinstated)
+
+        return {
+            "since": since,
+            "cursor": max(since, settled),
+            "full": not since,
+            "encoding": encoding,
+            "revoked": revoked,
+            "reinstated": reinstated
+        }
+
+    def stats(self):
+        return {
+            "cursor": self.cursor,
+            "refresh_seconds": self.refresh_seconds,
+            "refreshes": self.refreshes,
+            "rebuilds": self.rebuilds,
+            "events_applied": self.events_applied,
+            "late_events": self.late_events,
+            "stale": self.stale,
+            "filter_hits": self.filter_hits,
+            "confirmed": self.confirmed,
+            "filter": self.filter.stats(),
+            "last_error": self.last_error
+        }
+
+
+# Global instance
+revocation_list = RevocationList()
@@ -0,0 +1,70 @@
+# utils/student_import.py
+from itertools import islice
+from flask import current_app
+from ..extensions import db
+from ..models.student import Student
+from .dashboard_metrics import dashboard_metrics
+from .tabular_reader import iter_csv_rows, chunked, estimate_row_count
+
+
+def read_student_rows(file):
+    """Lazily yield the rows of a student CSV (binary file-like object) as dicts"""
+    return iter_csv_rows(file)
+
+
+def import_student_rows(rows, chunk_size=500, on_progress=None, resume=None):
+    """
+    Create a Student per row, committing every `chunk_size` rows and calling
+    `on_progress(processed, failed, imported)` after each commit. `resume`
+    ({"processed", "imported"} of an interrupted run) skips the rows
+    already committed and continues its totals.
+    """
+    resume = resume or {}
+    created_count = resume.get("imported", 0)
+    total_rows = resume.get("processed", 0)
+
+    for chunk in chunked(islice(rows, total_rows, None), chunk_size):
+        total_rows += len(chunk)
+        for row in chunk:
+            student = Student(
+                first_name=row.get("first_name"),
+                last_name=row.get("last_name"),
+                email=row.get("email"),
+                phone_number=row.get("phone_number"),
+                course_name=row.get("course_name"),
+                year_of_study=row.get("year_of_study"),
+                program_start_date=row.get("program_start_date"),
+                program_end_date=row.get("program_end_date"),
+                photo_url=row.get("photo_url")
+            )
+            db.session.add(student)
+            created_count += 1
+        dashboard_metrics.bump(students=len(chunk))
+        db.session.commit()
+
+        if on_progress:
+            on_progress(total_rows, 0, created_count)
+
+    return {
+        "message": f"{created_count} students imported successfully",
+        "imported": created_count,
+        "total_rows": total_rows
+    }
+
+
+def run_student_import_job(file_path, filename, progress, resume):
+    """JobQueue handler for background student imports"""
+    progress(total=estimate_row_count(file_path, filename))
+
+    with open(file_path, 'rb') as f:
+        result = import_student_rows(
+            read_student_rows(f),
+            chunk_size=current_app.config.get("IMPORT_CHUNK_SIZE", 500),
+            resume=resume,
+            on_progress=lambda processed, failed, imported: progress(
+                processed=processed, failed=failed, imported=imported
+            )
+        )
+
+    progress(total=result["total_rows"])
+    return result
@@ -0,0 +1,170 @@
+# utils/tabular_reader.py
+import codecs
+import csv
+import io
+from itertools import islice
+from openpyxl import load_workbook
+import pandas as pd
+
+
+SAMPLE_BYTES = 64 * 1024
+DECODE_BLOCK_BYTES = 1024 * 1024
+ENCODINGS = ['utf-8-sig', 'cp1252', 'latin-1']
+DELIMITERS = ',\t;|'
+
+
+class ImportFileError(ValueError):
+    """The uploaded file cannot be read (shown to the user as a 400)"""
+
+
+# ===================================
+# SNIFFING
+# ===================================
+def _decodes(file, encoding):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        for block in iter(lambda: file.read(DECODE_BLOCK_BYTES), b''):
+            decoder.decode(block)
+        decoder.decode(b'', final=True)
+        return True
+    except UnicodeDecodeError:
+        return False
+    finally:
+        file.seek(0)
+
+
+def detect_encoding(file):
+    """
+    First encoding in ENCODINGS that decodes the whole file (latin-1 always
+    does). Checked block by block before any row is imported, so a stray
+    cp1252 byte deep in a mostly-ASCII file cannot fail the import halfway,
+    after earlier chunks were committed. A UTF-8 file takes one pass.
+    """
+    for encoding in ENCODINGS[:-1]:
+        if _decodes(file, encoding):
+            return encoding
+    return ENCODINGS[-1]
+
+
+def detect_delimiter(sample_text):
+    # Sniff on whole lines only; the last one may be cut off
+    lines = sample_text.splitlines()
+    sample_text = "\n".join(lines[:-1] if len(lines) > 1 else lines)
+    try:
+        return csv.Sniffer().sniff(sample_text, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        return ','
+
+
+# ===================================
+# ROW ITERATORS
+# ===================================
+def iter_csv_rows(file):
+    """
+    Yield CSV rows as dicts without loading the file.
+    The encoding is checked against the whole file, the delimiter is
+    sniffed from the first SAMPLE_BYTES.
+    """
+    # Werkzeug's FileStorage wraps the real (possibly disk-spooled) stream
+    file = getattr(file, 'stream', file)
+
+    sample = file.read(SAMPLE_BYTES)
+    if isinstance(sample, str):
+        raise ImportFileError("CSV upload must be opened in binary mode")
+    file.seek(0)
+
+    encoding = detect_encoding(file)
+    delimiter = detect_delimiter(sample.decode(encoding, errors='ignore'))
+
+    stream = io.TextIOWrapper(file, encoding=encoding, newline='')
+    try:
+        reader = csv.DictReader(stream, delimiter=delimiter)
+        try:
+            yield from reader
+        except UnicodeDecodeError:
+            raise ImportFileError(
+                f"Unable to decode CSV file as {encoding} near line {reader.line_num}. Try saving as UTF-8."
+            )
+    finally:
+        # Leave the underlying upload open for its owner (it may already
+        # have closed it when the import stopped early)
+        if not file.closed:
+            stream.detach()
+
+
+def iter_xlsx_rows(file):
+    """Yield worksheet rows as dicts using openpyxl's read-only (streaming) mode"""
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+
+        columns = [str(col).strip() if col is not None else f"column_{i + 1}" for i, col in enumerate(header)]
+        for values in rows:
+            if values is None or all(value is None for value in values):
+                continue
+            yield dict(zip(columns, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(file, filename):
+    """Yield the rows of a CSV or Excel upload (binary file-like object) as dicts"""
+    filename = (filename or '').lower()
+
+    if filename.endswith('.csv'):
+        return iter_csv_rows(file)
+
+    if filename.endswith('.xlsx'):
+        return iter_xlsx_rows(file)
+
+    # Legacy .xls has no streaming reader, fall back to pandas
+    if filename.endswith('.xls'):
+        df = pd.read_excel(file)
+        return iter(df.replace({pd.NA: None, float('nan'): None}).to_dict('records'))
+
+    raise ImportFileError("Unsupported file format.")
+
+
+def chunked(rows, size):
+    """Group an iterable of rows into lists of at most `size`"""
+    rows = iter(rows)
+    size = max(1, size)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def estimate_row_count(file_path, filename):
+    """
+    Cheap data-row count for progress reporting, without parsing the file:
+    newlines for CSV (quoted multi-line cells overcount), the sheet dimension for XLSX.
+    Returns None when it cannot be estimated.
+    """
+    filename = (filename or '').lower()
+    try:
+        if filename.endswith('.csv'):
+            lines = 0
+            last = b''
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    lines += block.count(b'\n')
+                    last = block
+            if last and not last.endswith(b'\n'):
+                lines += 1
+            return max(lines - 1, 0)
+
+        if filename.endswith('.xlsx'):
+            workbook = load_workbook(file_path, read_only=True)
+            try:
+                max_row = workbook.active.max_row
+            finally:
+                workbook.close()
+            return max(max_row - 1, 0) if max_row else None
+    except Exception as e:
+        print(f"Could not estimate row count for {filename}: {str(e)}")
+    return None
@@ -0,0 +1,147 @@
+# utils/verification_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+# Returned by VerificationCache.get() when nothing usable is cached
+CACHE_MISS = object()
+
+
+def normalize_code(code):
+    """Normalize a verification code before lookup and caching"""
+    if code is None:
+        return ""
+    return str(code).strip()
+
+
+class VerificationCache:
+    """
+    Bounded LRU + TTL cache of serialized verification payloads.
+
+    Valid certificates are stored as the dict returned to the client, INVALID
+    codes are stored as None with a shorter TTL (negative cache). The cache
+    lives in the worker process, so invalidation only reaches the worker that
+    handled the write; other workers catch up when their entries expire.
+    """
+
+    def __init__(self, max_size=10000, ttl=300, negative_ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a lookup that raced with a write
+        # does not put the old row back into the cache
+        self._generation = 0
+        self._invalidated_at = None
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        self.max_size = app.config.get("VERIFICATION_CACHE_SIZE", self.max_size)
+        self.ttl = app.config.get("VERIFICATION_CACHE_TTL", self.ttl)
+        self.negative_ttl = app.config.get("VERIFICATION_CACHE_NEGATIVE_TTL", self.negative_ttl)
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def invalidated_within(self, seconds):
+        """True if invalidate() ran in the last `seconds` seconds"""
+        invalidated_at = self._invalidated_at
+        return invalidated_at is not None and time.monotonic() - invalidated_at < seconds
+
+    def get(self, code):
+        """Return the cached payload (None for a cached INVALID) or CACHE_MISS"""
+        if not self.enabled:
+            return CACHE_MISS
+
+        key = normalize_code(code)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return CACHE_MISS
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return CACHE_MISS
+
+            self._entries.move_to_end(key)
+            if value is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, code, value, generation=None):
+        """Cache a payload (or None for INVALID) unless an invalidation ran since `generation`"""
+        if not self.enabled:
+            return
+
+        key = normalize_code(code)
+        ttl = self.ttl if value is not None else self.negative_ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *codes):
+        """Drop cached entries for the given codes (both positive and negative)"""
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at = time.monotonic()
+            for code in codes:
+                if code is None:
+                    continue
+                if self._entries.pop(normalize_code(code), None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "negative_ttl_seconds": self.negative_ttl,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+            }
+
+
+# Global instance
+verification_cache = VerificationCache()
@@ -0,0 +1,448 @@
+# utils/verification_log_writer.py
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import bindparam, insert, or_, select, update
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from ..extensions import db
+from ..models.certificate import Certificate
+from ..models.verification_log import VerificationLog
+from .dashboard_metrics import dashboard_metrics
+from .db_replicas import use_primary
+
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "spill")
+
+
+def _database_unavailable(error):
+    """True when `error` means the database could not be reached, not that the rows were bad"""
+    if isinstance(error, (OperationalError, InterfaceError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+def _mark_certificates_verified(rows):
+    """
+    Set certificates.last_verified_at / last_verification_status from the
+    newest row per certificate. Returns the ids of certificates verified
+    VALID for the first time.
+    """
+    latest = {}
+    for row in rows:
+        certificate_id = row["certificate_id"]
+        if certificate_id and (certificate_id not in latest or row["verified_at"] >= latest[certificate_id][0]):
+            latest[certificate_id] = (row["verified_at"], row["status"])
+    if not latest:
+        return set()
+
+    table = Certificate.__table__
+    valid_ids = {row["certificate_id"] for row in rows if row["certificate_id"] and row["status"] == "VALID"}
+    first_verified = set()
+    if valid_ids:
+        first_verified = set(db.session.scalars(
+            select(table.c.id).where(table.c.id.in_(valid_ids), table.c.last_verified_at.is_(None))
+        ))
+
+    # Sorted by id so concurrent batches lock certificate rows in the same order
+    db.session.execute(
+        update(table)
+        .where(
+            table.c.id == bindparam("certificate_id_"),
+            or_(table.c.last_verified_at.is_(None), table.c.last_verified_at <= bindparam("verified_at_"))
+        )
+        .values(
+            last_verified_at=bindparam("verified_at_"),
+            last_verification_status=bindparam("status_"),
+            updated_at=table.c.updated_at  # a verification is not an edit of the certificate
+        ),
+        [
+            {"certificate_id_": certificate_id, "verified_at_": verified_at, "status_": status}
+            for certificate_id, (verified_at, status) in sorted(latest.items())
+        ]
+    )
+    return first_verified
+
+
+class VerificationLogWriter:
+    """
+    Background sink for VerificationLog rows.
+
+    Requests put rows on a bounded in-memory queue and return straight away;
+    a worker thread drains the queue and bulk-inserts the rows in batches
+    (when `batch_size` rows are waiting or every `flush_interval_ms`).
+    When the queue is full the overflow policy decides what happens:
+
+    - block:        wait for the worker to make room
+    - drop_oldest:  discard the oldest queued row
+    - spill:        append the row to a local JSON-lines file
+
+    Batches that fail because the database is unreachable are spilled as
+    well. A batch rejected for its contents is retried row by row, and rows
+    that still fail go to a quarantine file (<spill path>.rejected) instead
+    of being retried forever. The spill file is replayed when a worker
+    starts, and the queue is flushed on shutdown.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.queue_size = 10000
+        self.batch_size = 500
+        self.flush_interval_ms = 200
+        self.overflow = "spill"
+        self.spill_path = "/tmp/verification_logs.spill.jsonl"
+        self.shutdown_timeout = 10
+
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.quarantined = 0
+        self.failed_batches = 0
+        self.last_error = None
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("VERIFICATION_LOG_ASYNC", False)
+        self.queue_size = app.config.get("VERIFICATION_LOG_QUEUE_SIZE", self.queue_size)
+        self.batch_size = app.config.get("VERIFICATION_LOG_BATCH_SIZE", self.batch_size)
+        self.flush_interval_ms = app.config.get("VERIFICATION_LOG_FLUSH_MS", self.flush_interval_ms)
+        self.overflow = app.config.get("VERIFICATION_LOG_OVERFLOW", self.overflow)
+        self.spill_path = app.config.get("VERIFICATION_LOG_SPILL_PATH", self.spill_path)
+
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"VERIFICATION_LOG_OVERFLOW must be one of {', '.join(OVERFLOW_POLICIES)}, got '{self.overflow}'"
+            )
+
+        atexit.register(self.shutdown)
+
+    # -------------------------
+    # PRODUCER SIDE
+    # -------------------------
+    def record(self, certificate_id, ip_address, status, verified_at=None):
+        """Queue one verification attempt (or write it inline when async logging is off)"""
+        row = {
+            "certificate_id": certificate_id,
+            "verified_at": verified_at or datetime.utcnow(),
+            "ip_address": ip_address,
+            "status": status
+        }
+
+        if not self.enabled:
+            self._insert([row])
+            db.session.commit()
+            return
+
+        self._ensure_worker()
+        self._enqueue(row)
+
+    def record_many(self, attempts, ip_address, verified_at=None):
+        """
+        Log several attempts from one request.
+        `attempts` is a list of (certificate_id, status) tuples; in inline mode
+        they are written with a single multi-row insert.
+        """
+        verified_at = verified_at or datetime.utcnow()
+        rows = [
+            {
+                "certificate_id": certificate_id,
+                "verified_at": verified_at,
+                "ip_address": ip_address,
+                "status": status
+            }
+            for certificate_id, status in attempts
+        ]
+        if not rows:
+            return
+
+        if not self.enabled:
+            self._insert(rows)
+            db.session.commit()
+            return
+
+        self._ensure_worker()
+        for row in rows:
+            self._enqueue(row)
+
+    def _enqueue(self, row):
+        self.enqueued += 1
+
+        if self.overflow == "block":
+            self._queue.put(row)
+            return
+
+        try:
+            self._queue.put_nowait(row)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == "spill":
+            self._spill([row])
+            return
+
+        # drop_oldest
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.dropped += 1
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    # -------------------------
+    # WORKER SIDE
+    # -------------------------
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so a pre-forked worker starts its own
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._stopping = threading.Event()
+
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="verification-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        self.replay_spill()
+
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write_batch(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval_ms / 1000.0
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or self._stopping.is_set():
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, rows):
+        unwritten = self._write_rows(rows)
+        if unwritten:
+            self._spill(unwritten)
+
+    def _write_rows(self, rows):
+        """
+        Insert `rows` in one transaction. If that fails for anything but a
+        lost database, retry them one by one and quarantine the rows that
+        still fail (e.g. a certificate deleted meanwhile), so one bad row
+        cannot hold back the rest. Returns the rows left unwritten because
+        the database is unreachable.
+        """
+        with self.app.app_context():
+            try:
+                self._insert(rows)
+                db.session.commit()
+                self.written += len(rows)
+                self.batches += 1
+                return []
+            except Exception as e:
+                db.session.rollback()
+                self.failed_batches += 1
+                self.last_error = str(e)
+                if _database_unavailable(e):
+                    print(f"Verification log batch failed ({len(rows)} rows), spilling: {str(e)}")
+                    return rows
+                print(f"Verification log batch failed ({len(rows)} rows), retrying row by row: {str(e)}")
+
+            for index, row in enumerate(rows):
+                try:
+                    self._insert([row])
+                    db.session.commit()
+                    self.written += 1
+                except Exception as e:
+                    db.session.rollback()
+                    self.last_error = str(e)
+                    if _database_unavailable(e):
+                        return rows[index:]
+                    self._quarantine([row], str(e))
+            return []
+
+    @staticmethod
+    def _insert(rows):
+        """
+        Multi-row insert in the current transaction. Also moves each
+        certificate's last_verified_at forward and counts the rows for the dashboard.
+        """
+        # Inline writes run inside @read_replica controllers; the first-verification check must see the primary
+        with use_primary():
+            first_verified = _mark_certificates_verified(rows)
+            dashboard_metrics.record_verifications(rows, first_verified=len(first_verified))
+            db.session.execute(insert(VerificationLog), rows)
+
+    # -------------------------
+    # SPILL FILE
+    # -------------------------
+    @staticmethod
+    def _serialize(row):
+        if isinstance(row.get("verified_at"), datetime):
+            row = {**row, "verified_at": row["verified_at"].isoformat()}
+        return json.dumps(row)
+
+    def _spill(self, rows):
+        try:
+            with self._spill_lock:
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    for row in rows:
+                        f.write(self._serialize(row) + "\n")
+            self.spilled += len(rows)
+        except Exception as e:
+            self.dropped += len(rows)
+            self.last_error = str(e)
+            print(f"Failed to spill verification logs: {str(e)}")
+
+    def _quarantine(self, rows, error):
+        """Set aside rows the database rejects (or spill lines that cannot be parsed) for inspection"""
+        self.quarantined += len(rows)
+        print(f"Quarantined {len(rows)} verification log row(s): {error}")
+        try:
+            with self._spill_lock:
+                with open(f"{self.spill_path}.rejected", "a", encoding="utf-8") as f:
+                    for row in rows:
+                        line = row if isinstance(row, str) else self._serialize(row)
+                        f.write(json.dumps({"row": line, "error": error}) + "\n")
+        except Exception as e:
+            self.dropped += len(rows)
+            self.last_error = str(e)
+            print(f"Failed to quarantine verification logs: {str(e)}")
+
+    def replay_spill(self):
+        """Insert rows left in the spill file by an earlier overflow or DB outage"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return 0
+
+        replay_path = f"{self.spill_path}.{os.getpid()}.replay"
+        with self._spill_lock:
+            try:
+                os.replace(self.spill_path, replay_path)
+            except FileNotFoundError:
+                return 0
+
+        rows = []
+        with open(replay_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                # A line cut short by a crash mid-write must not stop the replay
+                try:
+                    row = json.loads(line)
+                    row["verified_at"] = datetime.fromisoformat(row["verified_at"])
+                except (ValueError, TypeError, KeyError) as e:
+                    self._quarantine([line], f"Unreadable spill line: {str(e)}")
+                    continue
+                rows.append(row)
+
+        written_before = self.written
+        for start in range(0, len(rows), self.batch_size):
+            unwritten = self._write_rows(rows[start:start + self.batch_size])
+            if unwritten:
+                # Database gone again: keep the rest for the next worker start
+                self._spill(unwritten + rows[start + self.batch_size:])
+                break
+
+        os.remove(replay_path)
+        replayed = self.written - written_before
+        self.replayed += replayed
+        print(f"Replayed {replayed} spilled verification logs")
+        return replayed
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+    def flush(self, timeout=None):
+        """Wait until everything queued so far has been written (or spilled)"""
+        if self._queue is None or self._pid != os.getpid():
+            return True
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self):
+        """Stop the worker after it has drained the queue"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+
+        self._stopping.set()
+        self._thread.join(timeout=self.shutdown_timeout)
+
+        # Whatever the worker could not write in time goes to the spill file
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+                self._queue.task_done()
+            except queue.Empty:
+                break
+        if leftover:
+            self._spill(leftover)
+
+        self._thread = None
+
+    def stats(self):
+        return {
+            "async": self.enabled,
+            "overflow_policy": self.overflow,
+            "queued": self._queue.qsize() if self._queue is not None and self._pid == os.getpid() else 0,
+            "queue_size": self.queue_size,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": self.flush_interval_ms,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "quarantined": self.quarantined,
+            "failed_batches": self.failed_batches,
+            "last_error": self.last_error
+        }
+
+
+# Global instance
+verification_log_writer = VerificationLogWriter()
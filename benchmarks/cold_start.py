@@ -0,0 +1,100 @@
+"""
+Cold start of the app: how long a fresh worker process takes to import the
+app, run create_app() and answer its first verification request, and what
+Google Drive initialization costs on top when it is forced up front (which
+is what importing the app used to do).
+
+    python -m benchmarks.cold_start              # 5 fresh processes per mode
+    python -m benchmarks.cold_start --runs 10
+
+Each run is a new interpreter, so imports are really cold (apart from the
+OS file cache). DATABASE_URL and the GOOGLE_* variables are taken from the
+environment; with real Google credentials the eager mode includes loading
+(and possibly refreshing) them.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+
+drive = None
+if sys.argv[1] == "eager":
+    from app.utils.google_drive import drive_service
+    from app.utils.google_drive_simple import drive_service as shared_drive_service
+    for service in (drive_service, shared_drive_service):
+        try:
+            service.get()
+        except Exception:
+            pass
+    drive = time.perf_counter() - created
+ready = time.perf_counter()
+
+response = application.test_client().get("/certificate/COLDSTART/0")
+answered = time.perf_counter()
+
+print(json.dumps({
+    "import_s": imported - started,
+    "create_app_s": created - imported,
+    "drive_init_s": drive,
+    "first_request_s": answered - ready,
+    "total_s": answered - started,
+    "status": response.status_code,
+    "google_imported": "googleapiclient" in sys.modules
+}))
+"""
+
+
+def run_once(mode):
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, mode],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ)
+    )
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if result.returncode != 0 or not lines:
+        return {"error": (result.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(lines[-1])
+
+
+def summarize(runs, key):
+    values = [run[key] for run in runs if run.get(key) is not None]
+    if not values:
+        return "-"
+    return f"{statistics.median(values) * 1000:.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per mode")
+    args = parser.parse_args()
+
+    columns = ["import_s", "create_app_s", "drive_init_s", "first_request_s", "total_s"]
+    print(f"Median milliseconds over {args.runs} fresh processes\n")
+    print(f"{'mode':<8}" + "".join(f"{column[:-2]:>15}" for column in columns) + f"{'google libs':>13}")
+
+    for mode in ("lazy", "eager"):
+        runs = [run_once(mode) for _ in range(args.runs)]
+        errors = [run["error"] for run in runs if "error" in run]
+        runs = [run for run in runs if "error" not in run]
+        if not runs:
+            print(f"{mode:<8}failed: {errors[0]}")
+            continue
+        google = "loaded" if any(run["google_imported"] for run in runs) else "not loaded"
+        print(f"{mode:<8}" + "".join(f"{summarize(runs, column):>15}" for column in columns) + f"{google:>13}")
+        if errors:
+            print(f"         {len(errors)} run(s) failed: {errors[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Google Drive upload throughput against a local fake Drive server.
+
+    python -m benchmarks.drive_upload                          # 300 files, 8 threads
+    python -m benchmarks.drive_upload --files 1000 --latency 40 --handshake 60
+    python -m benchmarks.drive_upload --error-rate 0.05        # inject 429/503 responses
+
+Files are uploaded in `--rounds` rounds with a new thread pool each, the
+way a bulk import runs one QR pipeline per chunk.
+
+Modes:
+  per-file       what uploads used to do: a resumable upload (two requests)
+                 plus a permissions call per file, one file per thread task,
+                 a transport per thread
+  batched        GoogleDriveService.upload_many: one multipart upload per
+                 file on pooled keep-alive transports, then the permissions
+                 granted through batch requests
+  shared-folder  upload_many into a folder that is already public: uploads
+                 only
+
+The fake server answers the Drive v3 endpoints these paths use after
+`--latency` ms per request, and charges `--handshake` ms once per new
+connection (standing in for TCP + TLS setup to googleapis.com).
+"""
+import argparse
+import email.parser
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# ===================================
+# FAKE DRIVE SERVER
+# ===================================
+class FakeDrive(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, handshake, error_rate):
+        super().__init__(("127.0.0.1", 0), FakeDriveHandler)
+        self.latency = latency
+        self.handshake = handshake
+        self.error_rate = error_rate
+        self.ids = itertools.count(1)
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def reset(self):
+        with self.lock:
+            self.counts = {}
+
+    def fail(self):
+        """An injected 429 or 503, or None"""
+        if self.error_rate and random.random() < self.error_rate:
+            self.count("injected_errors")
+            return random.choice((429, 503))
+        return None
+
+    def new_id(self):
+        return f"file{next(self.ids)}"
+
+
+class FakeDriveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+        time.sleep(self.server.handshake)
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _reply(self, status, payload=None, content_type="application/json; charset=UTF-8", headers=None):
+        time.sleep(self.server.latency)
+        if isinstance(payload, (dict, list)):
+            payload = json.dumps(payload).encode()
+        payload = payload or b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status):
+        self._reply(status, {"error": {"code": status, "message": "injected"}})
+
+    def do_GET(self):
+        self.server.count("requests")
+        if self.path.split("?")[0].endswith("/permissions"):
+            self.server.count("permission_lists")
+            return self._reply(200, {"permissions": []})
+        self._error(404)
+
+    def do_PUT(self):
+        # Second half of a resumable upload (errors are injected when the session starts,
+        # so the fake does not have to implement resumable status queries)
+        self._body()
+        self.server.count("requests")
+        self.server.count("resumable_uploads")
+        self._reply(200, {"id": self.server.new_id()})
+
+    def do_POST(self):
+        body = self._body()
+        self.server.count("requests")
+        parts = urlsplit(self.path)
+        path = parts.path
+
+        if path.startswith("/upload/drive/v3/files"):
+            if parse_qs(parts.query).get("uploadType") == ["resumable"]:
+                self.server.count("resumable_starts")
+                status = self.server.fail()
+                if status:
+                    return self._error(status)
+                location = f"{self.server.url}upload/drive/v3/files?uploadType=resumable&upload_id={self.server.new_id()}"
+                return self._reply(200, b"", headers={"Location": location})
+            self.server.count("multipart_uploads")
+            status = self.server.fail()
+            if status:
+                return self._error(status)
+            return self._reply(200, {"id": self.server.new_id()})
+
+        if path.startswith("/batch/"):
+            return self._batch(body)
+
+        if path.endswith("/permissions"):
+            self.server.count("permissions")
+            status = self.server.fail()
+            if status:
+                return self._error(status)
+            return self._reply(200, {"id": "anyoneWithLink"})
+
+        self._error(404)
+
+    def _batch(self, body):
+        self.server.count("batches")
+        message = email.parser.BytesParser().parsebytes(
+            b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+        )
+        boundary = "fake_batch_boundary"
+        out = []
+        for part in message.get_payload():
+            self.server.count("batched_permissions")
+            status = self.server.fail() or 200
+            reason = {200: "OK", 429: "Too Many Requests", 503: "Service Unavailable"}[status]
+            payload = json.dumps({"id": "anyoneWithLink"} if status == 200 else {"error": {"code": status}})
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n{payload}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        self._reply(200, "".join(out).encode(), content_type=f"multipart/mixed; boundary={boundary}")
+
+
+# ===================================
+# UPLOAD MODES
+# ===================================
+def make_service():
+    from google.oauth2.credentials import Credentials
+    from app.utils.google_drive import GoogleDriveService
+
+    return GoogleDriveService(credentials=Credentials(token="fake-token"))
+
+
+def run_per_file(service, files, workers):
+    """The previous upload path, kept here as the baseline"""
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.http import MediaIoBaseUpload
+    import io
+
+    local = threading.local()
+
+    def upload(item):
+        data, filename, mime_type = item
+        http = getattr(local, "http", None)
+        if http is None:
+            http = local.http = AuthorizedHttp(service.creds, http=httplib2.Http())
+        try:
+            file = service.service.files().create(
+                body={"name": filename, "parents": [service.folder_id]},
+                media_body=MediaIoBaseUpload(io.BytesIO(data), mimetype=mime_type, resumable=True),
+                fields="id, name"
+            ).execute(http=http, num_retries=service.max_retries)
+            service.service.permissions().create(
+                fileId=file["id"],
+                body={"type": "anyone", "role": "reader", "allowFileDiscovery": False}
+            ).execute(http=http, num_retries=service.max_retries)
+            return service.file_url(file["id"])
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(upload, files))
+
+
+def run_batched(service, files, workers, batch_size, make_public):
+    size = max(1, min(batch_size, -(-len(files) // workers)))
+    batches = [files[i:i + size] for i in range(0, len(files), size)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda batch: service.upload_many(batch, make_public=make_public), batches)
+        return [url for batch in results for url in batch]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--size", type=int, default=1500, help="bytes per file (a QR PNG is ~1.5 KB)")
+    parser.add_argument("--workers", type=int, default=8, help="upload threads (QR_UPLOAD_CONCURRENCY)")
+    parser.add_argument("--batch-size", type=int, default=50, help="files per upload_many call (QR_UPLOAD_BATCH_SIZE)")
+    parser.add_argument("--rounds", type=int, default=4, help="import chunks, each with a new thread pool")
+    parser.add_argument("--latency", type=float, default=20, help="server ms per request")
+    parser.add_argument("--handshake", type=float, default=30, help="server ms per new connection")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered 429/503")
+    args = parser.parse_args()
+
+    server = FakeDrive(args.latency / 1000, args.handshake / 1000, args.error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["GOOGLE_DRIVE_API_URL"] = server.url
+    os.environ["GOOGLE_DRIVE_FOLDER_ID"] = "fake-folder"
+
+    payload = os.urandom(args.size)
+    files = [(payload, f"BENCH_{i:06d}.png", "image/png") for i in range(args.files)]
+
+    per_round = -(-len(files) // max(1, args.rounds))
+    rounds = [files[i:i + per_round] for i in range(0, len(files), per_round)]
+
+    modes = {
+        "per-file": lambda service, chunk: run_per_file(service, chunk, args.workers),
+        "batched": lambda service, chunk: run_batched(service, chunk, args.workers, args.batch_size, True),
+        "shared-folder": lambda service, chunk: run_batched(service, chunk, args.workers, args.batch_size, False),
+    }
+
+    print(f"{args.files} files of {args.size} B in {len(rounds)} rounds, {args.workers} threads, batch size {args.batch_size}, "
+          f"{args.latency:g} ms/request, {args.handshake:g} ms/connection, error rate {args.error_rate:g}\n")
+    columns = ["files/s", "seconds", "requests", "req/file", "connections", "failed"]
+    print(f"{'mode':<16}" + "".join(f"{column:>13}" for column in columns))
+
+    for name, run in modes.items():
+        service = make_service()
+        server.reset()
+        started = time.perf_counter()
+        results = [result for chunk in rounds for result in run(service, chunk)]
+        elapsed = time.perf_counter() - started
+        counts = dict(server.counts)
+        # A batched call counts as one HTTP request; its parts are listed separately
+        requests = counts.get("requests", 0)
+        failed = sum(1 for result in results if isinstance(result, Exception) or not result)
+        row = [
+            round((len(files) - failed) / elapsed, 1),
+            round(elapsed, 2),
+            requests,
+            round(requests / len(files), 2),
+            counts.get("connections", 0),
+            failed
+        ]
+        print(f"{name:<16}" + "".join(f"{str(value):>13}" for value in row))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
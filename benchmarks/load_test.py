@@ -0,0 +1,212 @@
+"""
+Verification throughput: Flask development server vs gunicorn.
+
+    python -m benchmarks.load_test                                # both servers, 20s each
+    python -m benchmarks.load_test --server gunicorn --concurrency 64
+    python -m benchmarks.load_test --url http://staging:5000      # an already running deployment
+
+Each server is started on a free local port with the current environment
+(DATABASE_URL, DB_POOL_SIZE, WEB_CONCURRENCY, GUNICORN_* ...), then
+`--concurrency` client threads with keep-alive connections call
+GET /certificate/<code> for `--duration` seconds after a short warm-up.
+Codes are real verification codes from the database plus an
+`--invalid-ratio` share of unknown ones. Every request writes a
+verification log, so run it against a scratch or staging database.
+Rate limiting and abuse detection are turned off in the servers it
+starts unless RATE_LIMIT_ENABLED / ABUSE_DETECTION are set.
+"""
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "dev": lambda port: [sys.executable, "-m", "flask", "--app", "wsgi:app", "run", "--port", str(port)],
+    "gunicorn": lambda port: [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+        "--bind", f"127.0.0.1:{port}", "--access-logfile", "/dev/null", "wsgi:app"
+    ],
+}
+
+
+def sample_codes(limit):
+    from app import create_app
+    from app.models.certificate import Certificate
+
+    app = create_app()
+    with app.app_context():
+        rows = Certificate.query.with_entities(Certificate.verification_code).limit(limit).all()
+    codes = [code for (code,) in rows]
+    if not codes:
+        raise SystemExit("No certificates in the database to verify")
+    return codes
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(host, port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"Server on port {port} did not come up within {timeout}s")
+
+
+# ===================================
+# LOAD
+# ===================================
+def run_load(host, port, paths, concurrency, duration, warmup):
+    start = time.monotonic()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    latencies = []
+    counts = {"ok": 0, "errors": 0, "non_200": 0, "reconnects": 0}
+    lock = threading.Lock()
+
+    def client(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        local_latencies = []
+        local = {"ok": 0, "errors": 0, "non_200": 0, "reconnects": 0}
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            path = rng.choice(paths)
+            status = None
+            # A keep-alive connection may have been closed by a recycled worker; retry once on a new one
+            for attempt in range(2):
+                try:
+                    conn.request("GET", path)
+                    response = conn.getresponse()
+                    response.read()
+                    status = response.status
+                    if response.getheader("Connection", "").lower() == "close":
+                        conn.close()
+                    break
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = http.client.HTTPConnection(host, port, timeout=30)
+                    if attempt == 0:
+                        local["reconnects"] += 1
+
+            finished = time.monotonic()
+            if now < measure_from:
+                local["reconnects"] = 0
+                continue
+            if status is None:
+                local["errors"] += 1
+            elif status == 200:
+                local["ok"] += 1
+                local_latencies.append(finished - now)
+            else:
+                local["non_200"] += 1
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for key, value in local.items():
+                counts[key] += value
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+
+    def percentile(p):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2)
+
+    return {
+        "requests": counts["ok"],
+        "rps": round(counts["ok"] / duration, 1),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "errors": counts["errors"],
+        "non_200": counts["non_200"],
+        "reconnects": counts["reconnects"]
+    }
+
+
+def benchmark_server(name, paths, args):
+    port = free_port()
+    env = dict(os.environ, FLASK_ENV="production")
+    # Every request comes from one address; measure the server, not the rate limiter
+    env.setdefault("RATE_LIMIT_ENABLED", "false")
+    env.setdefault("ABUSE_DETECTION", "false")
+    process = subprocess.Popen(
+        SERVERS[name](port), cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_up("127.0.0.1", port, process)
+        return run_load("127.0.0.1", port, paths, args.concurrency, args.duration, args.warmup)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", action="append", choices=sorted(SERVERS), help="server(s) to start (default: all)")
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per server")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before each run")
+    parser.add_argument("--codes", type=int, default=500, help="distinct valid codes to rotate through")
+    parser.add_argument("--invalid-ratio", type=float, default=0.1, help="share of requests for unknown codes")
+    args = parser.parse_args()
+
+    codes = sample_codes(args.codes)
+    invalid = max(1, int(len(codes) * args.invalid_ratio / max(1 - args.invalid_ratio, 0.01))) if args.invalid_ratio else 0
+    paths = [f"/certificate/{quote(code, safe='/')}" for code in codes]
+    paths += [f"/certificate/LOADTEST/{i:06d}" for i in range(invalid)]
+
+    results = {}
+    if args.url:
+        target = urlsplit(args.url)
+        wait_until_up(target.hostname, target.port or 80, None)
+        results[args.url] = run_load(target.hostname, target.port or 80, paths, args.concurrency, args.duration, args.warmup)
+    else:
+        for name in args.server or sorted(SERVERS):
+            print(f"Running {name} ...")
+            results[name] = benchmark_server(name, paths, args)
+
+    print(f"\nGET /certificate/<code>, {args.concurrency} clients, {args.duration:g}s, {len(codes)} valid + {invalid} unknown codes\n")
+    columns = ["requests", "rps", "p50_ms", "p95_ms", "p99_ms", "errors", "non_200", "reconnects"]
+    print(f"{'server':<24}" + "".join(f"{column:>12}" for column in columns))
+    for name, result in results.items():
+        print(f"{name:<24}" + "".join(f"{str(result[column]):>12}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+QR payload modes: the JSON document vs a compact signed verification link.
+
+    python -m benchmarks.qr_payload                  # 200 synthetic certificates
+    python -m benchmarks.qr_payload --count 1000 --base-url https://verify.example.com
+
+For each mode every certificate's QR is rendered as PNG and SVG at the
+default size; the table shows the median render time, the median image
+sizes and the QR version (modules per side = 17 + 4 x version), which is
+what makes a code slow to scan from a phone. It also times signature
+checks for valid and forged links, the work the /V/ route does before any
+database lookup.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIRST = ["Adaeze", "Babatunde", "Chiamaka", "Olumide", "Ngozi", "Emeka", "Funmilayo", "Ifeoluwa"]
+LAST = ["Okonkwo", "Adeyemi", "Nwachukwu", "Balogun", "Eze", "Ogunleye", "Chukwuemeka"]
+COURSES = ["Data Science", "Cyber Security", "Full Stack Web Development", "Cloud Computing", "UI/UX Design"]
+
+
+def synthetic_certificates(count, seed=7):
+    rng = random.Random(seed)
+    for i in range(count):
+        course = rng.choice(COURSES)
+        initials = "".join(word[0] for word in course.split()).upper()
+        yield (
+            f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+            course,
+            f"SHSL/25B/{initials}/{i + 1:04d}",
+            date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+        )
+
+
+def measure(payloads):
+    import qrcode
+    from app.utils.qr_generator import render_qr
+
+    png_ms, svg_ms, png_bytes, svg_bytes, versions = [], [], [], [], []
+    for data in payloads:
+        started = time.perf_counter()
+        png = render_qr(data)
+        png_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        svg = render_qr(data, image_format="svg")
+        svg_ms.append((time.perf_counter() - started) * 1000)
+
+        png_bytes.append(len(png))
+        svg_bytes.append(len(svg))
+        qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L)
+        qr.add_data(data)
+        qr.make(fit=True)
+        versions.append(qr.version)
+
+    return {
+        "payload_chars": round(statistics.median(len(data) for data in payloads)),
+        "version": round(statistics.median(versions)),
+        "png_ms": round(statistics.median(png_ms), 2),
+        "svg_ms": round(statistics.median(svg_ms), 2),
+        "png_bytes": round(statistics.median(png_bytes)),
+        "svg_bytes": round(statistics.median(svg_bytes)),
+    }
+
+
+def time_unsign(signer, tokens, repeat=20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for token in tokens:
+            signer.unsign(token)
+    return (time.perf_counter() - started) / (repeat * len(tokens)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200, help="certificates to render per mode")
+    parser.add_argument("--base-url", default=os.environ.get("PUBLIC_BASE_URL") or "https://api.speedlinkng.com",
+                        help="host of the signed links")
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.utils.qr_generator import qr_payload
+    from app.utils.signing import url_signer
+
+    app = create_app()
+    app.config["PUBLIC_BASE_URL"] = args.base_url
+    app.config["QR_VERIFY_BASE_URL"] = None
+    certificates = list(synthetic_certificates(args.count))
+
+    results = {}
+    with app.app_context():
+        for mode in ("json", "signed_url"):
+            app.config["QR_PAYLOAD"] = mode
+            payloads = [qr_payload(*certificate) for certificate in certificates]
+            results[mode] = measure(payloads)
+            if mode == "signed_url":
+                example = payloads[0]
+
+    print(f"{args.count} certificates, median per QR (error correction L, box size 10, border 4)\n")
+    columns = ["payload_chars", "version", "png_ms", "svg_ms", "png_bytes", "svg_bytes"]
+    print(f"{'mode':<12}" + "".join(f"{column:>15}" for column in columns))
+    for mode, result in results.items():
+        print(f"{mode:<12}" + "".join(f"{str(result[column]):>15}" for column in columns))
+    print(f"\nexample signed link: {example}")
+
+    valid = [url_signer.sign(number) for _, _, number, _ in certificates]
+    forged = [token[:-4] + "AAAA" for token in valid]
+    print(f"signature check: {time_unsign(url_signer, valid):.1f} us valid, {time_unsign(url_signer, forged):.1f} us forged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Query plans for the controller queries, with and without the secondary
+indexes added in migrations/versions/9b646e866a6e_add_query_indexes.py.
+
+    python -m benchmarks.query_plans                 # plans as the database is now
+    python -m benchmarks.query_plans --compare       # ...and with the indexes dropped
+    python -m benchmarks.query_plans --analyze       # EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL
+    python -m benchmarks.query_plans --seed 50000    # first add synthetic rows (scratch databases only)
+
+The real controller code runs inside a test request and every SELECT it
+sends is recorded and EXPLAINed. --compare drops the indexes inside a
+transaction that is rolled back afterwards; on PostgreSQL that holds
+ACCESS EXCLUSIVE locks on the tables meanwhile, so point it at a staging
+copy, not at production. Plans are only meaningful with realistic volumes.
+"""
+import argparse
+import importlib.util
+import os
+import random
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.certificate import Certificate  # noqa: E402
+from app.models.student import Student  # noqa: E402
+from app.models.verification_log import VerificationLog  # noqa: E402
+
+
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "migrations", "versions", "9b646e866a6e_add_query_indexes.py"
+)
+
+
+def migration_indexes():
+    spec = importlib.util.spec_from_file_location("query_indexes_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return [name for name, _, _, _ in module.INDEXES] + ["ix_certificates_last_verified_at"]
+
+
+# ===================================
+# STATEMENT CAPTURE
+# ===================================
+class Recorder:
+    def __init__(self):
+        self.statements = []
+        self.active = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and not executemany and statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+    @contextmanager
+    def capture(self):
+        self.statements = []
+        self.active = True
+        try:
+            yield self.statements
+        finally:
+            self.active = False
+
+
+# ===================================
+# SCENARIOS
+# ===================================
+def sample_values():
+    cert = Certificate.query.order_by(Certificate.id.desc()).first()
+    student = Student.query.order_by(Student.id.desc()).first()
+    if not cert or not student:
+        raise SystemExit("No certificates/students to plan against; use --seed on a scratch database")
+    return cert, student
+
+
+def scenarios(app):
+    """(name, callable) pairs; each callable runs one controller path"""
+    from app.controllers.verification_controller import lookup_certificate
+    from app.utils.certificate_import import _existing_codes, _existing_students, _taken_emails
+    from app.utils.certificate_number import _highest_issued_number
+    from app.utils.dashboard_metrics import dashboard_metrics
+    from app.utils.verification_cache import verification_cache
+
+    cert, student = sample_values()
+    code = cert.verification_code
+    prefix = code.rsplit("/", 1)[0]
+    name = student.first_name[:2]
+    client = app.test_client()
+
+    def lookup():
+        verification_cache.clear()
+        lookup_certificate(code)
+
+    def bulk():
+        # Same statement as verify_certificates_bulk (which would also write logs)
+        Certificate.query.filter(Certificate.verification_code.in_([code, code + "-x"])).all()
+
+    def second_page(url):
+        def run():
+            cursor = client.get(url, query_string={"limit": 50}).get_json().get("next_cursor")
+            if cursor:
+                client.get(url, query_string={"limit": 50, "cursor": cursor})
+        return run
+
+    def number_seed():
+        with db.engine.connect() as conn:
+            _highest_issued_number(conn, prefix)
+
+    return [
+        ("GET /certificate/<code>", lookup),
+        ("POST /certificate/verify/bulk", bulk),
+        ("GET /certificate/certificates (2 pages)", second_page("/certificate/certificates")),
+        ("GET /certificate/certificates?name=&course=", lambda: client.get(
+            "/certificate/certificates", query_string={"name": name, "course": cert.course_name})),
+        ("GET /dashboard/certificates (2 pages)", second_page("/dashboard/certificates")),
+        ("GET /dashboard/certificates?issued_from=", lambda: client.get(
+            "/dashboard/certificates", query_string={"issued_from": (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%d")})),
+        ("GET /students/list (2 pages)", second_page("/students/list")),
+        ("GET /students/list?name=", lambda: client.get("/students/list", query_string={"name": name})),
+        ("GET /dashboard/summary", lambda: client.get("/dashboard/summary")),
+        ("dashboard counter reconciliation", dashboard_metrics.aggregate),
+        ("import: existing codes", lambda: _existing_codes({code})),
+        ("import: existing students", lambda: _existing_students({(student.first_name, student.last_name, student.course_name)})),
+        ("import: taken emails", lambda: _taken_emails({student.email.split("@")[0]})),
+        ("certificate number seed (prefix LIKE)", number_seed),
+    ]
+
+
+# ===================================
+# EXPLAIN
+# ===================================
+def explain(conn, statement, parameters, analyze, label):
+    # The label keeps pysqlite from reusing a statement prepared against the other schema
+    statement = f"/* {label} */ {statement}"
+    if conn.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+        return [row[0] for row in conn.exec_driver_sql(prefix + statement, parameters)]
+    return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+
+
+def explain_all(conn, captured, analyze, label):
+    return [[explain(conn, s, p, analyze, label) for s, p in statements] for _, statements in captured]
+
+
+def uses_full_scan(plan):
+    """Sequential scan of a table (scans of materialized subqueries do not count)"""
+    text = "\n".join(plan)
+    return "Seq Scan" in text or any(
+        line.strip().startswith("SCAN ") and "USING" not in line and not line.strip().startswith("SCAN anon_")
+        for line in plan
+    )
+
+
+def print_plan(label, plan):
+    marker = "FULL SCAN" if uses_full_scan(plan) else "indexed"
+    print(f"    [{label}: {marker}]")
+    for line in plan:
+        print(f"      {line}")
+
+
+# ===================================
+# SEED DATA
+# ===================================
+def seed(count):
+    """Commit `count` synthetic certificates (and students / logs) for plan testing"""
+    rng = random.Random(42)
+    courses = ["Data Analysis", "Web Development", "Cyber Security", "Digital Marketing", "UI/UX Design"]
+    now = datetime.utcnow()
+    batch = 5000
+    marker = now.strftime("%H%M%S")
+
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        students = [
+            {
+                "first_name": f"First{rng.randint(0, 5000)}",
+                "last_name": f"Last{start + i}",
+                "email": f"bench{marker}.{start + i}@example.com",
+                "course_name": rng.choice(courses),
+                "year_of_study": "2025",
+                "created_at": now - timedelta(minutes=start + i)
+            }
+            for i in range(size)
+        ]
+        ids = db.session.execute(insert(Student).returning(Student.id), students).scalars().all()
+
+        certificates = [
+            {
+                "student_id": student_id,
+                "student_first_name": s["first_name"],
+                "student_last_name": s["last_name"],
+                "course_name": s["course_name"],
+                "year_of_study": "2025",
+                "verification_code": f"BENCH/{marker}/{start + i:07d}",
+                "issued_at": now - timedelta(days=rng.randint(0, 700)),
+                "created_at": s["created_at"]
+            }
+            for i, (student_id, s) in enumerate(zip(ids, students))
+        ]
+        cert_ids = db.session.execute(insert(Certificate).returning(Certificate.id), certificates).scalars().all()
+
+        logs = [
+            {
+                "certificate_id": rng.choice(cert_ids) if rng.random() < 0.8 else None,
+                "verified_at": now - timedelta(seconds=rng.randint(0, 90 * 86400)),
+                "ip_address": f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}",
+                "status": "VALID"
+            }
+            for _ in range(size * 3)
+        ]
+        for log in logs:
+            if log["certificate_id"] is None:
+                log["status"] = "INVALID"
+        db.session.execute(insert(VerificationLog), logs)
+        db.session.commit()
+        print(f"  seeded {start + size}/{count}")
+
+    if db.engine.dialect.name == "postgresql":
+        with db.engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            for table in ("students", "certificates", "verification_logs"):
+                conn.exec_driver_sql(f"ANALYZE {table}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compare", action="store_true", help="also plan every query with the migration's indexes dropped")
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (PostgreSQL only, runs the queries)")
+    parser.add_argument("--seed", type=int, default=0, help="commit this many synthetic certificates first")
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        if args.seed:
+            seed(args.seed)
+
+        recorder = Recorder()
+        event.listen(db.engine, "before_cursor_execute", recorder)
+
+        captured = []
+        for name, run in scenarios(app):
+            with recorder.capture() as statements:
+                run()
+            captured.append((name, list(statements)))
+            db.session.rollback()
+
+        event.remove(db.engine, "before_cursor_execute", recorder)
+
+        indexes = migration_indexes()
+        full_scans = {"with": 0, "without": 0}
+
+        with db.engine.connect() as conn:
+            print(f"Database: {conn.dialect.name}\n")
+            with_plans = explain_all(conn, captured, args.analyze, "with indexes")
+
+            without_plans = None
+            if args.compare:
+                # A savepoint rather than BEGIN: pysqlite would otherwise commit the DDL
+                savepoint = conn.begin_nested()
+                try:
+                    for index in indexes:
+                        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+                    without_plans = explain_all(conn, captured, args.analyze, "without indexes")
+                finally:
+                    savepoint.rollback()
+                    conn.rollback()
+
+        for i, (name, statements) in enumerate(captured):
+            print(f"== {name} ({len(statements)} statements)")
+            for j, (statement, _) in enumerate(statements):
+                print("  " + " ".join(statement.split())[:160])
+                print_plan("with indexes", with_plans[i][j])
+                full_scans["with"] += uses_full_scan(with_plans[i][j])
+                if without_plans:
+                    print_plan("without indexes", without_plans[i][j])
+                    full_scans["without"] += uses_full_scan(without_plans[i][j])
+            print()
+
+        total = sum(len(statements) for _, statements in captured)
+        print(f"Statements planned: {total}")
+        print(f"Full table scans with indexes: {full_scans['with']}")
+        if without_plans:
+            print(f"Full table scans without indexes: {full_scans['without']}")
+
+
+if __name__ == "__main__":
+    main()
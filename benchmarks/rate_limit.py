@@ -0,0 +1,95 @@
+"""
+Rate limiter cost and effect on a code-enumeration burst.
+
+    python -m benchmarks.rate_limit                              # memory backend, plus fakeredis if installed
+    python -m benchmarks.rate_limit --redis-url redis://localhost:6379/0
+    python -m benchmarks.rate_limit --requests 2000 --rate 60/minute
+
+One client walks sequential certificate numbers (SHSL/25B/DM/0001, 0002 ...)
+through GET /certificate/<code> as fast as the test client allows, the
+way a scraper would. For each backend the table shows how many requests
+got through, how many were answered 429, and the median time of a
+throttled request, which never reaches the database. It also times the
+bare token-bucket check. Uses DATABASE_URL; rejected requests write no
+verification logs, the few admitted ones do.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def backends(redis_url):
+    from app.utils.rate_limiter import MemoryBuckets, RedisBuckets
+
+    yield "memory", MemoryBuckets()
+    if redis_url:
+        yield "redis", RedisBuckets(redis_url, prefix=f"ratelimit-bench:{os.getpid()}:")
+        return
+    try:
+        import fakeredis
+    except ImportError:
+        print("(fakeredis not installed and no --redis-url: skipping the redis backend)\n")
+        return
+    yield "fakeredis", RedisBuckets(client=fakeredis.FakeRedis())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="codes the scraper tries per backend")
+    parser.add_argument("--rate", default="60/minute", help="limit applied to the verify routes")
+    parser.add_argument("--redis-url", default=os.environ.get("RATE_LIMIT_REDIS_URL"))
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.utils.rate_limiter import rate_limiter, parse_rate
+
+    app = create_app()
+    app.config["RATE_LIMIT_ENABLED"] = True
+    rate_limiter.enabled = True
+    rate_limiter.limits["verify"] = parse_rate(args.rate)
+    capacity, rate = rate_limiter.limits["verify"]
+
+    print(f"{args.requests} sequential codes from one address, limit {args.rate}\n")
+    columns = ["admitted", "throttled", "429 median us", "check us", "seconds"]
+    print(f"{'backend':<12}" + "".join(f"{column:>15}" for column in columns))
+
+    for name, backend in backends(args.redis_url):
+        rate_limiter.backend = backend
+        client = app.test_client()
+        environ = {"REMOTE_ADDR": f"198.51.100.{abs(hash(name)) % 250 + 1}"}
+
+        admitted = throttled = 0
+        rejected_us = []
+        started = time.perf_counter()
+        for i in range(args.requests):
+            request_started = time.perf_counter()
+            response = client.get(f"/certificate/SHSL/25B/DM/{i + 1:04d}", environ_base=environ)
+            if response.status_code == 429:
+                throttled += 1
+                rejected_us.append((time.perf_counter() - request_started) * 1e6)
+            else:
+                admitted += 1
+        elapsed = time.perf_counter() - started
+
+        checks = 2000
+        check_started = time.perf_counter()
+        for i in range(checks):
+            backend.take(f"bench:{i % 100}", capacity, rate)
+        check_us = (time.perf_counter() - check_started) / checks * 1e6
+
+        row = [
+            admitted,
+            throttled,
+            round(statistics.median(rejected_us)) if rejected_us else "-",
+            round(check_us, 1),
+            round(elapsed, 2)
+        ]
+        print(f"{name:<12}" + "".join(f"{str(value):>15}" for value in row))
+
+
+if __name__ == "__main__":
+    main()
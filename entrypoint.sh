@@ -14,15 +14,15 @@ apt-get update && apt-get install -y poppler-utils
 
 # Set Flask app
 export FLASK_APP=__init__:create_app
-export FLASK_ENV=development
+export FLASK_ENV=production
 # export FLASK_DEBUG=1
 
 
 # Run migrations
 python -m flask db upgrade
 
-# Start Flask server explicitly
-python -m flask run --host=0.0.0.0 --port=5000
+# Start gunicorn (settings in gunicorn.conf.py); exec so it receives SIGTERM / SIGHUP directly
+exec gunicorn -c gunicorn.conf.py wsgi:app
 
 # # Run migrations
 # flask db upgrade
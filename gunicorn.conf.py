@@ -0,0 +1,95 @@
+"""
+Gunicorn settings, read from the environment.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Worker classes:
+  gthread (default)  threads per worker; suits the mostly I/O-bound verify and
+                     dashboard requests without extra dependencies
+  sync               one request at a time per worker
+  gevent             thousands of cooperative connections per worker
+                     (pip install gevent; psycopg 3 is gevent-aware)
+
+Graceful reload: `kill -HUP <master pid>` starts new workers with fresh code
+and config and lets the old ones finish their requests (up to
+GUNICORN_GRACEFUL_TIMEOUT seconds).
+
+Background imports (?async=true) run in threads inside the workers, so a
+worker that exits takes them down with it. Worker recycling
+(GUNICORN_MAX_REQUESTS) is therefore off by default. When a worker does
+exit (reload, shutdown or recycling), worker_exit asks its import jobs to
+stop after the chunk in hand and re-queues them for the other workers,
+waiting up to half of GUNICORN_GRACEFUL_TIMEOUT. A job that cannot reach a
+chunk boundary in time is re-queued by another worker's sweeper once its
+heartbeat is IMPORT_JOB_STALE_SECONDS old.
+
+Every worker process has its own database pool, so keep
+workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) below the Postgres connection limit;
+with gthread, DB_POOL_SIZE should be at least GUNICORN_THREADS.
+"""
+import multiprocessing
+import os
+
+
+def _int(name, default):
+    return int(os.environ.get(name, default))
+
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = _int("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+threads = _int("GUNICORN_THREADS", 4) if worker_class == "gthread" else 1
+worker_connections = _int("GUNICORN_WORKER_CONNECTIONS", 1000)  # gevent only
+
+# Idle keep-alive connections are cheap with gthread / gevent, a blocked worker with sync
+keepalive = _int("GUNICORN_KEEPALIVE", 5)
+timeout = _int("GUNICORN_TIMEOUT", 120)  # bulk imports run synchronously unless ?async=true
+graceful_timeout = _int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+
+# Recycling workers caps slow leaks but interrupts in-process import jobs
+# (see above), so it is opt-in; jitter keeps workers from restarting together
+max_requests = _int("GUNICORN_MAX_REQUESTS", 0)
+max_requests_jitter = _int("GUNICORN_MAX_REQUESTS_JITTER", 200)
+
+# Loading the app in the master shares memory between workers; connection
+# pools are reset after fork (see post_fork)
+preload_app = os.environ.get("GUNICORN_PRELOAD", "false").lower() in ("1", "true", "yes")
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+# Proxies whose X-Forwarded-Proto is trusted
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def post_fork(server, worker):
+    """Connections opened in the master must not be shared with the workers"""
+    if not server.cfg.preload_app:
+        return
+
+    from wsgi import app
+    from app.extensions import db
+    from app.utils.db_replicas import replica_router
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+    for replica in replica_router.replicas:
+        replica.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Resume import jobs left queued or interrupted as soon as the worker is up"""
+    from app.utils.job_queue import job_queue
+
+    job_queue.start()
+
+
+def worker_exit(server, worker):
+    """Hand running import jobs back and write queued verification logs before the worker goes away"""
+    from app.utils.job_queue import job_queue
+    from app.utils.verification_log_writer import verification_log_writer
+
+    job_queue.shutdown(timeout=server.cfg.graceful_timeout / 2)
+    verification_log_writer.shutdown()
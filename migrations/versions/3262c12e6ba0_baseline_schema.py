@@ -0,0 +1,104 @@
+"""baseline schema: users, students, certificates, verification_logs
+
+Revision ID: 3262c12e6ba0
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+The tables the app shipped with, before migrations were tracked in the
+repository. Existing databases were created with db.create_all(), so each
+table is only created when it is missing; on those databases this
+revision just records the starting point.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3262c12e6ba0'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in tables:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('first_name', sa.String(length=100), nullable=False),
+            sa.Column('last_name', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=255), nullable=False),
+            sa.Column('phone_number', sa.String(length=50), nullable=True),
+            sa.Column('responsibility', sa.String(length=255), nullable=True),
+            sa.Column('year_of_employment', sa.String(length=10), nullable=True),
+            sa.Column('role', sa.String(length=50), nullable=True),
+            sa.Column('staff_id', sa.String(length=50), nullable=True),
+            sa.Column('password_hash', sa.String(length=255), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('staff_id')
+        )
+
+    if 'students' not in tables:
+        op.create_table(
+            'students',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('first_name', sa.String(length=100), nullable=False),
+            sa.Column('last_name', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=255), nullable=False),
+            sa.Column('phone_number', sa.String(length=20), nullable=True),
+            sa.Column('course_name', sa.String(length=255), nullable=False),
+            sa.Column('year_of_study', sa.String(length=20), nullable=True),
+            sa.Column('program_start_date', sa.Date(), nullable=True),
+            sa.Column('program_end_date', sa.Date(), nullable=True),
+            sa.Column('photo_url', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email')
+        )
+
+    if 'certificates' not in tables:
+        op.create_table(
+            'certificates',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('student_first_name', sa.String(length=100), nullable=False),
+            sa.Column('student_last_name', sa.String(length=100), nullable=False),
+            sa.Column('course_name', sa.String(length=255), nullable=False),
+            sa.Column('course_summary', sa.Text(), nullable=True),
+            sa.Column('year_of_study', sa.String(length=20), nullable=True),
+            sa.Column('verification_code', sa.String(length=50), nullable=False),
+            sa.Column('qr_code_url', sa.String(length=255), nullable=True),
+            sa.Column('issued_at', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('verification_code')
+        )
+
+    if 'verification_logs' not in tables:
+        op.create_table(
+            'verification_logs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('certificate_id', sa.Integer(), nullable=True),
+            sa.Column('verified_at', sa.DateTime(), nullable=True),
+            sa.Column('ip_address', sa.String(length=50), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['certificate_id'], ['certificates.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('verification_logs')
+    op.drop_table('certificates')
+    op.drop_table('students')
+    op.drop_table('users')
@@ -0,0 +1,36 @@
+"""add certificate_sequences
+
+Revision ID: 5d1f0a2b7c31
+Revises: 3262c12e6ba0
+Create Date: 2026-10-17 09:05:00.000000
+
+Last certificate number handed out per SHSL/<yy><A|B>/<course code>
+prefix. Rows are seeded lazily from the highest number already issued,
+so nothing is backfilled here.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1f0a2b7c31'
+down_revision = '3262c12e6ba0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'certificate_sequences' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'certificate_sequences',
+            sa.Column('prefix', sa.String(length=50), nullable=False),
+            sa.Column('last_value', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('prefix')
+        )
+
+
+def downgrade():
+    op.drop_table('certificate_sequences')
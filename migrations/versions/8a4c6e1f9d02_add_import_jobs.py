@@ -0,0 +1,45 @@
+"""add import_jobs
+
+Revision ID: 8a4c6e1f9d02
+Revises: 5d1f0a2b7c31
+Create Date: 2026-10-17 09:10:00.000000
+
+Background bulk imports and their progress, polled through /jobs/<id>.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4c6e1f9d02'
+down_revision = '5d1f0a2b7c31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'import_jobs' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'import_jobs',
+            sa.Column('id', sa.String(length=36), nullable=False),
+            sa.Column('kind', sa.String(length=20), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=True),
+            sa.Column('file_path', sa.String(length=512), nullable=True),
+            sa.Column('total_rows', sa.Integer(), nullable=True),
+            sa.Column('processed_rows', sa.Integer(), nullable=False),
+            sa.Column('failed_rows', sa.Integer(), nullable=False),
+            sa.Column('imported_rows', sa.Integer(), nullable=False),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('import_jobs')
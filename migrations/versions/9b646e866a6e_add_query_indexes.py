@@ -0,0 +1,75 @@
+"""add secondary indexes for the controller queries
+
+Revision ID: 9b646e866a6e
+Revises: d3f8a6b1e547
+Create Date: 2026-10-17 09:30:00.000000
+
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY outside
+a transaction, so the upgrade does not block writes on a live database.
+Everything is IF NOT EXISTS, which also makes it safe to re-run after a
+concurrent build was interrupted (drop the INVALID index first).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b646e866a6e'
+down_revision = 'd3f8a6b1e547'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, options); postgresql_only indexes use operator
+# classes other databases do not have. Also read by benchmarks/query_plans.py.
+INDEXES = [
+    # Verification logs: per-certificate history, time range scans, dashboard distinct count, per-IP lookups
+    ('ix_verification_logs_certificate_id_verified_at', 'verification_logs', ['certificate_id', 'verified_at'], {}),
+    ('ix_verification_logs_verified_at', 'verification_logs', ['verified_at'], {}),
+    ('ix_verification_logs_status_certificate_id', 'verification_logs', ['status', 'certificate_id'], {}),
+    ('ix_verification_logs_ip_address_verified_at', 'verification_logs', ['ip_address', 'verified_at'], {}),
+
+    # Students: import's exact-match lookup, keyset listing, name prefix filter
+    ('ix_students_name_course', 'students', ['first_name', 'last_name', 'course_name'], {}),
+    ('ix_students_created_at_id', 'students', ['created_at', 'id'], {}),
+    ('ix_students_first_name_lower_pattern', 'students', [sa.text('lower(first_name) text_pattern_ops')], {'postgresql_only': True}),
+    ('ix_students_last_name_lower_pattern', 'students', [sa.text('lower(last_name) text_pattern_ops')], {'postgresql_only': True}),
+
+    # Certificates: keyset listings, filters, FK, certificate number prefix scan, name prefix filter
+    ('ix_certificates_created_at_id', 'certificates', ['created_at', 'id'], {}),
+    ('ix_certificates_issued_at_id', 'certificates', ['issued_at', 'id'], {}),
+    ('ix_certificates_course_name', 'certificates', ['course_name'], {}),
+    ('ix_certificates_student_id', 'certificates', ['student_id'], {}),
+    ('ix_certificates_verification_code_pattern', 'certificates', ['verification_code'], {
+        'postgresql_ops': {'verification_code': 'text_pattern_ops'}
+    }),
+    ('ix_certificates_first_name_lower_pattern', 'certificates', [sa.text('lower(student_first_name) text_pattern_ops')], {'postgresql_only': True}),
+    ('ix_certificates_last_name_lower_pattern', 'certificates', [sa.text('lower(student_last_name) text_pattern_ops')], {'postgresql_only': True}),
+]
+
+
+def upgrade():
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            options = dict(options)
+            if options.pop('postgresql_only', False) and not is_postgresql:
+                continue
+            op.create_index(
+                name, table, columns, unique=False, if_not_exists=True,
+                postgresql_concurrently=True, **options
+            )
+
+    # Fresh statistics so the planner picks the new indexes straight away
+    if is_postgresql:
+        for table in ('verification_logs', 'students', 'certificates'):
+            op.execute(f'ANALYZE {table}')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,31 @@
+"""add import_jobs.attempts
+
+Revision ID: a6d2c8e4f317
+Revises: f2a9c5d8e013
+Create Date: 2026-10-18 10:00:00.000000
+
+Counts how many times a background import was started, so a job that
+keeps getting interrupted is failed instead of re-queued forever.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2c8e4f317'
+down_revision = 'f2a9c5d8e013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('import_jobs')}
+    if 'attempts' not in columns:
+        with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('attempts')
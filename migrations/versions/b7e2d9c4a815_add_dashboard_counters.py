@@ -0,0 +1,35 @@
+"""add dashboard_counters
+
+Revision ID: b7e2d9c4a815
+Revises: 8a4c6e1f9d02
+Create Date: 2026-10-17 09:15:00.000000
+
+Running totals behind the dashboard summary. The table starts empty; the
+first summary (or `flask dashboard-reconcile`) seeds it from the tables.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d9c4a815'
+down_revision = '8a4c6e1f9d02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'dashboard_counters' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'dashboard_counters',
+            sa.Column('name', sa.String(length=300), nullable=False),
+            sa.Column('value', sa.BigInteger(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('name')
+        )
+
+
+def downgrade():
+    op.drop_table('dashboard_counters')
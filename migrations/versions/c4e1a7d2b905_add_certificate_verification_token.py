@@ -0,0 +1,32 @@
+"""add certificates.verification_token
+
+Revision ID: c4e1a7d2b905
+Revises: 9b646e866a6e
+Create Date: 2026-10-17 10:00:00.000000
+
+Holds the signed offline-verification token issued with each certificate.
+Tokens for existing rows need the app's signing key, so they are filled in
+by `flask sign-certificate-tokens` rather than here.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e1a7d2b905'
+down_revision = '9b646e866a6e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('certificates')}
+    if 'verification_token' not in columns:
+        with op.batch_alter_table('certificates', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('verification_token', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        batch_op.drop_column('verification_token')
@@ -0,0 +1,57 @@
+"""add certificates.last_verified_at and last_verification_status
+
+Revision ID: d3f8a6b1e547
+Revises: b7e2d9c4a815
+Create Date: 2026-10-17 09:20:00.000000
+
+Filled from the existing verification logs; `flask backfill-last-verified`
+does the same in batches on large tables.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f8a6b1e547'
+down_revision = 'b7e2d9c4a815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('certificates')}
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        if 'last_verified_at' not in columns:
+            batch_op.add_column(sa.Column('last_verified_at', sa.DateTime(), nullable=True))
+        if 'last_verification_status' not in columns:
+            batch_op.add_column(sa.Column('last_verification_status', sa.String(length=20), nullable=True))
+
+    op.create_index(
+        'ix_certificates_last_verified_at', 'certificates', ['last_verified_at'],
+        unique=False, if_not_exists=True
+    )
+
+    # Fill last_verified_at / last_verification_status from the existing logs
+    op.execute("""
+        UPDATE certificates SET
+            last_verified_at = (
+                SELECT MAX(verified_at) FROM verification_logs
+                WHERE verification_logs.certificate_id = certificates.id
+            ),
+            last_verification_status = (
+                SELECT status FROM verification_logs
+                WHERE verification_logs.certificate_id = certificates.id
+                ORDER BY verified_at DESC, id DESC
+                LIMIT 1
+            )
+        WHERE last_verified_at IS NULL
+          AND id IN (SELECT certificate_id FROM verification_logs WHERE certificate_id IS NOT NULL)
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_certificates_last_verified_at', table_name='certificates', if_exists=True)
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        batch_op.drop_column('last_verification_status')
+        batch_op.drop_column('last_verified_at')
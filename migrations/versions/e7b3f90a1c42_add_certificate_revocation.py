@@ -0,0 +1,58 @@
+"""add certificate revocation columns and revocation_events
+
+Revision ID: e7b3f90a1c42
+Revises: c4e1a7d2b905
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3f90a1c42'
+down_revision = 'c4e1a7d2b905'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {column['name'] for column in inspector.get_columns('certificates')}
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        if 'revoked_at' not in columns:
+            batch_op.add_column(sa.Column('revoked_at', sa.DateTime(), nullable=True))
+        if 'revocation_reason' not in columns:
+            batch_op.add_column(sa.Column('revocation_reason', sa.String(length=255), nullable=True))
+
+    op.create_index(
+        'ix_certificates_revoked_at', 'certificates', ['revoked_at'],
+        unique=False, if_not_exists=True
+    )
+
+    if 'revocation_events' not in set(inspector.get_table_names()):
+        op.create_table(
+            'revocation_events',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('certificate_id', sa.Integer(), nullable=True),
+            sa.Column('verification_code', sa.String(length=50), nullable=False),
+            sa.Column('action', sa.String(length=20), nullable=False),
+            sa.Column('reason', sa.String(length=255), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index(
+        'ix_revocation_events_verification_code', 'revocation_events', ['verification_code'],
+        unique=False, if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_revocation_events_verification_code', table_name='revocation_events', if_exists=True)
+    op.drop_table('revocation_events')
+
+    op.drop_index('ix_certificates_revoked_at', table_name='certificates', if_exists=True)
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        batch_op.drop_column('revocation_reason')
+        batch_op.drop_column('revoked_at')
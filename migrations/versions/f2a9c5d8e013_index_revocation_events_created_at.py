@@ -0,0 +1,31 @@
+"""index revocation_events.created_at
+
+Revision ID: f2a9c5d8e013
+Revises: e7b3f90a1c42
+Create Date: 2026-10-18 09:00:00.000000
+
+Revocation list refreshes re-read the events of the last
+REVOCATION_OVERLAP_SECONDS by created_at, to pick up events that
+committed after a higher id had been read.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a9c5d8e013'
+down_revision = 'e7b3f90a1c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_revocation_events_created_at', 'revocation_events', ['created_at'],
+        unique=False, if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_revocation_events_created_at', table_name='revocation_events', if_exists=True)
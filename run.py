@@ -1,9 +1,11 @@
 from app import create_app
+from app.utils.job_queue import job_queue
 import os
 
 app = create_app()
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
+    job_queue.start()
     app.run(host='0.0.0.0', port=port, debug=False)
     # app.run(debug=True)
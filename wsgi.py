@@ -0,0 +1,7 @@
+"""
+Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+(run.py starts the Flask development server instead)
+"""
+from app import create_app
+
+app = create_app()